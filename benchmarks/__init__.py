@@ -0,0 +1 @@
+# Reproduceerbare metingen voor de rekenintensieve stappen van de app.
@@ -0,0 +1,96 @@
+"""Koude start per pagina: importtijd en geheugen (RSS) in een vers Python-proces.
+
+Elke pagina wordt in een nieuw proces één keer uitgevoerd zoals bij het eerste
+bezoek (geen upload, standaardwaarden), met streamlit in bare mode. Gemeten:
+de tijd om streamlit zelf te laden, de tijd voor de pagina, de extra geladen
+modules en de piek-RSS. Een pagina boven haar budget doet het script falen.
+
+Gebruik:
+    python -m benchmarks.cold_start
+    python -m benchmarks.cold_start --repeat 3 --json cold_start.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (seconden voor de pagina zelf na de streamlit-import, piek-RSS van het hele proces in MB)
+BUDGETS = {
+    "Home.py": (0.15, 100),
+    "pages/1_Uitslagen Analyse.py": (0.40, 120),
+    "pages/2_Genereer Hoogteprofiel.py": (0.60, 150),
+    # De scoregrafiek staat meteen op het scherm: matplotlib is hier nodig
+    "pages/3_Measurements.py": (1.50, 180),
+}
+
+# Draait in het kindproces; print één JSON-regel
+_PROBE = r"""
+import json, logging, os, resource, runpy, sys, time
+sys.path.insert(0, os.getcwd())
+start = time.perf_counter()
+import streamlit
+base_s = time.perf_counter() - start
+base_modules = set(sys.modules)
+logging.getLogger("streamlit").setLevel(logging.ERROR)
+start = time.perf_counter()
+runpy.run_path(sys.argv[1], run_name="__main__")
+page_s = time.perf_counter() - start
+heavy = ("pandas", "numpy", "scipy", "plotly", "matplotlib", "pyarrow", "openpyxl", "gpxpy", "kaleido")
+loaded = {m.split(".")[0] for m in set(sys.modules) - base_modules}
+print(json.dumps({
+    "streamlit_s": base_s,
+    "page_s": page_s,
+    "modules": len(set(sys.modules) - base_modules),
+    "heavy": sorted(loaded & set(heavy)),
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}))
+"""
+
+
+def measure(page, repeat):
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", _PROBE, page], cwd=ROOT, capture_output=True, text=True, check=True,
+            env={**os.environ, "STREAMLIT_LOGGER_LEVEL": "error"},
+        )
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    best = min(runs, key=lambda r: r["page_s"])
+    return {**best, "page_s": best["page_s"], "rss_mb": max(r["rss_mb"] for r in runs)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pages", nargs="*", default=list(BUDGETS))
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--json", help="resultaten ook als JSON naar dit bestand")
+    parser.add_argument("--no-budget", action="store_true", help="enkel meten, niet falen")
+    args = parser.parse_args(argv)
+
+    print(f"{'pagina':<36} {'streamlit':>9} {'pagina':>8} {'RSS':>8} {'budget':>14}  zware modules")
+    results, over = {}, []
+    for page in args.pages:
+        r = measure(page, args.repeat)
+        budget_s, budget_mb = BUDGETS.get(page, (float("inf"), float("inf")))
+        ok = r["page_s"] <= budget_s and r["rss_mb"] <= budget_mb
+        if not ok:
+            over.append(page)
+        results[page] = {**r, "budget_s": budget_s, "budget_mb": budget_mb, "ok": ok}
+        print(f"{page:<36} {r['streamlit_s'] * 1000:>7.0f}ms {r['page_s'] * 1000:>6.0f}ms "
+              f"{r['rss_mb']:>6.0f}MB {budget_s * 1000:>6.0f}ms/{budget_mb:>3}MB  "
+              f"{', '.join(r['heavy']) or '-'}{'' if ok else '  << OVER BUDGET'}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+    if over and not args.no_budget:
+        print(f"Over budget: {', '.join(over)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
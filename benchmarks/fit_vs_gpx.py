@@ -0,0 +1,40 @@
+"""Parse-doorvoer van FIT vs de gelijkwaardige GPX (zelfde rit, zelfde punten).
+
+Gebruik:
+    python -m benchmarks.fit_vs_gpx --points 20000 100000
+"""
+import argparse
+import io
+import sys
+import time
+
+from benchmarks.synthetic import synthetic_fit, synthetic_gpx
+from hoogteprofiel.fit_reader import parse_fit
+from hoogteprofiel.gpx_ingest import parse_gpx
+
+
+def best_of(fn, data, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(io.BytesIO(data))
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, nargs="+", default=[20_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"{'punten':>8} {'formaat':>7} {'grootte':>10} {'tijd':>9} {'punten/s':>12}")
+    for n in args.points:
+        for fmt, data, fn in (("gpx", synthetic_gpx(n), parse_gpx), ("fit", synthetic_fit(n), parse_fit)):
+            seconds = best_of(fn, data, args.repeat)
+            print(f"{n:>8} {fmt:>7} {len(data) / 1e6:>8.2f}MB {seconds * 1000:>7.1f}ms {n / seconds:>12,.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
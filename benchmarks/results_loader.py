@@ -0,0 +1,81 @@
+"""Uitslagen-workbook inlezen: de oude read_excel + cleaning-keten vs de streaming loader.
+
+Gebruik:
+    python -m benchmarks.results_loader --riders 200 --races 80
+"""
+import argparse
+import io
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import synthetic_workbook
+from uitslagen.ingest import parse_workbook, read_sheet, sheet_to_long
+from uitslagen.store import wide_positions
+
+
+def excel_chain(data):
+    """De keten die de pagina vroeger bij elke rerun uitvoerde."""
+    raw_df = pd.read_excel(io.BytesIO(data), sheet_name="Uitslagen", header=None)
+    race_dates = raw_df.iloc[1, 3:].tolist()
+    names = raw_df.iloc[2:, 1].tolist()
+    results = raw_df.iloc[2:, 3:].reset_index(drop=True)
+    df = pd.DataFrame(results.values, columns=race_dates)
+    df.insert(0, "NAME", names)
+    df.set_index("NAME", inplace=True)
+    df = df.astype(str)
+    df = df.replace(to_replace=["", "nan", "NaN"], value=pd.NA)
+    df = df.mask(df == "DNF", pd.NA)
+    df = df.apply(pd.to_numeric, errors="coerce")
+    df.dropna(how="all", inplace=True)
+    df.dropna(axis=1, how="all", inplace=True)
+    return df
+
+
+def streaming(data):
+    return sheet_to_long(read_sheet(io.BytesIO(data)))
+
+
+def best_of(fn, data, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(data)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--riders", type=int, nargs="+", default=[200])
+    parser.add_argument("--races", type=int, default=80)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"{'renners':>8} {'koersen':>7} {'grootte':>9} {'methode':>18} {'tijd':>10} {'x':>7}")
+    for riders in args.riders:
+        data = synthetic_workbook(riders, args.races)
+
+        # Zelfde plaatsen per renner en koers als de oude keten
+        old = excel_chain(data)
+        new = wide_positions(streaming(data))
+        if old.shape != new.shape or not np.allclose(
+            old.to_numpy(dtype=float), new.to_numpy(dtype=float), equal_nan=True
+        ):
+            print(f"{riders}: resultaat verschilt van de read_excel-keten", file=sys.stderr)
+            return 1
+
+        parse_workbook(data)  # memo vullen
+        base = best_of(excel_chain, data, args.repeat)
+        for name, fn in (("read_excel+clean", excel_chain), ("streaming", streaming),
+                         ("gememoïseerd", parse_workbook)):
+            seconds = base if fn is excel_chain else best_of(fn, data, args.repeat)
+            print(f"{riders:>8} {args.races:>7} {len(data) / 1e3:>7.0f}kB {name:>18} "
+                  f"{seconds * 1000:>8.1f}ms {base / seconds:>6.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,259 @@
+"""Benchmarksuite: elke rekenintensieve stap apart gemeten op synthetische data, als JSON.
+
+Alle invoer komt uit benchmarks.synthetic (vaste seed), dus twee runs op dezelfde
+machine meten exact hetzelfde werk:
+    routes      GPX en FIT van 1k tot 1M punten
+                parse, afstand, resample, savgol, keypoints, figuur, PNG (Kaleido), SVG
+    uitslagen   workbooks van 20 tot 2000 renners
+                inlezen, opkuisen, brede tabel, statistieken, vorm, duels
+    cranklengte ploeg-CSV van 20 tot 2000 renners en één Monte Carlo-run
+                inlezen, optimalisatie, Excel-rapport, gevoeligheid
+
+Elke stap geeft de beste tijd over --repeat runs. Een stap die faalt (bv. PNG zonder
+Chrome voor Kaleido) krijgt een foutmelding in plaats van een tijd; stappen die haar
+uitkomst nodig hebben worden overgeslagen, de rest loopt door.
+
+Gebruik:
+    python -m benchmarks.suite --out bench.json
+    python -m benchmarks.suite --points 1000 10000 --riders 20 200 --out bench.json
+    python -m benchmarks.suite --out nieuw.json --compare oud.json
+"""
+import argparse
+import datetime
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from importlib import metadata
+
+from benchmarks.synthetic import synthetic_fit, synthetic_gpx, synthetic_squad, synthetic_workbook
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TRACK_POINTS = [1_000, 10_000, 100_000, 1_000_000]
+RIDERS = [20, 200, 2_000]
+RACES = 40
+KEYPOINTS = 12
+PACKAGES = ("numpy", "pandas", "scipy", "plotly", "kaleido", "matplotlib", "openpyxl", "pyarrow", "streamlit")
+# Stappen onder deze tijd tellen niet mee als regressie: dat is ruis
+NOISE_S = 0.005
+
+
+def timed(fn, *args, repeat=1):
+    """(resultaat, beste tijd in s) over `repeat` runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+class Stages:
+    """Tijden per stap van één meting; een fout stopt enkel die stap en wat ervan afhangt."""
+
+    def __init__(self, repeat):
+        self.repeat = repeat
+        self.seconds = {}
+        self.errors = {}
+
+    def run(self, name, fn, *args, repeat=None):
+        if any(arg is None for arg in args):
+            return None  # invoer komt van een mislukte stap; die fout staat al in errors
+        try:
+            result, self.seconds[name] = timed(fn, *args, repeat=repeat or self.repeat)
+        except Exception as exc:
+            self.errors[name] = f"{type(exc).__name__}: {exc}".splitlines()[0]
+            return None
+        return result
+
+    def as_dict(self):
+        return {"stages": self.seconds, **({"errors": self.errors} if self.errors else {})}
+
+
+# --- Routes ---
+def bench_track(points, repeat, png=True):
+    from hoogteprofiel.fit_reader import parse_fit
+    from hoogteprofiel.gpx_ingest import cumulative_distance_km, parse_gpx
+    from hoogteprofiel.pipeline import (
+        EXPORT_SCALE, Keypoint, ProfileSettings, ProfileStyle, build_figure, place_keypoints, resample,
+        smooth_profile,
+    )
+    from hoogteprofiel.render_service import render_in_process
+    from hoogteprofiel.vector_export import render_profile
+
+    settings, style = ProfileSettings(), ProfileStyle()
+    gpx, fit = synthetic_gpx(points), synthetic_fit(points)
+    # Grote bestanden maar één keer parsen: één run duurt dan al seconden
+    parse_repeat = repeat if points <= 100_000 else 1
+
+    stages = Stages(repeat)
+    track = stages.run("parse_gpx", lambda: parse_gpx(io.BytesIO(gpx)), repeat=parse_repeat)
+    stages.run("parse_fit", lambda: parse_fit(io.BytesIO(fit)), repeat=parse_repeat)
+    if track is not None:
+        stages.run("distance", cumulative_distance_km, track.lat, track.lon, track.ele, track.segment_start)
+    dist, elev = stages.run("resample", resample, track, settings) or (None, None)
+    smooth_elev = stages.run("smooth", smooth_profile, elev, settings)
+
+    names = None
+    if dist is not None:
+        total = float(dist[-1])
+        names = [Keypoint(f"KP{i + 1}", total * (i + 0.5) / KEYPOINTS) for i in range(KEYPOINTS)]
+    keypoints = stages.run("keypoints", place_keypoints, dist, smooth_elev, names)
+    fig_json = stages.run("figure", lambda *profile: build_figure(*profile, style).to_json(),
+                          dist, smooth_elev, keypoints)
+    if png:
+        stages.run("export_png", lambda fig: render_in_process(
+            fig, "png", style.px_width, style.px_height, EXPORT_SCALE)[0], fig_json)
+    stages.run("export_svg", render_profile, dist, smooth_elev, keypoints, style, "svg")
+    return {"points": points, "gpx_bytes": len(gpx), "fit_bytes": len(fit),
+            "profile_points": None if dist is None else len(dist), **stages.as_dict()}
+
+
+# --- Uitslagen ---
+def bench_results(riders, races, repeat):
+    from uitslagen.headtohead import HeadToHead
+    from uitslagen.ingest import read_sheet, sheet_to_long
+    from uitslagen.stats import rider_stats, rolling_stats
+    from uitslagen.store import wide_positions
+
+    data = synthetic_workbook(riders, races)
+    stages = Stages(repeat)
+    # read_sheet/sheet_to_long rechtstreeks: parse_workbook zou na de eerste run uit het memo komen
+    raw = stages.run("load", lambda: read_sheet(io.BytesIO(data)))
+    long = stages.run("clean", sheet_to_long, raw)
+    stages.run("wide", wide_positions, long)
+    stages.run("stats", rider_stats, long)
+    stages.run("form", rolling_stats, long)
+    # Volledige opbouw + fit: elke run een nieuw object, anders is het een "unchanged"-update
+    stages.run("head_to_head", lambda: HeadToHead().update(long, 0))
+    return {"riders": riders, "races": races, "bytes": len(data), "results": len(long), **stages.as_dict()}
+
+
+# --- Cranklengte ---
+def bench_squad(riders, repeat):
+    from cranklengte.squad import evaluate, read_squad, team_report
+
+    data = synthetic_squad(riders)
+    stages = Stages(repeat)
+    squad = stages.run("read", lambda: read_squad(io.BytesIO(data)))
+    results = stages.run("optimize", evaluate, squad)
+    stages.run("report", team_report, results, squad)
+    return {"riders": riders, "bytes": len(data), **stages.as_dict()}
+
+
+def bench_sensitivity(draws, repeat):
+    from cranklengte.sensitivity import simulate
+
+    stages = Stages(repeat)
+    stages.run("monte_carlo", lambda: simulate(180.0, 86.0, 40.0, 36.0, 90.0, 172.5, draws=draws))
+    return {"draws": draws, **stages.as_dict()}
+
+
+# --- Omgeving en vergelijking ---
+def _git(*args):
+    try:
+        out = subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() if out.returncode == 0 else None
+
+
+def environment():
+    versions = {}
+    for name in PACKAGES:
+        try:
+            versions[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            versions[name] = None
+    status = _git("status", "--porcelain", "--untracked-files=no")
+    return {
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(status) if status is not None else None,
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "packages": versions,
+    }
+
+
+def _flatten(report):
+    # {("tracks", "points=1000", "parse_gpx"): seconden, ...}
+    keys = {"tracks": "points", "results": "riders", "squads": "riders", "sensitivity": "draws"}
+    flat = {}
+    for section, size_key in keys.items():
+        for entry in report.get(section, []):
+            for stage, seconds in entry["stages"].items():
+                flat[(section, f"{size_key}={entry[size_key]}", stage)] = seconds
+    return flat
+
+
+def compare(report, baseline, tolerance):
+    """Print nieuw/oud per stap; geeft de stappen die meer dan `tolerance` trager zijn."""
+    new, old = _flatten(report), _flatten(baseline)
+    print(f"\nVergelijking met {baseline['environment'].get('commit')} (nu {report['environment'].get('commit')})")
+    slower = []
+    for key in sorted(new.keys() & old.keys()):
+        ratio = new[key] / old[key] if old[key] else float("inf")
+        regression = ratio > 1 + tolerance and max(new[key], old[key]) >= NOISE_S
+        if regression:
+            slower.append(key)
+        print(f"  {' '.join(key):<46} {old[key] * 1000:>10.1f}ms → {new[key] * 1000:>10.1f}ms "
+              f"{ratio:>6.2f}x{'  << TRAGER' if regression else ''}")
+    return slower
+
+
+def _print_entry(label, entry):
+    stages = "  ".join(f"{k}={v * 1000:.1f}ms" for k, v in entry["stages"].items())
+    errors = "  ".join(f"{k}: {v}" for k, v in entry.get("errors", {}).items())
+    print(f"{label:<22} {stages}{'  FOUT ' + errors if errors else ''}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, nargs="*", default=TRACK_POINTS, help="routegroottes")
+    parser.add_argument("--riders", type=int, nargs="*", default=RIDERS, help="aantallen renners")
+    parser.add_argument("--races", type=int, default=RACES, help="koersen per workbook")
+    parser.add_argument("--draws", type=int, default=200_000, help="trekkingen voor de Monte Carlo")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-png", action="store_true", help="PNG-export (Kaleido) overslaan")
+    parser.add_argument("--out", help="resultaten als JSON naar dit bestand")
+    parser.add_argument("--compare", help="eerder JSON-resultaat om mee te vergelijken")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="met --compare: faal als een stap meer dan dit deel trager is")
+    args = parser.parse_args(argv)
+
+    report = {"environment": environment(), "repeat": args.repeat,
+              "tracks": [], "results": [], "squads": [], "sensitivity": []}
+    for points in args.points:
+        report["tracks"].append(bench_track(points, args.repeat, png=not args.no_png))
+        _print_entry(f"route {points:,} ptn", report["tracks"][-1])
+    for riders in args.riders:
+        report["results"].append(bench_results(riders, args.races, args.repeat))
+        _print_entry(f"uitslagen {riders} r.", report["results"][-1])
+    for riders in args.riders:
+        report["squads"].append(bench_squad(riders, args.repeat))
+        _print_entry(f"ploeg {riders} r.", report["squads"][-1])
+    if args.draws:
+        report["sensitivity"].append(bench_sensitivity(args.draws, args.repeat))
+        _print_entry(f"Monte Carlo {args.draws:,}", report["sensitivity"][-1])
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            slower = compare(report, json.load(fh), args.tolerance)
+        if slower:
+            print(f"{len(slower)} stappen trager dan {1 + args.tolerance:.2f}x", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+import numpy as np
+
+GPX_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<gpx version="1.1" creator="benchmarks" xmlns="http://www.topografix.com/GPX/1/1">\n'
+)
+
+
+def synthetic_track(n_points, seed=0, hz=1.0):
+    """Deterministische rit: ~8 m/s rond Roeselare met heuvels en GPS-ruis."""
+    rng = np.random.default_rng(seed)
+    heading = np.cumsum(rng.normal(0, 0.02, n_points))
+    step_m = 8.0 / hz + rng.normal(0, 0.3, n_points)
+    lat = 50.95 + np.cumsum(step_m * np.cos(heading)) / 111_320
+    lon = 3.12 + np.cumsum(step_m * np.sin(heading)) / (111_320 * np.cos(np.radians(50.95)))
+    dist = np.cumsum(step_m)
+    ele = (30 + 40 * np.sin(dist / 7000) + 25 * np.sin(dist / 1300) ** 4
+           + rng.normal(0, 1.5, n_points))
+    t0 = np.datetime64("2025-05-01T08:00:00", "s")
+    time = t0 + (np.arange(n_points) / hz).astype("timedelta64[s]")
+    return lat, lon, ele, time
+
+
+def synthetic_gpx(n_points, seed=0, segments=1):
+    """GPX-bestand (bytes) met n_points trackpunten."""
+    lat, lon, ele, time = synthetic_track(n_points, seed)
+    bounds = np.linspace(0, n_points, segments + 1).astype(int)
+    parts = [GPX_HEADER, "<trk><name>synthetic</name>\n"]
+    for a, b in zip(bounds[:-1], bounds[1:]):
+        parts.append("<trkseg>\n")
+        parts.extend(
+            f'<trkpt lat="{la:.7f}" lon="{lo:.7f}"><ele>{el:.1f}</ele><time>{t}Z</time></trkpt>\n'
+            for la, lo, el, t in zip(lat[a:b], lon[a:b], ele[a:b], time[a:b].astype(str))
+        )
+        parts.append("</trkseg>\n")
+    parts.append("</trk>\n</gpx>\n")
+    return "".join(parts).encode("utf-8")
+
+
+# --- FIT ---
+FIT_EPOCH_S = 631065600
+
+
+def _fit_crc(data):
+    table = [0x0000, 0xCC01, 0xD801, 0x1400, 0xF001, 0x3C00, 0x2800, 0xE401,
+             0xA001, 0x6C00, 0x7800, 0xB401, 0x5000, 0x9C01, 0x8801, 0x4400]
+    crc = 0
+    for byte in data:
+        tmp = table[crc & 0xF]
+        crc = (crc >> 4) & 0x0FFF
+        crc = crc ^ tmp ^ table[byte & 0xF]
+        tmp = table[crc & 0xF]
+        crc = (crc >> 4) & 0x0FFF
+        crc = crc ^ tmp ^ table[(byte >> 4) & 0xF]
+    return crc
+
+
+def synthetic_fit(n_points, seed=0, with_distance=True):
+    """FIT-bestand (bytes) met dezelfde rit als synthetic_gpx: file_id + record-berichten."""
+    lat, lon, ele, time = synthetic_track(n_points, seed)
+    from hoogteprofiel.gpx_ingest import cumulative_distance_km
+
+    fields = [(253, 4, 0x86), (0, 4, 0x85), (1, 4, 0x85), (78, 4, 0x86)]
+    if with_distance:
+        fields.append((5, 4, 0x86))
+    record = np.dtype({
+        "names": ["header"] + [f"f{num}" for num, _, _ in fields],
+        "formats": ["u1"] + ["<u4" if base == 0x86 else "<i4" for _, _, base in fields],
+    })
+
+    rows = np.zeros(n_points, dtype=record)
+    rows["header"] = 0x00  # lokaal berichttype 0
+    rows["f253"] = (time.astype("datetime64[s]").astype(np.int64) - FIT_EPOCH_S).astype(np.uint32)
+    rows["f0"] = np.round(lat * 2**31 / 180).astype(np.int32)
+    rows["f1"] = np.round(lon * 2**31 / 180).astype(np.int32)
+    rows["f78"] = np.round((ele + 500) * 5).astype(np.uint32)
+    if with_distance:
+        dist_m = cumulative_distance_km(lat, lon, ele) * 1000
+        rows["f5"] = np.round(dist_m * 100).astype(np.uint32)
+
+    # file_id (globaal 0, lokaal 1): type=activity
+    file_id_def = bytes([0x41, 0, 0]) + (0).to_bytes(2, "little") + bytes([1, 0, 1, 0x00])
+    file_id = bytes([0x01, 4])
+    record_def = bytes([0x40, 0, 0]) + (20).to_bytes(2, "little") + bytes([len(fields)])
+    record_def += b"".join(bytes([num, size, base]) for num, size, base in fields)
+
+    data = file_id_def + file_id + record_def + rows.tobytes()
+    header = bytes([14, 0x20]) + (2132).to_bytes(2, "little") + len(data).to_bytes(4, "little") + b".FIT"
+    header += _fit_crc(header).to_bytes(2, "little")
+    body = header + data
+    return body + _fit_crc(body).to_bytes(2, "little")
+
+
+# --- Uitslagen-workbook ---
+def synthetic_workbook(riders, races, seed=0, year=2025, dnf=0.08, missing=0.17):
+    """Workbook (bytes) volgens de standaard template: READ.ME + tabblad Uitslagen.
+
+    Rij 2 heeft NAAM/CATEGORIE en de koersdatums, vanaf rij 4 één renner per rij met
+    een plaats, "DNF" of een lege cel per koers.
+    """
+    import datetime
+    import io
+
+    import openpyxl
+
+    rng = np.random.default_rng(seed)
+    draw = rng.random((riders, races))
+    places = rng.integers(1, 120, (riders, races))
+    first = datetime.datetime(year, 3, 1)
+
+    # Gewone (geen write_only) workbook: zoals Excel schrijft die een <dimension>-tag
+    wb = openpyxl.Workbook()
+    wb.active.title = "READ.ME"
+    wb.active.append(["Standaard template voor de uitslagen."])
+    ws = wb.create_sheet("Uitslagen")
+    ws.append([])
+    ws.append([None, "NAAM", "CATEGORIE"] + [first + datetime.timedelta(days=7 * j) for j in range(races)])
+    ws.append([])
+    for i in range(riders):
+        cells = [
+            "DNF" if r < dnf else None if r < dnf + missing else int(p)
+            for r, p in zip(draw[i], places[i])
+        ]
+        ws.append([i + 1, f"Renner {i + 1:04d}", "Junior"] + cells)
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+# --- Ploeg-CSV (cranklengte) ---
+def synthetic_squad(riders, seed=0):
+    """Ploeg-CSV (bytes) met alle kolommen van cranklengte.squad, realistische spreiding."""
+    rng = np.random.default_rng(seed)
+    height = rng.normal(178, 7, riders).clip(150, 205)
+    inseam = height * rng.normal(0.475, 0.015, riders)
+    femur = inseam * rng.normal(0.46, 0.02, riders)
+    tibia = inseam * rng.normal(0.42, 0.02, riders)
+    cadence = rng.normal(90, 6, riders).clip(65, 115)
+    power = rng.normal(260, 45, riders).clip(120, 450)
+    crank = rng.choice([165.0, 167.5, 170.0, 172.5, 175.0], riders)
+    sprint = rng.normal(120, 8, riders).clip(90, 145)
+
+    lines = ["naam,lengte_cm,inseam_cm,cadans_rpm,vermogen_w,femur_cm,tibia_cm,crank_mm,sprint_cadans_rpm"]
+    lines.extend(
+        f"Renner {i + 1:04d},{h:.1f},{ins:.1f},{c:.0f},{p:.0f},{f:.1f},{t:.1f},{cr},{s:.0f}"
+        for i, (h, ins, c, p, f, t, cr, s)
+        in enumerate(zip(height, inseam, cadence, power, femur, tibia, crank, sprint))
+    )
+    return ("\n".join(lines) + "\n").encode("utf-8")
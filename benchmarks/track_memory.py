@@ -0,0 +1,115 @@
+"""Piek-RSS van het inladen van een lange rit: oude lijst/DataFrame-aanpak vs Track.
+
+Gebruik:
+    python -m benchmarks.track_memory --points 500000
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import synthetic_gpx
+
+
+def _peak_rss_mb():
+    # VmHWM hoort bij dit proces; ru_maxrss erft op Linux de piek van de ouder over exec heen
+    try:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_legacy(path, max_points):
+    # De pagina vóór de Track: gpxpy-objecten, Python-lijsten, DataFrame en een kopie
+    import gpxpy
+    import pandas as pd
+
+    with open(path) as fh:
+        gpx = gpxpy.parse(fh)
+    elevations, distances, total_dist = [], [], 0
+    for track in gpx.tracks:
+        for segment in track.segments:
+            prev_point = None
+            for point in segment.points:
+                if prev_point:
+                    total_dist += point.distance_3d(prev_point)
+                elevations.append(point.elevation)
+                distances.append(total_dist / 1000)
+                prev_point = point
+    df = pd.DataFrame({"Afstand (km)": distances, "Hoogte (m)": elevations})
+    step = max(1, len(df) // max_points)
+    return len(df.iloc[::step].reset_index(drop=True))
+
+
+def run_track(path, max_points, cache_dir=None):
+    from hoogteprofiel.pipeline import ProfileSettings, resample
+    from hoogteprofiel.track_cache import TrackCache
+
+    with open(path, "rb") as fh:
+        data = fh.read()
+    cache = TrackCache(cache_dir) if cache_dir else None
+    if cache is not None:
+        track = cache.get_or_parse(data)
+    else:
+        from hoogteprofiel.gpx_ingest import parse_gpx
+        track = parse_gpx(path)
+    del data
+    dist, _ = resample(track, ProfileSettings(max_points=max_points, downsample_method="stride"))
+    return len(dist)
+
+
+def _child(mode, path, max_points, cache_dir):
+    start = time.perf_counter()
+    if mode == "legacy":
+        n = run_legacy(path, max_points)
+    elif mode == "track":
+        n = run_track(path, max_points)
+    else:
+        n = run_track(path, max_points, cache_dir)
+    print(json.dumps({"mode": mode, "seconds": time.perf_counter() - start,
+                      "peak_rss_mb": _peak_rss_mb(), "points_out": n}))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, default=500_000)
+    parser.add_argument("--max-points", type=int, default=10_000)
+    parser.add_argument("--child", nargs=4, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        mode, path, max_points, cache_dir = args.child
+        _child(mode, path, int(max_points), cache_dir)
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "rit.gpx")
+        with open(path, "wb") as fh:
+            fh.write(synthetic_gpx(args.points))
+        cache_dir = os.path.join(tmp, "cache")
+
+        # Elke meting in een vers proces; "track-mmap" leest de tweede keer uit de cache
+        results = []
+        for mode in ("legacy", "track", "track-mmap", "track-mmap"):
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.track_memory", "--child",
+                 mode, path, str(args.max_points), cache_dir],
+                check=True, capture_output=True, text=True,
+            )
+            results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    for r in results:
+        print(f"{r['mode']:<12} {r['seconds']:7.2f}s  piek RSS {r['peak_rss_mb']:8.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
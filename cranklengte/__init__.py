@@ -0,0 +1 @@
+# Rekenlogica achter de pagina "Measurements" (cranklengte), voor één renner of een hele ploeg.
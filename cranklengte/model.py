@@ -0,0 +1,99 @@
+"""Scoremodel en richtlijnen voor de cranklengte, gevectoriseerd over renners.
+
+Alle functies nemen scalars of arrays (één waarde per renner) en rekenen voor
+alle renners en kandidaat-cranklengtes tegelijk: renners op de eerste as,
+cranklengtes op de tweede.
+
+Score = kracht × efficiëntie, met
+    koppel      = vermogen / (2π · cadans / 60)
+    kracht      = koppel / crank (m)
+    efficiëntie = exp(-k · (crank - 170)²)
+"""
+import numpy as np
+
+CRANK_LENGTHS = np.arange(150.0, 181.0, 2.5)   # verkrijgbare lengtes (mm)
+CRANK_BOUNDS = (150.0, 180.0)
+EFFICIENCY_CENTER = 170.0
+EFFICIENCY_K = 0.01
+
+# Binnenbeenlengte (cm) × factor = cranklengte (mm)
+INSEAM_FACTORS = {"conservatief": 1.98, "neutraal": 2.00, "kracht": 2.04}
+
+
+def torque(power, cadence):
+    """Koppel (Nm) bij vermogen (W) en cadans (rpm)."""
+    return np.asarray(power, dtype=np.float64) / (2 * np.pi * np.asarray(cadence, dtype=np.float64) / 60.0)
+
+
+def efficiency(crank):
+    return np.exp(-EFFICIENCY_K * (np.asarray(crank, dtype=np.float64) - EFFICIENCY_CENTER) ** 2)
+
+
+def score(power, cadence, crank):
+    """Kracht × efficiëntie; broadcast zoals NumPy (renners × lengtes met [:, None])."""
+    crank = np.asarray(crank, dtype=np.float64)
+    return torque(power, cadence) / (crank / 1000.0) * efficiency(crank)
+
+
+def score_grid(power, cadence, lengths=CRANK_LENGTHS):
+    """Score per renner (rij) en kandidaat-lengte (kolom) in één broadcast."""
+    power = np.atleast_1d(np.asarray(power, dtype=np.float64))
+    cadence = np.atleast_1d(np.asarray(cadence, dtype=np.float64))
+    return score(power[:, None], cadence[:, None], np.asarray(lengths, dtype=np.float64)[None, :])
+
+
+def optimal_crank(n=1, bounds=CRANK_BOUNDS):
+    """Continu optimum van de score, in gesloten vorm.
+
+    d/dc log(score) = -1/c - 2k(c - c0) = 0  →  c = (c0 + √(c0² - 2/k)) / 2.
+    Het koppel is een constante factor, dus het optimum hangt niet af van vermogen of
+    cadans; er komt één waarde per renner terug zodat de vorm overeenkomt met de rest.
+    """
+    c0, k = EFFICIENCY_CENTER, EFFICIENCY_K
+    best = np.clip((c0 + np.sqrt(c0 ** 2 - 2 / k)) / 2, *bounds)
+    return np.full(n, best)
+
+
+def best_available(grid, lengths=CRANK_LENGTHS):
+    """Beste verkrijgbare lengte per renner (argmax over de rij van het grid)."""
+    return np.asarray(lengths)[np.argmax(grid, axis=1)]
+
+
+def inseam_guidelines(inseam):
+    """{"conservatief", "neutraal", "kracht"} → cranklengte (mm) per renner."""
+    inseam = np.asarray(inseam, dtype=np.float64)
+    return {name: inseam * factor for name, factor in INSEAM_FACTORS.items()}
+
+
+def obree(height):
+    """Graeme Obree: 0,95 × lichaamslengte (cm) → mm."""
+    return np.asarray(height, dtype=np.float64) * 0.95
+
+
+def machine(inseam):
+    """'Machine'-methode: 1,25 × binnenbeenlengte (cm) + 65 → mm."""
+    return 1.25 * np.asarray(inseam, dtype=np.float64) + 65
+
+
+def crank_zone(current, inseam):
+    """"kort", "midden" of "lang" t.o.v. de binnenbeenrichtlijnen."""
+    guide = inseam_guidelines(inseam)
+    current = np.asarray(current, dtype=np.float64)
+    return np.where(current < guide["conservatief"], "kort",
+                    np.where(current > guide["kracht"], "lang", "midden"))
+
+
+def cadence_profile(cadence):
+    cadence = np.asarray(cadence, dtype=np.float64)
+    return np.where(cadence < 85, "kracht", np.where(cadence <= 95, "neutraal", "cadans"))
+
+
+def sprint_profile(sprint_cadence):
+    sprint_cadence = np.asarray(sprint_cadence, dtype=np.float64)
+    return np.where(sprint_cadence >= 120, "hoog", np.where(sprint_cadence >= 100, "neutraal", "laag"))
+
+
+def leg_ratio_profile(femur, tibia):
+    """(femur/tibia, "femur"/"neutraal"/"tibia"); zelfde volgorde van regels als de pagina."""
+    ratio = np.asarray(femur, dtype=np.float64) / np.asarray(tibia, dtype=np.float64)
+    return ratio, np.where(ratio > 1, "femur", np.where(ratio >= 0.95, "neutraal", "tibia"))
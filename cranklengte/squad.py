@@ -0,0 +1,168 @@
+"""Cranklengte voor een hele ploeg uit één CSV, in één gevectoriseerde berekening.
+
+Gebruik:
+    python -m cranklengte.squad ploeg.csv --out ploegrapport.xlsx
+
+CSV-kolommen (komma of puntkomma, decimalen met punt of komma):
+    naam, lengte_cm, inseam_cm, cadans_rpm, vermogen_w     verplicht
+    femur_cm, tibia_cm, crank_mm, sprint_cadans_rpm       optioneel (standaardwaarden
+                                                          zoals op de pagina)
+"""
+import argparse
+import csv
+import io
+import sys
+
+import numpy as np
+
+from imports import lazy
+from cranklengte.model import (
+    CRANK_LENGTHS, best_available, cadence_profile, crank_zone, inseam_guidelines,
+    leg_ratio_profile, machine, obree, optimal_crank, score, score_grid, sprint_profile,
+)
+
+pd = lazy("pandas")
+
+REQUIRED = ["naam", "lengte_cm", "inseam_cm", "cadans_rpm", "vermogen_w"]
+DEFAULTS = {"femur_cm": 40.0, "tibia_cm": 36.0, "crank_mm": 172.5, "sprint_cadans_rpm": 120.0}
+NUMERIC = [c for c in REQUIRED if c != "naam"] + list(DEFAULTS)
+
+
+class SquadError(ValueError):
+    pass
+
+
+ENCODINGS = ("utf-8-sig", "cp1252")  # UTF-8 (met of zonder BOM), anders zoals Excel op Windows bewaart
+
+
+def _decode(source):
+    if hasattr(source, "read"):
+        data = source.read()
+    else:
+        with open(source, "rb") as fh:
+            data = fh.read()
+    if isinstance(data, str):
+        return data
+    for encoding in ENCODINGS:
+        try:
+            return data.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    raise SquadError("Het bestand is geen leesbare tekst-CSV (UTF-8 of Windows-1252).")
+
+
+def read_squad(source):
+    """Ploeg-CSV (pad of bestandsobject) als DataFrame met alle NUMERIC-kolommen als float.
+
+    Elke fout in het bestand wordt een SquadError met een Nederlandse melding.
+    """
+    text = _decode(source)
+    if not text.strip():
+        raise SquadError("Het CSV-bestand is leeg.")
+    try:
+        squad = pd.read_csv(io.StringIO(text), sep=None, engine="python", dtype=str)
+    except (pd.errors.ParserError, pd.errors.EmptyDataError, csv.Error) as exc:
+        raise SquadError(f"Het CSV-bestand kon niet gelezen worden: {exc}") from exc
+    squad.columns = [c.strip().lower() for c in squad.columns]
+    missing = [c for c in REQUIRED if c not in squad.columns]
+    if missing:
+        raise SquadError(f"Ontbrekende kolommen: {', '.join(missing)}")
+
+    squad = squad.dropna(subset=["naam"]).reset_index(drop=True)
+    squad["naam"] = squad["naam"].str.strip()
+    for column in NUMERIC:
+        raw = squad[column] if column in squad else pd.Series(np.nan, index=squad.index)
+        values = pd.to_numeric(raw.astype("string").str.strip().str.replace(",", ".", regex=False),
+                               errors="coerce")
+        if column in DEFAULTS:
+            values = values.fillna(DEFAULTS[column])
+        elif values.isna().any():
+            rows = ", ".join(squad.loc[values.isna(), "naam"].astype(str))
+            raise SquadError(f"Ongeldige of lege waarde in '{column}' voor: {rows}")
+        squad[column] = values.astype(np.float64)
+    return squad
+
+
+def evaluate(squad, lengths=CRANK_LENGTHS):
+    """Richtlijnen, optimum en score per renner; één rij per renner.
+
+    Het scoregrid (renners × lengtes) wordt één keer berekend; de beste verkrijgbare
+    lengte is de argmax per rij, het continue optimum komt uit de gesloten vorm.
+    """
+    power = squad["vermogen_w"].to_numpy()
+    cadence = squad["cadans_rpm"].to_numpy()
+    inseam = squad["inseam_cm"].to_numpy()
+    current = squad["crank_mm"].to_numpy()
+
+    grid = score_grid(power, cadence, lengths)
+    optimum = optimal_crank(len(squad))
+    guide = inseam_guidelines(inseam)
+    ratio, leg = leg_ratio_profile(squad["femur_cm"].to_numpy(), squad["tibia_cm"].to_numpy())
+    current_score = score(power, cadence, current)
+    best_score = score(power, cadence, optimum)
+
+    return pd.DataFrame({
+        "naam": squad["naam"].to_numpy(),
+        "huidige_crank_mm": current,
+        "zone": crank_zone(current, inseam),
+        "conservatief_mm": guide["conservatief"],
+        "neutraal_mm": guide["neutraal"],
+        "kracht_mm": guide["kracht"],
+        "obree_mm": obree(squad["lengte_cm"].to_numpy()),
+        "machine_mm": machine(inseam),
+        "optimaal_mm": optimum,
+        "beste_verkrijgbaar_mm": best_available(grid, lengths),
+        "score_huidig": current_score,
+        "score_optimaal": best_score,
+        "winst_pct": (best_score / current_score - 1) * 100,
+        "cadansprofiel": cadence_profile(cadence),
+        "sprintprofiel": sprint_profile(squad["sprint_cadans_rpm"].to_numpy()),
+        "femur_tibia": ratio,
+        "beendominantie": leg,
+    })
+
+
+def team_report(results, squad=None):
+    """Excel-rapport (bytes): blad "Ploeg" met de resultaten, "Invoer" met de CSV."""
+    buf = io.BytesIO()
+    with pd.ExcelWriter(buf, engine="openpyxl") as writer:
+        results.round(2).to_excel(writer, sheet_name="Ploeg", index=False)
+        if squad is not None:
+            squad.to_excel(writer, sheet_name="Invoer", index=False)
+    return buf.getvalue()
+
+
+def template_csv():
+    """Voorbeeld-CSV met alle kolommen (bytes)."""
+    # Met de csv-module: de pagina toont dit bij elk bezoek, zonder pandas te laden
+    example = {"naam": "Renner 1", "lengte_cm": 180, "inseam_cm": 86, "cadans_rpm": 90, "vermogen_w": 250,
+               "femur_cm": 40, "tibia_cm": 36, "crank_mm": 172.5, "sprint_cadans_rpm": 120}
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=list(example), lineterminator="\n")
+    writer.writeheader()
+    writer.writerow(example)
+    return buf.getvalue().encode("utf-8")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cranklengte-advies voor een ploeg uit een CSV.")
+    parser.add_argument("csv", help="ploeg-CSV (zie de kolommen bovenaan cranklengte/squad.py)")
+    parser.add_argument("--out", default="ploegrapport.xlsx", help="Excel-rapport (standaard: ploegrapport.xlsx)")
+    args = parser.parse_args(argv)
+
+    try:
+        squad = read_squad(args.csv)
+    except SquadError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    results = evaluate(squad)
+    with open(args.out, "wb") as fh:
+        fh.write(team_report(results, squad))
+    print(results[["naam", "huidige_crank_mm", "optimaal_mm", "beste_verkrijgbaar_mm", "winst_pct"]]
+          .round(1).to_string(index=False))
+    print(f"{len(results)} renners → {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+# Rekenlogica achter de pagina "Genereer Hoogteprofiel".
@@ -0,0 +1,255 @@
+"""Hoogteprofielen voor een map met GPX/FIT-routes in één keer genereren.
+
+Gebruik:
+    python -m hoogteprofiel.batch routes/ --out profielen/ --format png pdf --workers 4
+    python -m hoogteprofiel.batch routes/ --format svg --sheet A4   # + printvel sheet.pdf
+
+Per route wordt naast het GPX/FIT-bestand optioneel een bestand met dezelfde naam
+gezocht:
+    etappe1.csv   kolommen name,km[,color]
+    etappe1.yaml  {keypoints: [{name, km, color}], style: {...}, settings: {...}}
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, replace
+
+from hoogteprofiel.dem import DemSampler, correct_elevation
+from hoogteprofiel.pipeline import (
+    DEFAULT_KEYPOINT_COLOR, EXPORT_SCALE, Keypoint, ProfileSettings, ProfileStyle,
+    PARSERS, build_figure, load_track, place_keypoints, resample, smooth_profile,
+)
+from hoogteprofiel.render_service import render_in_process
+from hoogteprofiel.vector_export import PAPER_SIZES_CM, SheetProfile, render_profile, render_sheet
+
+# SVG/PDF worden met matplotlib getekend (geen headless browser nodig), PNG via Kaleido
+VECTOR_FORMATS = ("svg", "pdf")
+
+
+# --- Keypoint/stijl-bestanden per route ---
+def _read_csv(path):
+    with open(path, newline="", encoding="utf-8") as fh:
+        rows = list(csv.DictReader(fh))
+    return {"keypoints": rows}
+
+
+def _read_yaml(path):
+    # ValueError i.p.v. SystemExit: draait in een worker, dus enkel deze route faalt
+    try:
+        import yaml
+    except ImportError:
+        raise ValueError(f"PyYAML is nodig om {path} te lezen (pip install pyyaml)") from None
+    with open(path, encoding="utf-8") as fh:
+        return yaml.safe_load(fh) or {}
+
+
+def load_route_config(route_path):
+    stem = os.path.splitext(route_path)[0]
+    for ext, reader in ((".yaml", _read_yaml), (".yml", _read_yaml), (".csv", _read_csv)):
+        if os.path.exists(stem + ext):
+            return reader(stem + ext)
+    return {}
+
+
+def _keypoints_from_config(config):
+    return [
+        Keypoint(str(row["name"]).strip(), float(row["km"]), row.get("color") or DEFAULT_KEYPOINT_COLOR)
+        for row in config.get("keypoints") or []
+        if str(row.get("name", "")).strip()
+    ]
+
+
+# --- Eén route verwerken (draait in een worker-proces) ---
+_dem_samplers = {}
+
+
+def _dem_sampler(directory):
+    # Eén sampler per worker en map, zodat geopende tegels over de routes heen hergebruikt worden
+    if directory not in _dem_samplers:
+        _dem_samplers[directory] = DemSampler(directory)
+    return _dem_samplers[directory]
+
+
+def process_route(route_path, out_dir, formats, settings, style, keep_profile=False, dem_dir=None):
+    config = load_route_config(route_path)
+    settings = replace(settings, **(config.get("settings") or {}))
+    style = replace(style, **(config.get("style") or {}))
+
+    timings = {}
+
+    def timed(stage, fn, *args):
+        start = time.perf_counter()
+        result = fn(*args)
+        timings[stage] = time.perf_counter() - start
+        return result
+
+    track = timed("parse", load_track, route_path)
+    if dem_dir:
+        track, _ = timed("dem", correct_elevation, track, _dem_sampler(dem_dir))
+    dist, elev = timed("resample", resample, track, settings)
+    smooth_elev = timed("smooth", smooth_profile, elev, settings)
+    keypoints = timed("keypoints", place_keypoints, dist, smooth_elev, _keypoints_from_config(config))
+
+    name = os.path.splitext(os.path.basename(route_path))[0]
+    outputs = []
+    fig_json = None
+    for fmt in formats:
+        if fmt in VECTOR_FORMATS:
+            img = timed(f"export_{fmt}", render_profile, dist, smooth_elev, keypoints, style, fmt)
+        else:
+            if fig_json is None:
+                fig_json = timed("figure", build_figure, dist, smooth_elev, keypoints, style).to_json()
+            img, seconds, _ = render_in_process(fig_json, fmt, style.px_width, style.px_height, EXPORT_SCALE)
+            timings[f"export_{fmt}"] = seconds
+        out_path = os.path.join(out_dir, f"{name}.{fmt}")
+        with open(out_path, "wb") as fh:
+            fh.write(img)
+        outputs.append(out_path)
+
+    result = {"route": route_path, "points": len(track), "outputs": outputs, "timings": timings}
+    if keep_profile:
+        # Voor het printvel; het hoofdproces haalt dit er terug uit vóór het JSON-rapport
+        result["profile"] = SheetProfile(dist, smooth_elev, keypoints, style, name)
+    return result
+
+
+def find_routes(directory):
+    return sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if os.path.splitext(name)[1].lower() in PARSERS
+    )
+
+
+def _duplicate_stems(routes):
+    # etappe1.gpx en etappe1.fit zouden elkaars etappe1.png overschrijven en
+    # hetzelfde etappe1.yaml/.csv oppikken; hoofdletters tellen niet (Windows/macOS)
+    by_stem = {}
+    for path in routes:
+        by_stem.setdefault(os.path.splitext(path)[0].lower(), []).append(path)
+    return {
+        path: [os.path.basename(p) for p in paths if p != path]
+        for paths in by_stem.values() if len(paths) > 1
+        for path in paths
+    }
+
+
+def run_batch(routes, out_dir, formats=("png",), settings=None, style=None, workers=None,
+              keep_profiles=False, dem_dir=None):
+    settings = settings or ProfileSettings()
+    style = style or ProfileStyle()
+    os.makedirs(out_dir, exist_ok=True)
+
+    duplicates = _duplicate_stems(routes)
+    results = [
+        {"route": path, "error": f"zelfde naam als {', '.join(others)}; hernoem een van de bestanden"}
+        for path, others in duplicates.items()
+    ]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(process_route, path, out_dir, formats, settings, style, keep_profiles, dem_dir): path
+            for path in routes if path not in duplicates
+        }
+        for future in as_completed(futures):
+            try:
+                results.append(future.result())
+            except Exception as exc:
+                results.append({"route": futures[future], "error": f"{type(exc).__name__}: {exc}"})
+    return sorted(results, key=lambda r: r["route"])
+
+
+def write_sheet(results, out_path, paper="A4", landscape=False):
+    """Alle gelukte routes als stickers op één of meer printvellen (PDF).
+
+    ValueError als er geen gelukte routes zijn of een kaartje niet op het papier past.
+    """
+    profiles = [r.pop("profile") for r in results if "profile" in r]
+    if not profiles:
+        raise ValueError("geen gelukte routes om op het printvel te zetten")
+    start = time.perf_counter()
+    data = render_sheet(profiles, paper, landscape, fmt="pdf")
+    with open(out_path, "wb") as fh:
+        fh.write(data)
+    return time.perf_counter() - start
+
+
+def _print_report(results, wall):
+    for r in results:
+        route = os.path.basename(r["route"])
+        if "error" in r:
+            print(f"{route:<30} FOUT  {r['error']}")
+            continue
+        total = sum(r["timings"].values())
+        stages = "  ".join(f"{k}={v * 1000:.0f}ms" for k, v in r["timings"].items())
+        print(f"{route:<30} {r['points']:>8} ptn  {total:6.2f}s  {stages}")
+    print(f"{len(results)} routes in {wall:.2f}s")
+
+
+def main(argv=None):
+    defaults_settings = ProfileSettings()
+    defaults_style = ProfileStyle()
+
+    parser = argparse.ArgumentParser(description="Genereer hoogteprofielen voor een map met GPX/FIT-bestanden.")
+    parser.add_argument("routes", help="map met .gpx/.fit bestanden")
+    parser.add_argument("--out", default="profielen", help="uitvoermap (standaard: profielen)")
+    parser.add_argument("--format", nargs="+", default=["png"], choices=["png", "pdf", "svg"])
+    parser.add_argument("--workers", type=int, default=None, help="aantal processen (standaard: aantal CPU's)")
+    parser.add_argument("--timings", help="schrijf de timings per route naar dit JSON-bestand")
+    parser.add_argument("--max-points", type=int, default=defaults_settings.max_points)
+    parser.add_argument("--method", default=defaults_settings.downsample_method)
+    parser.add_argument("--window", type=int, default=defaults_settings.window_length)
+    parser.add_argument("--smoother", default=defaults_settings.smoother)
+    parser.add_argument("--color", default=defaults_style.line_color)
+    parser.add_argument("--line-width", type=int, default=defaults_style.line_width)
+    parser.add_argument("--width-cm", type=float, default=defaults_style.cm_width)
+    parser.add_argument("--height-cm", type=float, default=defaults_style.cm_height)
+    parser.add_argument("--tick-interval", type=int, default=defaults_style.tick_interval)
+    parser.add_argument("--mirror", action="store_true")
+    parser.add_argument("--gradient", action="store_true", help="vlak onder het profiel inkleuren volgens de helling")
+    parser.add_argument("--dem", help="map met SRTM .hgt/GeoTIFF-tegels om de hoogtes mee te corrigeren")
+    parser.add_argument("--sheet", choices=sorted(PAPER_SIZES_CM), help="alle profielen ook op een printvel (sheet.pdf)")
+    parser.add_argument("--landscape", action="store_true", help="printvel liggend")
+    args = parser.parse_args(argv)
+
+    settings = ProfileSettings(args.max_points, args.method, args.window, args.smoother)
+    style = ProfileStyle(args.color, args.line_width, args.width_cm, args.height_cm,
+                         args.mirror, args.tick_interval, args.gradient)
+
+    routes = find_routes(args.routes)
+    if not routes:
+        print(f"Geen .gpx of .fit bestanden gevonden in {args.routes}", file=sys.stderr)
+        return 1
+
+    start = time.perf_counter()
+    results = run_batch(routes, args.out, args.format, settings, style, args.workers,
+                        keep_profiles=bool(args.sheet), dem_dir=args.dem)
+    sheet_error = None
+    if args.sheet:
+        sheet_path = os.path.join(args.out, "sheet.pdf")
+        try:
+            sheet_s = write_sheet(results, sheet_path, args.sheet, args.landscape)
+        except ValueError as exc:
+            sheet_error = str(exc)
+            for r in results:
+                r.pop("profile", None)  # niet JSON-serialiseerbaar
+    wall = time.perf_counter() - start
+    _print_report(results, wall)
+    if sheet_error:
+        print(f"Printvel {args.sheet} niet gemaakt: {sheet_error}", file=sys.stderr)
+    elif args.sheet:
+        print(f"Printvel {args.sheet}: {sheet_path} ({sheet_s:.2f}s)")
+
+    if args.timings:
+        with open(args.timings, "w", encoding="utf-8") as fh:
+            json.dump({"wall_s": wall, "settings": asdict(settings), "style": asdict(style),
+                       "routes": results}, fh, indent=2)
+
+    return 1 if sheet_error or any("error" in r for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,294 @@
+"""Hoogtes corrigeren met een lokaal terreinmodel (DEM) uit SRTM .hgt- of GeoTIFF-tegels.
+
+Tegels worden gememory-mapt: enkel de pagina's rond de track worden gelezen. Alle
+trackpunten worden in één keer bilineair geïnterpoleerd, per tegel gegroepeerd.
+
+    .hgt      SRTM, naam = zuidwestelijke hoek (N50E003.hgt), big-endian int16,
+              1201² (3") of 3601² (1") pixels, rij 0 = noordrand
+    .tif      GeoTIFF in graden (EPSG:4326), ongecomprimeerd met aaneengesloten strips;
+              gecomprimeerde of getegelde bestanden enkel als `tifffile` geïnstalleerd is
+"""
+import dataclasses
+import os
+import re
+import struct
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from hoogteprofiel.gpx_ingest import step_distances
+
+DEFAULT_DIR = os.environ.get("HOOGTEPROFIEL_DEM_DIR", "")
+DEFAULT_OPEN_TILES = 16
+SRTM_VOID = -32768
+
+_HGT_NAME = re.compile(r"^([NS])(\d{2})([EW])(\d{3})\.hgt$", re.IGNORECASE)
+
+
+class DemError(ValueError):
+    pass
+
+
+@dataclasses.dataclass
+class DemTile:
+    """Raster met de coördinaat van het middelpunt van pixel (0, 0) en de pixelgrootte in graden."""
+
+    data: np.ndarray
+    top: float
+    left: float
+    step_lat: float
+    step_lon: float
+    nodata: float = None
+
+    @property
+    def bounds(self):
+        rows, cols = self.data.shape
+        return (self.top - (rows - 1) * self.step_lat, self.left,
+                self.top, self.left + (cols - 1) * self.step_lon)
+
+    def sample(self, lat, lon):
+        """Bilineaire interpolatie; NaN buiten de tegel of naast een nodata-pixel."""
+        rows, cols = self.data.shape
+        r = (self.top - lat) / self.step_lat
+        c = (lon - self.left) / self.step_lon
+        inside = (r >= 0) & (r <= rows - 1) & (c >= 0) & (c <= cols - 1)
+
+        r0 = np.clip(np.floor(r).astype(np.intp), 0, rows - 2)
+        c0 = np.clip(np.floor(c).astype(np.intp), 0, cols - 2)
+        fr = (r - r0)[:, None]
+        fc = c - c0
+
+        # Vier hoeken in één fancy-index: enkel die pagina's van de memmap worden gelezen
+        rr = np.stack([r0, r0, r0 + 1, r0 + 1], axis=1)
+        cc = np.stack([c0, c0 + 1, c0, c0 + 1], axis=1)
+        corners = self.data[rr, cc].astype(np.float64)
+        if self.nodata is not None:
+            corners[corners == self.nodata] = np.nan
+
+        top = corners[:, 0] * (1 - fc) + corners[:, 1] * fc
+        bottom = corners[:, 2] * (1 - fc) + corners[:, 3] * fc
+        out = top * (1 - fr[:, 0]) + bottom * fr[:, 0]
+        out[~inside] = np.nan
+        return out
+
+
+# --- Tegels openen ---
+def _hgt_corner(name):
+    # "N50E003.hgt" -> (50, 3); None als het geen SRTM-tegelnaam is
+    match = _HGT_NAME.match(name)
+    if not match:
+        return None
+    ns, lat, ew, lon = match.groups()
+    return int(lat) * (1 if ns.upper() == "N" else -1), int(lon) * (1 if ew.upper() == "E" else -1)
+
+
+def open_hgt(path):
+    corner = _hgt_corner(os.path.basename(path))
+    if corner is None:
+        raise DemError(f"Geen SRTM-tegelnaam: {path}")
+    south, west = corner
+
+    size = int(round((os.path.getsize(path) / 2) ** 0.5))
+    if size * size * 2 != os.path.getsize(path):
+        raise DemError(f"Onverwachte grootte voor een .hgt-tegel: {path}")
+    data = np.memmap(path, dtype=">i2", mode="r", shape=(size, size))
+    step = 1.0 / (size - 1)
+    return DemTile(data, top=south + 1.0, left=float(west), step_lat=step, step_lon=step, nodata=SRTM_VOID)
+
+
+# TIFF-tags die we nodig hebben
+_TIFF_TYPES = {1: "B", 2: "s", 3: "H", 4: "I", 11: "f", 12: "d", 16: "Q"}
+_SAMPLE_DTYPES = {(1, 8): "u1", (1, 16): "u2", (1, 32): "u4", (2, 8): "i1", (2, 16): "i2",
+                  (2, 32): "i4", (3, 32): "f4", (3, 64): "f8"}
+
+
+def _tiff_tags(path):
+    # Eerste IFD lezen (klassieke TIFF en BigTIFF), zonder de pixels aan te raken
+    with open(path, "rb") as fh:
+        head = fh.read(16)
+        endian = {b"II": "<", b"MM": ">"}.get(head[:2])
+        if endian is None:
+            raise DemError(f"Geen TIFF-bestand: {path}")
+        version = struct.unpack(endian + "H", head[2:4])[0]
+        if version == 42:
+            offset = struct.unpack(endian + "I", head[4:8])[0]
+            count_fmt, entry_fmt, entry_size, inline = "H", "HHI", 12, 4
+        elif version == 43:
+            offset = struct.unpack(endian + "Q", head[8:16])[0]
+            count_fmt, entry_fmt, entry_size, inline = "Q", "HHQ", 20, 8
+        else:
+            raise DemError(f"Onbekende TIFF-versie in {path}")
+
+        fh.seek(offset)
+        n = struct.unpack(endian + count_fmt, fh.read(struct.calcsize(count_fmt)))[0]
+        entries = fh.read(n * entry_size)
+        tags = {}
+        for i in range(n):
+            entry = entries[i * entry_size:(i + 1) * entry_size]
+            tag, typ, count = struct.unpack(endian + entry_fmt, entry[:struct.calcsize(entry_fmt)])
+            if typ not in _TIFF_TYPES:
+                continue
+            fmt = _TIFF_TYPES[typ]
+            nbytes = struct.calcsize(fmt) * count
+            raw = entry[-inline:]
+            if nbytes > inline:
+                fh.seek(struct.unpack(endian + ("I" if inline == 4 else "Q"), raw)[0])
+                raw = fh.read(nbytes)
+            if typ == 2:
+                tags[tag] = raw[:nbytes].rstrip(b"\0").decode("ascii", "replace")
+            else:
+                tags[tag] = struct.unpack(f"{endian}{count}{fmt}", raw[:nbytes])
+    return endian, tags
+
+
+# GeoKeyDirectory (tag 34735): GTRasterTypeGeoKey zegt waar het tiepoint in de pixel ligt
+GEO_KEY_DIRECTORY = 34735
+GT_RASTER_TYPE = 1025
+RASTER_PIXEL_IS_AREA, RASTER_PIXEL_IS_POINT = 1, 2
+
+
+def _raster_type(tags):
+    # Kop van 4 shorts, dan per sleutel (KeyID, TIFFTagLocation, Count, waarde);
+    # zonder sleutel geldt de standaard PixelIsArea
+    keys = tags.get(GEO_KEY_DIRECTORY, ())
+    for i in range(4, len(keys) - 3, 4):
+        key_id, location, _, value = keys[i:i + 4]
+        if key_id == GT_RASTER_TYPE and location == 0:
+            return value
+    return RASTER_PIXEL_IS_AREA
+
+
+def open_geotiff(path):
+    """GeoTIFF-tegel openen; ongecomprimeerde aaneengesloten strips worden gememory-mapt.
+
+    Andere bestanden gaan via tifffile: `tifffile.memmap` waar het formaat dat toelaat,
+    anders (gecomprimeerd, getegeld) `tifffile.imread`, dat de hele raster in het
+    geheugen laadt.
+    """
+    endian, tags = _tiff_tags(path)
+    if 33550 not in tags or 33922 not in tags:
+        raise DemError(f"Geen georeferentie (ModelPixelScale/ModelTiepoint) in {path}")
+    width, height = tags[256][0], tags[257][0]
+    scale_x, scale_y = tags[33550][:2]
+    tie_i, tie_j, _, tie_x, tie_y, _ = tags[33922][:6]
+    nodata = float(tags[42113]) if 42113 in tags else None
+
+    strips, counts = tags.get(273), tags.get(279)
+    bits = tags.get(258, (16,))[0]
+    sample_format = tags.get(339, (1,))[0]
+    dtype = _SAMPLE_DTYPES.get((sample_format, bits))
+    contiguous = (
+        strips is not None and counts is not None and tags.get(259, (1,))[0] == 1
+        and tags.get(277, (1,))[0] == 1 and dtype is not None
+        and all(strips[i] + counts[i] == strips[i + 1] for i in range(len(strips) - 1))
+    )
+    if contiguous:
+        data = np.memmap(path, dtype=np.dtype(dtype).newbyteorder(endian), mode="r",
+                         offset=strips[0], shape=(height, width))
+    else:
+        try:
+            import tifffile
+        except ImportError:
+            raise DemError(f"{path} is gecomprimeerd of getegeld; installeer tifffile (pip install tifffile)")
+        try:
+            data = tifffile.memmap(path, mode="r")
+        except ValueError:
+            data = tifffile.imread(path)
+
+    # PixelIsArea: het tiepoint is de hoek van de pixel, PixelIsPoint: het middelpunt.
+    # Wij rekenen met middelpunten, dus enkel bij PixelIsArea een halve pixel opschuiven
+    offset = 0.5 if _raster_type(tags) == RASTER_PIXEL_IS_AREA else 0.0
+    top = tie_y - (offset - tie_j) * scale_y
+    left = tie_x + (offset - tie_i) * scale_x
+    return DemTile(data, top=top, left=left, step_lat=scale_y, step_lon=scale_x, nodata=nodata)
+
+
+# --- Sampler over een map met tegels ---
+class DemSampler:
+    """Hoogte uit alle tegels in een map, met een LRU-cache van geopende (gememory-mapte) tegels."""
+
+    def __init__(self, directory=DEFAULT_DIR, max_open_tiles=DEFAULT_OPEN_TILES):
+        self.directory = directory
+        self.max_open_tiles = max_open_tiles
+        self._open = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "opens": 0}
+
+        # .hgt-tegels op (zuid, west); GeoTIFF's met hun grenzen (header lezen is goedkoop)
+        self._hgt = {}
+        self._tiffs = []
+        for name in sorted(os.listdir(directory)) if directory and os.path.isdir(directory) else []:
+            path = os.path.join(directory, name)
+            corner = _hgt_corner(name)
+            if corner is not None:
+                self._hgt[corner] = path
+            elif name.lower().endswith((".tif", ".tiff")):
+                try:
+                    self._tiffs.append((path, self._tile(path).bounds))
+                except DemError:
+                    continue
+
+    def __len__(self):
+        return len(self._hgt) + len(self._tiffs)
+
+    def _tile(self, path):
+        with self._lock:
+            if path in self._open:
+                self._open.move_to_end(path)
+                self.stats["hits"] += 1
+                return self._open[path]
+        tile = open_hgt(path) if path.lower().endswith(".hgt") else open_geotiff(path)
+        with self._lock:
+            self.stats["opens"] += 1
+            self._open[path] = tile
+            while len(self._open) > self.max_open_tiles:
+                self._open.popitem(last=False)
+        return tile
+
+    def sample(self, lat, lon):
+        """Hoogte (m) voor alle punten; NaN waar geen tegel of enkel nodata is."""
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        out = np.full(len(lat), np.nan)
+
+        if self._hgt:
+            # Punten per 1°-tegel groeperen; een route raakt er doorgaans maar een paar
+            south = np.floor(lat).astype(np.int64)
+            west = np.floor(lon).astype(np.int64)
+            cells, inverse = np.unique((south + 90) * 360 + (west + 180), return_inverse=True)
+            order = np.argsort(inverse, kind="stable")
+            bounds = np.searchsorted(inverse[order], np.arange(len(cells) + 1))
+            for i, cell in enumerate(cells):
+                path = self._hgt.get((int(cell // 360) - 90, int(cell % 360) - 180))
+                if path is not None:
+                    idx = order[bounds[i]:bounds[i + 1]]
+                    out[idx] = self._tile(path).sample(lat[idx], lon[idx])
+
+        for path, (south, west, north, east) in self._tiffs:
+            todo = np.isnan(out) & (lat >= south) & (lat <= north) & (lon >= west) & (lon <= east)
+            if todo.any():
+                idx = np.flatnonzero(todo)
+                out[idx] = self._tile(path).sample(lat[idx], lon[idx])
+        return out
+
+
+def correct_elevation(track, sampler):
+    """Track met DEM-hoogtes; waar het terreinmodel niets heeft blijft de GPS-hoogte staan.
+
+    De afstand telt de hoogteverschillen mee (3D), dus die wordt bijgewerkt met het
+    verschil in stapafstand tussen de oude en de nieuwe hoogtes. Voor een GPX is dat
+    hetzelfde als herberekenen; bij een FIT blijft de afstand van het toestel de basis.
+    Geeft (track, aandeel gecorrigeerde punten) terug.
+    """
+    lat, lon = track.lat, track.lon
+    dem = sampler.sample(lat, lon)
+    valid = ~np.isnan(dem)
+    if not valid.any():
+        return track, 0.0
+    ele = np.where(valid, dem, track.ele).astype(track.ele.dtype)
+
+    delta = step_distances(lat, lon, ele.astype(np.float64)) - step_distances(lat, lon, track.ele.astype(np.float64))
+    delta[track.segment_start[1:]] = 0.0  # tussen segmenten wordt niet geteld
+    dist_km = track.dist_km + np.concatenate(([0.0], np.cumsum(delta))) / 1000
+    return dataclasses.replace(track, ele=ele, dist_km=dist_km.astype(track.dist_km.dtype)), float(valid.mean())
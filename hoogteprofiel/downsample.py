@@ -0,0 +1,134 @@
+import numpy as np
+
+# Beschikbare methodes (sleutel -> label in de sidebar)
+METHODS = {
+    "uniform": "Gelijke afstand (resample)",
+    "lttb": "LTTB (behoudt pieken)",
+    "rdp": "Douglas–Peucker (behoudt knikpunten)",
+    "stride": "Elke n-de punt",
+}
+
+
+def downsample(dist, ele, max_points, method="uniform"):
+    """Herleid een profiel tot hoogstens max_points punten; geeft (afstand, hoogte) terug.
+
+    Het dtype van de invoer blijft behouden (float32 bij een Track); de
+    stride-methode geeft views terug op de oorspronkelijke arrays.
+    """
+    dist = np.asarray(dist)
+    ele = np.asarray(ele)
+
+    # Punten zonder hoogte kunnen niet geplot of gladgestreken worden
+    valid = np.isfinite(ele)
+    if not valid.all():
+        dist, ele = dist[valid], ele[valid]
+
+    if method == "uniform":
+        return resample_uniform(dist, ele, max_points)
+    if method == "lttb":
+        idx = lttb_indices(dist, ele, max_points)
+    elif method == "rdp":
+        idx = rdp_indices(dist, ele, max_points)
+    elif method == "stride":
+        step = max(1, len(dist) // max_points)
+        return dist[::step], ele[::step]
+    else:
+        raise ValueError(f"Onbekende downsample-methode: {method}")
+    return dist[idx], ele[idx]
+
+
+def resample_uniform(dist, ele, max_points):
+    """Lineair herbemonsteren op een rooster met vaste afstand tussen de punten."""
+    if len(dist) <= 2:
+        return dist, ele
+    grid = np.linspace(dist[0], dist[-1], min(max_points, len(dist)))
+    return grid.astype(dist.dtype), np.interp(grid, dist, ele).astype(ele.dtype)
+
+
+def lttb_indices(x, y, max_points):
+    """Largest-Triangle-Three-Buckets, volledig gevectoriseerd.
+
+    Per bucket wordt het punt gekozen dat de grootste driehoek vormt met het
+    gemiddelde van de vorige en de volgende bucket. Het gemiddelde als linker
+    anker (i.p.v. het vorige gekozen punt) maakt alle buckets onafhankelijk.
+    """
+    n = len(x)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+
+    # Eerste en laatste punt blijven altijd behouden; de rest in max_points - 2 buckets
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    edges = np.unique(edges)
+    starts = edges[:-1]
+    counts = np.diff(edges)
+    bucket = np.repeat(np.arange(len(starts)), counts)
+
+    mean_x = np.add.reduceat(x[1:n - 1], starts - 1) / counts
+    mean_y = np.add.reduceat(y[1:n - 1], starts - 1) / counts
+
+    # Ankers per bucket: gemiddelde links en rechts (randen: eerste/laatste punt)
+    left_x = np.concatenate(([x[0]], mean_x[:-1]))
+    left_y = np.concatenate(([y[0]], mean_y[:-1]))
+    right_x = np.concatenate((mean_x[1:], [x[-1]]))
+    right_y = np.concatenate((mean_y[1:], [y[-1]]))
+
+    px, py = x[1:n - 1], y[1:n - 1]
+    lx, ly = left_x[bucket], left_y[bucket]
+    rx, ry = right_x[bucket], right_y[bucket]
+    area = np.abs((lx - rx) * (py - ly) - (lx - px) * (ry - ly))
+
+    picked = _argmax_per_group(area, starts - 1, bucket) + 1
+
+    return np.concatenate(([0], picked, [n - 1]))
+
+
+def rdp_indices(x, y, max_points, epsilon=0.0):
+    """Ramer–Douglas–Peucker met een puntenbudget.
+
+    Alle segmenten worden per iteratie tegelijk verwerkt. De afwijking is de
+    verticale afstand (in m) tot de koorde, wat voor een hoogteprofiel de
+    relevante fout is. Segmenten met de grootste fout worden eerst gesplitst
+    tot het budget op is; het aantal iteraties groeit met log(n).
+    """
+    n = len(x)
+    if max_points >= n or max_points < 2:
+        return np.arange(n)
+
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    kept = 2
+    positions = np.arange(n)
+
+    while kept < max_points:
+        anchors = np.flatnonzero(keep)
+        seg = np.searchsorted(anchors, positions, side="right") - 1
+        seg = np.minimum(seg, len(anchors) - 2)
+        a, b = anchors[seg], anchors[seg + 1]
+
+        span = x[b] - x[a]
+        t = np.divide(x - x[a], span, out=np.zeros(n), where=span != 0)
+        err = np.abs(y - (y[a] + t * (y[b] - y[a])))
+        err[keep] = -1.0
+
+        # Grootste fout per segment en waar die ligt
+        best = _argmax_per_group(err, anchors[:-1], seg)
+        best_err = err[best]
+
+        candidates = best[best_err > epsilon]
+        if len(candidates) == 0:
+            break
+        budget = max_points - kept
+        if len(candidates) > budget:
+            candidates = candidates[np.argsort(-err[candidates])[:budget]]
+        keep[candidates] = True
+        kept += len(candidates)
+
+    return np.flatnonzero(keep)
+
+
+def _argmax_per_group(values, starts, group):
+    # Groepen zijn aaneengesloten (starts oplopend); eerste positie van het maximum per groep
+    group_max = np.maximum.reduceat(values, starts)
+    hits = np.flatnonzero(values == group_max[group])
+    _, first = np.unique(group[hits], return_index=True)
+    return hits[first]
@@ -0,0 +1,250 @@
+import numpy as np
+
+from hoogteprofiel.gpx_ingest import cumulative_distance_km
+from hoogteprofiel.track import Track
+
+# --- FIT-protocol constantes ---
+FIT_EPOCH_S = 631065600          # 1989-12-31T00:00:00Z in Unix-seconden
+SEMICIRCLE_TO_DEG = 180.0 / 2**31
+RECORD_MESG = 20
+
+# Velden van het record-bericht: nummer -> (naam, basistype-grootte)
+RECORD_FIELDS = {
+    253: "timestamp",
+    0: "position_lat",
+    1: "position_long",
+    2: "altitude",
+    5: "distance",
+    78: "enhanced_altitude",
+}
+
+# FIT-basistypes: code -> (numpy-type, ongeldige waarde)
+BASE_TYPES = {
+    0x00: ("u1", 0xFF), 0x01: ("i1", 0x7F), 0x02: ("u1", 0xFF),
+    0x83: ("i2", 0x7FFF), 0x84: ("u2", 0xFFFF), 0x85: ("i4", 0x7FFFFFFF),
+    0x86: ("u4", 0xFFFFFFFF), 0x88: ("f4", None), 0x89: ("f8", None),
+    0x0A: ("u1", 0x00), 0x8B: ("u2", 0x0000), 0x8C: ("u4", 0x00000000),
+    0x8E: ("i8", 0x7FFFFFFFFFFFFFFF), 0x8F: ("u8", 0xFFFFFFFFFFFFFFFF),
+}
+
+
+class FitError(ValueError):
+    pass
+
+
+def _read_source(source):
+    if hasattr(source, "read"):
+        if hasattr(source, "seek"):
+            source.seek(0)
+        return source.read()
+    with open(source, "rb") as fh:
+        return fh.read()
+
+
+def _record_dtype(fields, arch, size):
+    # Structured dtype met enkel de velden die we nodig hebben, op hun byte-offset
+    endian = ">" if arch == 1 else "<"
+    names, formats, offsets, invalid = [], [], [], {}
+    offset = 0
+    for num, fsize, base in fields:
+        name = RECORD_FIELDS.get(num)
+        base_type = BASE_TYPES.get(base)
+        if name and base_type and np.dtype(base_type[0]).itemsize == fsize:
+            names.append(name)
+            formats.append(endian + base_type[0])
+            offsets.append(offset)
+            invalid[name] = base_type[1]
+        offset += fsize
+    dtype = np.dtype({"names": names, "formats": formats, "offsets": offsets, "itemsize": size})
+    return dtype, invalid
+
+
+def _need(pos, size, end):
+    # Elke kop en elk bericht moet volledig binnen de data liggen, anders IndexError
+    # of een record dat in de CRC (of voorbij het einde) leest
+    if pos + size > end:
+        raise FitError("Onvolledig FIT-bestand")
+
+
+def _scan(buf):
+    """Eén lus over de berichtkoppen: enkel offsets van record-berichten verzamelen.
+
+    Geeft per record-definitie (dtype, offsets, compressed-time offsets) terug;
+    het eigenlijke decoderen gebeurt daarna gevectoriseerd met NumPy. Een afgekapt
+    of corrupt bestand geeft een FitError, geen IndexError.
+    """
+    n = len(buf)
+    pos = 0
+    groups = []  # [(dtype, ongeldige waarden, [offsets], [ctime])] in volgorde van definitie
+    order = []   # (group, index) per record, om de oorspronkelijke volgorde te bewaren
+
+    _need(0, 12, n)
+    while pos + 12 <= n:
+        header_size = buf[pos]
+        data_size = int.from_bytes(buf[pos + 4:pos + 8], "little")
+        if header_size < 12 or buf[pos + 8:pos + 12] != b".FIT":
+            raise FitError("Geen geldig FIT-bestand")
+        pos += header_size
+        end = pos + data_size
+        _need(pos, data_size, n)
+
+        # Per lokaal berichttype: (global_num, size, group-index of None)
+        local = {}
+        while pos < end:
+            header = buf[pos]
+            pos += 1
+            if header & 0x80:
+                # Compressed timestamp header: lokaal type in bits 5-6, tijdoffset in bits 0-4
+                mesg = local.get((header >> 5) & 0x03)
+                if mesg is None:
+                    raise FitError("Data zonder definitie")
+                _need(pos, mesg[1], end)
+                if mesg[2] is not None:
+                    group = groups[mesg[2]]
+                    group[2].append(pos)
+                    group[3].append(header & 0x1F)
+                    order.append(mesg[2])
+                pos += mesg[1]
+            elif header & 0x40:
+                # Definitiebericht
+                _need(pos, 5, end)
+                arch = buf[pos + 1]
+                global_num = int.from_bytes(buf[pos + 2:pos + 4], "big" if arch == 1 else "little")
+                n_fields = buf[pos + 4]
+                _need(pos, 5 + 3 * n_fields, end)
+                fields = [
+                    (buf[pos + 5 + 3 * i], buf[pos + 6 + 3 * i], buf[pos + 7 + 3 * i])
+                    for i in range(n_fields)
+                ]
+                pos += 5 + 3 * n_fields
+                size = sum(f[1] for f in fields)
+                if header & 0x20:
+                    # Developer-velden: enkel de grootte telt, de inhoud negeren we
+                    _need(pos, 1, end)
+                    n_dev = buf[pos]
+                    _need(pos, 1 + 3 * n_dev, end)
+                    size += sum(buf[pos + 2 + 3 * i] for i in range(n_dev))
+                    pos += 1 + 3 * n_dev
+                group_index = None
+                if global_num == RECORD_MESG:
+                    groups.append((*_record_dtype(fields, arch, size), [], []))
+                    group_index = len(groups) - 1
+                local[header & 0x0F] = (global_num, size, group_index)
+            else:
+                mesg = local.get(header & 0x0F)
+                if mesg is None:
+                    raise FitError("Data zonder definitie")
+                _need(pos, mesg[1], end)
+                if mesg[2] is not None:
+                    group = groups[mesg[2]]
+                    group[2].append(pos)
+                    group[3].append(-1)
+                    order.append(mesg[2])
+                pos += mesg[1]
+        pos = end + 2  # CRC overslaan; volgende (gekoppelde) FIT-file
+    return groups, np.asarray(order, dtype=np.int64)
+
+
+def _column(records, name, invalid):
+    if name not in records.dtype.names:
+        return np.full(len(records), np.nan)
+    values = records[name]
+    out = values.astype(np.float64)
+    if invalid[name] is not None:
+        out[values == invalid[name]] = np.nan
+    return out
+
+
+def _decode(buf, groups, order):
+    if not groups:
+        return {name: np.array([]) for name in RECORD_FIELDS.values()}, np.array([], dtype=np.int64)
+
+    columns = {name: [] for name in RECORD_FIELDS.values()}
+    ctime = []
+    raw = np.frombuffer(buf, dtype=np.uint8)
+
+    for dtype, invalid, offsets, compressed in groups:
+        offsets = np.asarray(offsets, dtype=np.int64)
+        # Alle berichten van deze definitie in één keer uit de buffer knippen
+        block = raw[offsets[:, None] + np.arange(dtype.itemsize)]
+        records = block.view(dtype).reshape(-1)
+        for name in columns:
+            columns[name].append(_column(records, name, invalid))
+        ctime.append(np.asarray(compressed, dtype=np.int64))
+
+    # Terug in de oorspronkelijke volgorde zetten (definities kunnen onderweg wisselen)
+    sizes = np.array([len(g[2]) for g in groups])
+    group_start = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    position = np.empty(len(order), dtype=np.int64)
+    for g in range(len(groups)):
+        where = np.flatnonzero(order == g)
+        position[where] = group_start[g] + np.arange(len(where))
+    merged = {name: np.concatenate(cols)[position] for name, cols in columns.items()}
+    return merged, np.concatenate(ctime)[position]
+
+
+def _fill_compressed_timestamps(timestamp, ctime):
+    # Zelden gebruikt; vereist de vorige volledige tijd, dus sequentieel
+    last = np.nan
+    for i in range(len(timestamp)):
+        if ctime[i] >= 0 and not np.isnan(last):
+            last_int = int(last)
+            timestamp[i] = last_int + ((ctime[i] - last_int) & 0x1F)
+        if not np.isnan(timestamp[i]):
+            last = timestamp[i]
+    return timestamp
+
+
+def _ffill(values):
+    # Ontbrekende waarden aanvullen met de vorige (en aan het begin met de eerste) geldige waarde
+    valid = ~np.isnan(values)
+    if not valid.any():
+        return values
+    idx = np.where(valid, np.arange(len(values)), 0)
+    np.maximum.accumulate(idx, out=idx)
+    out = values[idx]
+    first = np.flatnonzero(valid)[0]
+    out[:first] = values[first]
+    return out
+
+
+def parse_fit(source):
+    """Lees de record-berichten van een FIT-bestand (pad of file-object) naar een Track."""
+    buf = _read_source(source)
+    groups, order = _scan(buf)
+    cols, ctime = _decode(buf, groups, order)
+
+    timestamp = cols["timestamp"]
+    if (ctime >= 0).any():
+        timestamp = _fill_compressed_timestamps(timestamp, ctime)
+
+    lat = cols["position_lat"] * SEMICIRCLE_TO_DEG
+    lon = cols["position_long"] * SEMICIRCLE_TO_DEG
+    ele = cols["enhanced_altitude"]
+    if np.isnan(ele).all():
+        ele = cols["altitude"]
+    ele = ele / 5 - 500
+    device_km = cols["distance"] / 100 / 1000
+
+    has_position = ~np.isnan(lat) & ~np.isnan(lon)
+    has_distance = ~np.isnan(device_km)
+    if has_distance.any():
+        # Afstand van het toestel gebruiken; punten zonder positie houden we (binnen, tunnel)
+        keep = has_distance
+        dist_km = device_km[keep]
+    else:
+        keep = has_position
+        dist_km = None
+
+    lat, lon, ele, timestamp = lat[keep], lon[keep], ele[keep], timestamp[keep]
+    if dist_km is None:
+        dist_km = cumulative_distance_km(lat, lon, ele)
+    lat, lon = _ffill(lat), _ffill(lon)
+    lat[np.isnan(lat)] = 0.0
+    lon[np.isnan(lon)] = 0.0
+
+    time = np.full(len(timestamp), np.datetime64("NaT"), dtype="datetime64[ms]")
+    valid_time = ~np.isnan(timestamp)
+    time[valid_time] = ((timestamp[valid_time] + FIT_EPOCH_S) * 1000).astype(np.int64).astype("datetime64[ms]")
+
+    return Track.from_arrays(lat=lat, lon=lon, ele=ele, dist_km=dist_km, time=time)
@@ -0,0 +1,193 @@
+import math
+import os
+from array import array
+from xml.etree.ElementTree import iterparse
+
+import numpy as np
+
+from hoogteprofiel.track import Track
+from imports import lazy
+
+pd = lazy("pandas")  # enkel voor tijdstempels
+
+# --- Constantes (identiek aan gpxpy.geo zodat afstanden exact overeenkomen) ---
+EARTH_RADIUS = 6378.137 * 1000
+ONE_DEGREE = (2 * math.pi * EARTH_RADIUS) / 360
+
+# Tijdstrings worden per blok geparsed zodat er nooit honderdduizenden strings tegelijk leven
+TIME_CHUNK = 65536
+# Om de zoveel punten krijgt een progress-callback de nieuwe punten (voor een live preview)
+PROGRESS_CHUNK = 50000
+
+
+def _local(tag):
+    # "{http://www.topografix.com/GPX/1/1}trkpt" -> "trkpt"
+    return tag.rsplit("}", 1)[-1]
+
+
+def parse_gpx(source, progress=None):
+    """Stream-parse alle trkpt's uit een GPX-bestand (pad of file-object) naar een Track.
+
+    `progress(lat, lon, ele, segment_start, fraction)` krijgt per PROGRESS_CHUNK punten een
+    kopie van de nieuwe punten en het gelezen deel van het bestand; een exception daarin
+    breekt het parsen af.
+    """
+    if hasattr(source, "seek"):
+        source.seek(0)
+    total_bytes = _size(source) if progress else None
+    reported = 0
+
+    lat = array("d")
+    lon = array("d")
+    ele = array("d")
+    times = []             # tijdstrings van de huidige blok, per TIME_CHUNK omgezet
+    time_ms = array("q")
+    seg_start = array("b")
+    wpt_lat = array("d")
+    wpt_lon = array("d")
+    wpt_names = []
+
+    new_segment = True
+    segment_elem = None
+    point_ele = math.nan
+    point_time = None
+    in_trkpt = False
+
+    for event, elem in iterparse(source, events=("start", "end")):
+        tag = _local(elem.tag)
+
+        if event == "start":
+            if tag == "trkpt":
+                in_trkpt = True
+                point_ele = math.nan
+                point_time = None
+            elif tag == "trkseg":
+                new_segment = True
+                segment_elem = elem
+            continue
+
+        if not in_trkpt:
+            if tag == "wpt":
+                wpt_lat.append(float(elem.get("lat")))
+                wpt_lon.append(float(elem.get("lon")))
+                name = next((c.text for c in elem if _local(c.tag) == "name"), None)
+                wpt_names.append((name or "").strip() or f"WPT {len(wpt_names) + 1}")
+            # Waypoints, routes en metadata niet opstapelen in het geheugen
+            if tag in ("wpt", "rte", "metadata"):
+                elem.clear()
+            continue
+
+        if tag == "ele":
+            if elem.text and elem.text.strip():
+                point_ele = float(elem.text)
+        elif tag == "time":
+            point_time = elem.text.strip() if elem.text else None
+        elif tag == "trkpt":
+            lat.append(float(elem.get("lat")))
+            lon.append(float(elem.get("lon")))
+            ele.append(point_ele)
+            times.append(point_time)
+            if len(times) == TIME_CHUNK:
+                time_ms.extend(_parse_times(times))
+                times.clear()
+            seg_start.append(1 if new_segment else 0)
+            new_segment = False
+            in_trkpt = False
+            # Verwerkte punten loskoppelen zodat de boom niet blijft groeien
+            segment_elem.clear()
+
+            if progress and len(lat) - reported >= PROGRESS_CHUNK:
+                _report(progress, lat, lon, ele, seg_start, reported, source, total_bytes)
+                reported = len(lat)
+
+    time_ms.extend(_parse_times(times))
+
+    lat = np.frombuffer(lat, dtype=np.float64)
+    lon = np.frombuffer(lon, dtype=np.float64)
+    ele = np.frombuffer(ele, dtype=np.float64)
+    segment_start = np.frombuffer(seg_start, dtype=np.int8).astype(bool)
+
+    # Afstand in float64 berekenen, daarna pas compact opslaan
+    return Track.from_arrays(
+        lat=lat,
+        lon=lon,
+        ele=ele,
+        dist_km=cumulative_distance_km(lat, lon, ele, segment_start),
+        time=np.frombuffer(time_ms, dtype=np.int64).view("datetime64[ms]"),
+        segment_start=segment_start,
+        wpt_lat=np.frombuffer(wpt_lat, dtype=np.float64),
+        wpt_lon=np.frombuffer(wpt_lon, dtype=np.float64),
+        wpt_name=np.array(wpt_names, dtype=str),
+    )
+
+
+def _size(source):
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.getsize(source)
+    if hasattr(source, "getbuffer"):
+        return source.getbuffer().nbytes
+    return None
+
+
+def _report(progress, lat, lon, ele, seg_start, start, source, total_bytes):
+    # Kopieën: een numpy-view op een array.array blokkeert het verder aangroeien ervan
+    fraction = None
+    if total_bytes and hasattr(source, "tell"):
+        fraction = min(source.tell() / total_bytes, 1.0)
+    progress(
+        np.array(lat[start:], dtype=np.float64),
+        np.array(lon[start:], dtype=np.float64),
+        np.array(ele[start:], dtype=np.float64),
+        np.array(seg_start[start:], dtype=bool),
+        fraction,
+    )
+
+
+def _parse_times(times):
+    # ISO-tijdstrings → int64 epoch-ms (NaT voor ontbrekende tijden)
+    if not any(times):
+        return np.full(len(times), np.datetime64("NaT"), dtype="datetime64[ms]").view(np.int64)
+    parsed = pd.to_datetime(pd.Series(times, dtype=object), utc=True, errors="coerce", format="ISO8601")
+    return parsed.dt.tz_localize(None).to_numpy(dtype="datetime64[ms]").view(np.int64)
+
+
+def step_distances(lat, lon, ele):
+    """Afstand (m) tussen opeenvolgende punten, zoals gpxpy's distance_3d."""
+    lat1, lat2 = lat[1:], lat[:-1]
+    lon1, lon2 = lon[1:], lon[:-1]
+
+    # Korte stappen: platte benadering met cos(breedtegraad) van het huidige punt
+    coef = np.cos(np.radians(lat1))
+    x = lat1 - lat2
+    y = (lon1 - lon2) * coef
+    dist_2d = np.sqrt(x * x + y * y) * ONE_DEGREE
+
+    d_ele = ele[1:] - ele[:-1]
+    d_ele = np.where(np.isnan(d_ele), 0.0, d_ele)
+    dist = np.sqrt(dist_2d * dist_2d + d_ele * d_ele)
+
+    # Grote sprongen (> 0.2 graden): haversine zonder hoogte
+    far = (np.abs(x) > 0.2) | (np.abs(lon1 - lon2) > 0.2)
+    if far.any():
+        r_lat1 = np.radians(lat1[far])
+        r_lat2 = np.radians(lat2[far])
+        d_lon = np.radians(lon1[far] - lon2[far])
+        a = np.sin((r_lat1 - r_lat2) / 2) ** 2 + np.sin(d_lon / 2) ** 2 * np.cos(r_lat1) * np.cos(r_lat2)
+        dist[far] = EARTH_RADIUS * 2 * np.arcsin(np.sqrt(a))
+
+    return dist
+
+
+def cumulative_distance_km(lat, lon, ele, segment_start=None):
+    """Cumulatieve afstand in km; tussen twee segmenten wordt niet geteld."""
+    out = np.zeros(len(lat), dtype=np.float64)
+    if len(lat) < 2:
+        return out
+
+    steps = step_distances(lat, lon, ele)
+    if segment_start is not None:
+        steps[segment_start[1:]] = 0.0
+
+    np.cumsum(steps, out=out[1:])
+    out /= 1000  # omzetten naar km
+    return out
@@ -0,0 +1,65 @@
+"""Profiel inkleuren volgens de helling.
+
+Elke stap krijgt een hellingsklasse; per klasse wordt één gevulde vorm gemaakt
+(alle stukken van die klasse na elkaar, gescheiden door NaN). Het aantal traces in
+de figuur blijft zo vast, hoe lang of grillig de route ook is.
+"""
+import numpy as np
+
+# Bovengrenzen (%) van de klassen; alles daarboven valt in de laatste klasse
+GRADIENT_BOUNDS = (0, 3, 6, 9, 12)
+GRADIENT_COLORS = ("#bdbdbd", "#8fd19e", "#ffe119", "#f58231", "#e6194B", "#7f0000")
+GRADIENT_LABELS = ("afdaling", "0–3%", "3–6%", "6–9%", "9–12%", "> 12%")
+# Helling uitmiddelen over dit stuk (km) zodat één steile stap niet meteen rood kleurt
+GRADIENT_WINDOW_KM = 0.1
+
+
+def step_classes(dist, elev, window_km=GRADIENT_WINDOW_KM):
+    """Klasse-index (0..len(GRADIENT_COLORS)-1) per stap tussen opeenvolgende punten."""
+    dist = np.asarray(dist, dtype=np.float64)
+    elev = np.asarray(elev, dtype=np.float64)
+    mid = (dist[1:] + dist[:-1]) / 2
+    half = window_km / 2
+    lo = np.clip(mid - half, dist[0], dist[-1])
+    hi = np.clip(mid + half, dist[0], dist[-1])
+    rise = np.interp(hi, dist, elev) - np.interp(lo, dist, elev)
+    run_m = (hi - lo) * 1000
+    grad = np.divide(rise * 100, run_m, out=np.zeros_like(rise), where=run_m > 0)
+    return np.digitize(grad, GRADIENT_BOUNDS, right=False)
+
+
+def class_polygons(dist, elev, classes, cls, base):
+    """Eén x/y-reeks met een gesloten vlak per aaneengesloten stuk van klasse `cls`.
+
+    Per stuk: de profielpunten, dan twee punten op `base` terug naar het begin en
+    een NaN als scheiding. Volledig gevectoriseerd, ook bij duizenden stukken.
+    """
+    steps = np.concatenate([[False], classes == cls, [False]]).astype(np.int8)
+    edges = np.diff(steps)
+    starts = np.flatnonzero(edges == 1)       # eerste stap van elk stuk = eerste punt
+    ends = np.flatnonzero(edges == -1)        # laatste stap + 1 = laatste punt
+    if len(starts) == 0:
+        return np.empty(0), np.empty(0)
+
+    lengths = ends - starts + 1               # aantal profielpunten per stuk
+    sizes = lengths + 3                       # + 2 basispunten + NaN
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    total = int(sizes.sum())
+
+    x = np.full(total, np.nan)
+    y = np.full(total, np.nan)
+
+    # Profielpunten: per stuk start + 0..length-1
+    run_of = np.repeat(np.arange(len(starts)), lengths)
+    within = np.arange(int(lengths.sum())) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    src = starts[run_of] + within
+    dst = offsets[run_of] + within
+    x[dst] = dist[src]
+    y[dst] = elev[src]
+
+    # Terug langs de basislijn: (einde, base), (begin, base)
+    x[offsets + lengths] = dist[ends]
+    x[offsets + lengths + 1] = dist[starts]
+    y[offsets + lengths] = base
+    y[offsets + lengths + 1] = base
+    return x, y
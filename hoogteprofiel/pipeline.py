@@ -0,0 +1,181 @@
+import os
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from hoogteprofiel.downsample import downsample
+from hoogteprofiel.fit_reader import parse_fit
+from hoogteprofiel.gpx_ingest import parse_gpx
+from hoogteprofiel.gradient import GRADIENT_COLORS, class_polygons, step_classes
+from hoogteprofiel.smoothing import smooth
+
+# --- Export-instellingen (zelfde als de pagina) ---
+DPI = 300
+EXPORT_SCALE = 3
+
+LINE_COLORS = {"Zwart": "#000000", "Oranje": "#fb5d01"}
+DEFAULT_KEYPOINT_COLOR = "#fb5d01"
+# Ondersteunde bestandstypes per extensie
+PARSERS = {".gpx": parse_gpx, ".fit": parse_fit}
+
+DEFAULT_KEYPOINT_COLORS = [
+    "#e6194B", "#3cb44b", "#ffe119", "#4363d8",
+    "#f58231", "#911eb4", "#46f0f0", "#f032e6",
+    "#bcf60c", "#fabebe", "#008080", "#e6beff"
+]
+
+
+@dataclass
+class ProfileSettings:
+    """Verwerking: detailgraad en gladheid van het profiel."""
+
+    max_points: int = 10000
+    downsample_method: str = "uniform"
+    window_length: int = 101
+    smoother: str = "savgol"
+
+
+@dataclass
+class ProfileStyle:
+    """Opmaak van het kaartje."""
+
+    line_color: str = LINE_COLORS["Zwart"]
+    line_width: int = 2
+    cm_width: float = 10.0
+    cm_height: float = 1.0
+    mirror: bool = False
+    tick_interval: int = 20
+    gradient: bool = False     # vlak onder de lijn inkleuren volgens de helling
+
+    @property
+    def px_width(self):
+        return cm_to_px(self.cm_width)
+
+    @property
+    def px_height(self):
+        return cm_to_px(self.cm_height)
+
+
+@dataclass
+class Keypoint:
+    name: str
+    km: float
+    color: str = DEFAULT_KEYPOINT_COLOR
+    elev: float = field(default=float("nan"))
+
+
+def cm_to_px(cm, dpi=DPI):
+    return int((cm / 2.54) * dpi)
+
+
+# --- Stappen van de pijplijn ---
+def parser_for(name):
+    return PARSERS.get(os.path.splitext(str(name))[1].lower(), parse_gpx)
+
+
+def load_track(source, name=None):
+    # Bestandstype op basis van de naam (pad of naam van de upload)
+    return parser_for(name or source)(source)
+
+
+def resample(track, settings):
+    return downsample(track.dist_km, track.ele, settings.max_points, settings.downsample_method)
+
+
+def smooth_profile(elev, settings):
+    return smooth(elev, settings.window_length, settings.smoother)
+
+
+def place_keypoints(dist, elev, keypoints):
+    """Hoogte van alle keypoints in één np.interp-aanroep."""
+    if not keypoints:
+        return []
+    heights = np.interp([kp.km for kp in keypoints], dist, elev)
+    for kp, h in zip(keypoints, heights):
+        kp.elev = float(h)
+    return keypoints
+
+
+def build_figure(dist, elev, keypoints, style):
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+
+    # --- Hellingskleuren: één gevuld vlak per klasse, los van het aantal stukken ---
+    if style.gradient and len(dist) > 1:
+        classes = step_classes(dist, elev)
+        base = float(np.nanmin(elev))
+        for cls, color in enumerate(GRADIENT_COLORS):
+            x, y = class_polygons(dist, elev, classes, cls, base)
+            if len(x):
+                fig.add_trace(go.Scatter(
+                    x=x, y=y, mode='none', fill='toself', fillcolor=color,
+                    hoverinfo='skip', showlegend=False
+                ))
+
+    # --- Hoofdhoogteprofiel lijn ---
+    fig.add_trace(go.Scatter(
+        x=dist,
+        y=elev,
+        mode='lines',
+        line=dict(color=style.line_color, width=style.line_width),
+        hoverinfo='skip',
+        showlegend=False
+    ))
+
+    # Keypoints als markers + labels
+    for kp in keypoints:
+        fig.add_trace(go.Scatter(
+            x=[kp.km],
+            y=[kp.elev],
+            mode='markers+text',
+            marker=dict(size=10, color=kp.color),
+            text=[kp.name],
+            textposition="top center",
+            showlegend=False,
+            textfont=dict(size=14, color=kp.color)
+        ))
+
+    # --- X-as ticks en labels ---
+    max_dist = np.max(dist)
+    tick_vals = list(np.arange(0, max_dist + style.tick_interval, style.tick_interval))
+    tick_texts = [f"{int(t)} km" for t in tick_vals]
+
+    # --- Layout aanpassingen ---
+    fig.update_layout(
+        xaxis=dict(
+            tickmode='array',
+            tickvals=tick_vals,
+            ticktext=tick_texts,
+            ticks="outside",
+            showline=False,
+            linewidth=0,
+            linecolor='rgba(0,0,0,0)',
+            title_text=None,
+            autorange='reversed' if style.mirror else True,
+            showgrid=False
+        ),
+        yaxis=dict(
+            showline=False,
+            linewidth=0,
+            linecolor='rgba(0,0,0,0)',
+            title_text=None,
+            zeroline=False,
+            showticklabels=True,
+            showgrid=False
+        ),
+        margin=dict(l=40, r=20, t=20, b=40),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        width=style.px_width,
+        height=style.px_height
+    )
+    return fig
+
+
+def build_profile(track, settings, style, keypoints=()):
+    """Volledige pijplijn voor één track: resample → smooth → keypoints → figuur."""
+    dist, elev = resample(track, settings)
+    smooth_elev = smooth_profile(elev, settings)
+    placed = place_keypoints(dist, smooth_elev, list(keypoints))
+    return build_figure(dist, smooth_elev, placed, style)
@@ -0,0 +1,116 @@
+"""Grote uploads op de achtergrond parsen, met een preview die per chunk fijner wordt.
+
+Kleine bestanden worden gewoon meteen geparst; vanaf BACKGROUND_BYTES loopt het
+parsen in een gedeelde threadpool zodat één trage upload de server niet blokkeert.
+"""
+import functools
+import inspect
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from hoogteprofiel.gpx_ingest import step_distances
+from hoogteprofiel.track_cache import content_key
+
+BACKGROUND_BYTES = int(float(os.environ.get("HOOGTEPROFIEL_BACKGROUND_MB", "5")) * 1024 * 1024)
+DEFAULT_WORKERS = int(os.environ.get("HOOGTEPROFIEL_PARSE_WORKERS", "2"))
+PREVIEW_POINTS = 2000
+
+
+class ParseCancelled(Exception):
+    """Het parsen werd afgebroken (andere upload of annuleerknop)."""
+
+
+def parse_executor(workers=DEFAULT_WORKERS):
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hoogteprofiel-parse")
+
+
+class ProgressiveParse:
+    """Eén upload die op de achtergrond geparst wordt.
+
+    Tijdens het parsen groeit `preview()` met elke chunk punten. Elke keer de preview
+    meer dan `preview_points` punten telt, wordt de stapgrootte verdubbeld: de preview
+    blijft zo grof maar dekt altijd het volledige gelezen stuk. `cancel()` stopt het
+    parsen bij de volgende chunk.
+    """
+
+    def __init__(self, data, parser, track_cache, executor, preview_points=PREVIEW_POINTS):
+        self._data = data
+        self._parser = parser
+        self._track_cache = track_cache
+        self._preview_points = preview_points
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+
+        self._stride = 1
+        self._dist = np.empty(0)
+        self._ele = np.empty(0)
+        self._km = 0.0
+        self._last = None   # laatste punt van de vorige chunk (lat, lon, ele)
+        self.points = 0
+        self.fraction = 0.0
+
+        self.future = executor.submit(self._run)
+
+    # --- Status ---
+    @property
+    def done(self):
+        return self.future.done()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+        self.future.cancel()
+
+    def result(self):
+        """(track_key, track); gooit de fout uit de achtergrondthread opnieuw op."""
+        return self.future.result()
+
+    def preview(self):
+        with self._lock:
+            return self._dist.copy(), self._ele.copy()
+
+    # --- Achtergrondthread ---
+    def _run(self):
+        try:
+            key = content_key(self._data)
+            if self._cancel.is_set():
+                raise ParseCancelled()
+            parser = self._parser
+            if "progress" in inspect.signature(parser).parameters:
+                parser = functools.partial(parser, progress=self._on_chunk)
+            return key, self._track_cache.get_or_parse(self._data, parser=parser, key=key)
+        finally:
+            self._data = None
+
+    def _on_chunk(self, lat, lon, ele, segment_start, fraction):
+        if self._cancel.is_set():
+            raise ParseCancelled()
+
+        # Stapafstanden over de chunkgrens heen: het vorige laatste punt vooraan plakken
+        if self._last is None:
+            steps = np.concatenate([[0.0], step_distances(lat, lon, ele)])
+        else:
+            prev_lat, prev_lon, prev_ele = self._last
+            steps = step_distances(np.r_[prev_lat, lat], np.r_[prev_lon, lon], np.r_[prev_ele, ele])
+        steps[segment_start] = 0.0
+        dist = self._km + np.cumsum(steps) / 1000
+        self._km = dist[-1]
+        self._last = (lat[-1], lon[-1], ele[-1])
+
+        # Enkel punten met een globale index die een veelvoud van de stapgrootte is
+        first = -self.points % self._stride
+        with self._lock:
+            self._dist = np.concatenate([self._dist, dist[first::self._stride]])
+            self._ele = np.concatenate([self._ele, ele[first::self._stride]])
+            while len(self._dist) > self._preview_points:
+                self._dist, self._ele = self._dist[::2], self._ele[::2]
+                self._stride *= 2
+            self.points += len(lat)
+            if fraction is not None:
+                self.fraction = fraction
@@ -0,0 +1,171 @@
+import atexit
+import hashlib
+import multiprocessing
+import multiprocessing.util
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+
+DEFAULT_WORKERS = int(os.environ.get("HOOGTEPROFIEL_RENDER_WORKERS", "1"))
+DEFAULT_CACHE_ENTRIES = 32
+
+# --- Worker-kant: draait in een apart proces dat warm blijft ---
+_worker_renders = 0
+_worker_loop = None
+_worker_kaleido = None
+
+
+def _warm_kaleido():
+    # Kaleido v1: één browser per worker openhouden i.p.v. per export opnieuw te starten.
+    # Kaleido 0.2 heeft geen Kaleido-klasse en houdt zelf een subprocess warm via plotly.
+    global _worker_loop, _worker_kaleido
+    if _worker_kaleido is not None:
+        return _worker_kaleido
+    try:
+        from kaleido import Kaleido
+    except ImportError:
+        return None
+    import asyncio
+
+    _worker_loop = asyncio.new_event_loop()
+    _worker_kaleido = _worker_loop.run_until_complete(Kaleido(n=1).__aenter__())
+    # Browser netjes sluiten bij het afsluiten van dit proces. Finalize i.p.v. atexit:
+    # multiprocessing voert die ook uit in een worker die via os._exit stopt.
+    multiprocessing.util.Finalize(None, close_kaleido, exitpriority=10)
+    return _worker_kaleido
+
+
+def close_kaleido():
+    """De warme Kaleido van dit proces sluiten (tegenhanger van `__aenter__`)."""
+    global _worker_loop, _worker_kaleido
+    kaleido, loop = _worker_kaleido, _worker_loop
+    _worker_kaleido = _worker_loop = None
+    if kaleido is None:
+        return
+    try:
+        loop.run_until_complete(kaleido.__aexit__(None, None, None))
+    except Exception:
+        pass  # browser al weg (bv. gecrasht): niets meer op te ruimen
+    finally:
+        loop.close()
+
+
+def render_in_process(fig_json, fmt, width, height, scale):
+    """Render een figuur (JSON) in dit proces; geeft (bytes, seconden, cold) terug."""
+    global _worker_renders
+    import json
+
+    start = time.perf_counter()
+    fig_dict = json.loads(fig_json)
+    kaleido = _warm_kaleido()
+    if kaleido is not None:
+        img = _worker_loop.run_until_complete(kaleido.calc_fig(
+            fig_dict, opts=dict(format=fmt, width=width, height=height, scale=scale)
+        ))
+    else:
+        import plotly.io as pio
+        img = pio.to_image(fig_dict, format=fmt, width=width, height=height,
+                           scale=scale, validate=False)
+    cold = _worker_renders == 0
+    _worker_renders += 1
+    return img, time.perf_counter() - start, cold
+
+
+def render_key(inputs, fmt, width, height, scale):
+    """Sleutel van een export: hash van de invoer van de figuur plus afmetingen.
+
+    `inputs` is alles waaruit de figuur opgebouwd wordt (bv. trackhash, profiel-
+    instellingen, keypoints, stijl) en moet een deterministische repr hebben; zo hoeft
+    de figuur zelf niet naar JSON omgezet te worden om in de cache te kijken.
+    """
+    h = hashlib.sha256(repr(inputs).encode("utf-8"))
+    h.update(f"|{fmt}|{width}|{height}|{scale}".encode("ascii"))
+    return h.hexdigest()
+
+
+class RenderService:
+    """Begrensde pool van warme renderprocessen met een cache van afgewerkte afbeeldingen."""
+
+    def __init__(self, workers=DEFAULT_WORKERS, cache_entries=DEFAULT_CACHE_ENTRIES):
+        self.workers = workers
+        self.cache_entries = cache_entries
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = None
+        self.timings = deque(maxlen=200)
+        atexit.register(self.shutdown)
+
+    # --- Pool ---
+    def _pool(self):
+        if self.workers <= 0:
+            return None
+        with self._lock:
+            if self._executor is None:
+                # spawn i.p.v. fork: de Streamlit-server is multithreaded
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+        return self._executor
+
+    def shutdown(self):
+        """Workers stoppen (die sluiten hun Kaleido zelf) en de Kaleido in dit proces sluiten."""
+        with self._lock:
+            if self._executor is not None:
+                # wait=True: de workers moeten hun browser nog kunnen afsluiten
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+        close_kaleido()
+
+    # --- Cache ---
+    def cached(self, inputs, width, height, scale=3, fmt="png"):
+        """True als de export voor deze invoer (zie `render_key`) al klaarstaat."""
+        key = render_key(inputs, fmt, width, height, scale)
+        with self._lock:
+            return key in self._cache
+
+    def render(self, fig, inputs, width, height, scale=3, fmt="png"):
+        """Afbeelding van `fig`; `inputs` bepaalt de cachesleutel, de JSON enkel bij een miss."""
+        key = render_key(inputs, fmt, width, height, scale)
+
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.timings.append({"kind": "cache", "seconds": 0.0, "format": fmt})
+                return self._cache[key]
+
+        fig_json = fig.to_json()
+        start = time.perf_counter()
+        pool = self._pool()
+        if pool is None:
+            img, render_seconds, cold = render_in_process(fig_json, fmt, width, height, scale)
+        else:
+            img, render_seconds, cold = pool.submit(
+                render_in_process, fig_json, fmt, width, height, scale
+            ).result()
+        total = time.perf_counter() - start
+
+        with self._lock:
+            self._cache[key] = img
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+            self.timings.append({
+                "kind": "cold" if cold else "warm",
+                "seconds": total,
+                "render_seconds": render_seconds,
+                "format": fmt,
+            })
+        return img
+
+    def summary(self):
+        # Gemiddelde tijd per soort render: cold (eerste in een worker), warm, cache
+        with self._lock:
+            rows = list(self.timings)
+        out = {}
+        for kind in ("cold", "warm", "cache"):
+            secs = [r["seconds"] for r in rows if r["kind"] == kind]
+            if secs:
+                out[kind] = {"count": len(secs), "mean_s": sum(secs) / len(secs), "max_s": max(secs)}
+        return out
@@ -0,0 +1,126 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+# Categorie op basis van lengte (m) × gemiddelde helling (%), zoals gangbaar bij klimclassificatie
+CATEGORY_THRESHOLDS = [(80000, "HC"), (64000, "1"), (32000, "2"), (16000, "3"), (8000, "4")]
+
+
+@dataclass
+class ClimbSettings:
+    min_gradient: float = 3.0      # % om als klimmend te tellen
+    min_length_km: float = 0.5
+    min_gain_m: float = 20.0
+    merge_gap_km: float = 0.2      # korte vlakke stukjes binnen een klim negeren
+    ramp_gradient: float = 10.0    # % over ramp_window_km
+    ramp_window_km: float = 0.2
+
+
+@dataclass
+class Segment:
+    kind: str            # "climb" of "ramp"
+    start_km: float
+    end_km: float
+    gain_m: float
+    avg_gradient: float
+    max_gradient: float
+    score: float = 0.0
+    category: str = ""
+
+    @property
+    def length_km(self):
+        return self.end_km - self.start_km
+
+
+def categorize(score):
+    for threshold, label in CATEGORY_THRESHOLDS:
+        if score >= threshold:
+            return label
+    return ""
+
+
+def _runs(mask):
+    # Start- en eindindex (exclusief) van elke aaneengesloten True-reeks
+    edges = np.diff(np.concatenate(([0], mask.view(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def step_gradients(dist_km, elev):
+    """Helling (%) per stap tussen opeenvolgende punten."""
+    d_m = np.diff(dist_km) * 1000
+    d_e = np.diff(elev)
+    return np.divide(d_e * 100, d_m, out=np.zeros_like(d_e), where=d_m > 0)
+
+
+def detect_climbs(dist_km, elev, settings=None):
+    settings = settings or ClimbSettings()
+    dist_km = np.asarray(dist_km, dtype=np.float64)
+    elev = np.asarray(elev, dtype=np.float64)
+    if len(dist_km) < 2:
+        return []
+
+    grad = step_gradients(dist_km, elev)
+    starts, ends = _runs(grad >= settings.min_gradient)
+    if len(starts) == 0:
+        return []
+
+    # Runs samenvoegen wanneer het gat ertussen kort is (punt-indices: stap i loopt van i naar i+1)
+    gaps = dist_km[starts[1:]] - dist_km[ends[:-1]]
+    new_group = np.concatenate(([True], gaps > settings.merge_gap_km))
+    group_first = np.flatnonzero(new_group)
+    group_last = np.concatenate((group_first[1:], [len(starts)])) - 1
+    starts, ends = starts[group_first], ends[group_last]
+
+    start_km, end_km = dist_km[starts], dist_km[ends]
+    gain = elev[ends] - elev[starts]
+    length_km = end_km - start_km
+    max_grad = _max_between(grad, starts, ends)
+
+    keep = (length_km >= settings.min_length_km) & (gain >= settings.min_gain_m)
+    avg_grad = np.divide(gain, length_km * 1000, out=np.zeros_like(gain), where=length_km > 0) * 100
+    score = length_km * 1000 * avg_grad
+
+    return [
+        Segment("climb", float(s), float(e), float(g), float(a), float(m), float(sc), categorize(sc))
+        for s, e, g, a, m, sc, k in zip(start_km, end_km, gain, avg_grad, max_grad, score, keep)
+        if k
+    ]
+
+
+def detect_ramps(dist_km, elev, settings=None):
+    """Steile stukken: helling gemeten over een vast afstandsvenster boven de drempel."""
+    settings = settings or ClimbSettings()
+    dist_km = np.asarray(dist_km, dtype=np.float64)
+    elev = np.asarray(elev, dtype=np.float64)
+    if len(dist_km) < 2:
+        return []
+
+    ahead = np.searchsorted(dist_km, dist_km + settings.ramp_window_km)
+    ahead = np.minimum(ahead, len(dist_km) - 1)
+    span_m = (dist_km[ahead] - dist_km) * 1000
+    window_grad = np.divide((elev[ahead] - elev) * 100, span_m,
+                            out=np.zeros_like(span_m), where=span_m > 0)
+
+    starts, ends = _runs(window_grad >= settings.ramp_gradient)
+    if len(starts) == 0:
+        return []
+    max_grad = _max_between(window_grad, starts, ends)
+    # Een ramp loopt door tot het einde van het venster van zijn laatste startpunt
+    ends = ahead[ends - 1]
+    gain = elev[ends] - elev[starts]
+    length_km = dist_km[ends] - dist_km[starts]
+    avg_grad = np.divide(gain, length_km * 1000, out=np.zeros_like(gain), where=length_km > 0) * 100
+
+    return [
+        Segment("ramp", float(dist_km[s]), float(dist_km[e]), float(g), float(a), float(m))
+        for s, e, g, a, m in zip(starts, ends, gain, avg_grad, max_grad)
+    ]
+
+
+def _max_between(values, starts, ends):
+    # Maximum van values[start:end] per reeks via één reduceat over (start, end)-paren
+    padded = np.concatenate((values, [-np.inf]))
+    bounds = np.empty(2 * len(starts), dtype=np.int64)
+    bounds[0::2] = starts
+    bounds[1::2] = ends
+    return np.maximum.reduceat(padded, bounds)[0::2]
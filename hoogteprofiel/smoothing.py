@@ -0,0 +1,101 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Beschikbare smoothers (sleutel -> label in de sidebar)
+SMOOTHERS = {
+    "savgol": "Savitzky–Golay",
+    "moving_average": "Voortschrijdend gemiddelde",
+    "gaussian": "Gaussisch (FFT)",
+}
+
+SAVGOL_POLYORDER = 3
+
+
+def normalize_window(window_length, n, polyorder=SAVGOL_POLYORDER):
+    """Oneven venster, groter dan polyorder en niet langer dan het signaal."""
+    window_length = int(window_length)
+    if window_length % 2 == 0:
+        window_length -= 1
+    if n % 2 == 0:
+        n -= 1
+    window_length = min(window_length, n)
+    return max(window_length, polyorder + 2 if polyorder % 2 == 1 else polyorder + 1)
+
+
+def smooth(ele, window_length, method="savgol"):
+    ele = np.asarray(ele, dtype=np.float64)
+    window_length = normalize_window(window_length, len(ele))
+    if len(ele) < window_length:
+        return ele.copy()
+
+    if method == "savgol":
+        from scipy.signal import savgol_filter
+        return savgol_filter(ele, window_length=window_length, polyorder=SAVGOL_POLYORDER)
+    if method == "moving_average":
+        return moving_average(ele, window_length)
+    if method == "gaussian":
+        return gaussian_fft(ele, window_length)
+    raise ValueError(f"Onbekende smoother: {method}")
+
+
+def moving_average(y, window_length):
+    """Gecentreerd gemiddelde via cumulatieve som: O(n), onafhankelijk van het venster."""
+    half = window_length // 2
+    padded = np.pad(y, half, mode="edge")
+    csum = np.cumsum(np.concatenate(([0.0], padded)))
+    return (csum[window_length:] - csum[:-window_length]) / window_length
+
+
+def gaussian_fft(y, window_length):
+    """Gaussische filter met sigma = venster / 6, als convolutie in het frequentiedomein."""
+    half = window_length // 2
+    sigma = max(window_length / 6.0, 1e-9)
+    kernel_x = np.arange(-half, half + 1)
+    kernel = np.exp(-0.5 * (kernel_x / sigma) ** 2)
+    kernel /= kernel.sum()
+
+    padded = np.pad(y, half, mode="edge")
+    size = len(padded) + len(kernel) - 1
+    spectrum = np.fft.rfft(padded, size) * np.fft.rfft(kernel, size)
+    full = np.fft.irfft(spectrum, size)
+    # 'valid'-gedeelte: opnieuw even lang als het oorspronkelijke signaal
+    return full[2 * half:2 * half + len(y)]
+
+
+class SmoothingPyramid:
+    """Lui gevulde set gladgestreken hoogtes voor één (track, detailniveau), met LRU-uitzetting."""
+
+    def __init__(self, ele, max_entries=64):
+        self.ele = np.asarray(ele, dtype=np.float64)
+        self.max_entries = max_entries
+        self._levels = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, window_length, method="savgol"):
+        key = (method, normalize_window(window_length, len(self.ele)))
+        with self._lock:
+            if key in self._levels:
+                self._levels.move_to_end(key)
+                self.hits += 1
+                return self._levels[key]
+
+        result = smooth(self.ele, key[1], method)
+        result.setflags(write=False)
+        with self._lock:
+            self.misses += 1
+            self._levels[key] = result
+            while len(self._levels) > self.max_entries:
+                self._levels.popitem(last=False)
+        return result
+
+    def precompute(self, window_lengths, method="savgol"):
+        # Bv. range(5, 502, 2): alle posities van de slider op voorhand
+        window_lengths = list(window_lengths)
+        self.max_entries = max(self.max_entries, len(window_lengths))
+        for window_length in window_lengths:
+            self.get(window_length, method)
+        return self
@@ -0,0 +1,95 @@
+"""Expliciete afhankelijkheden tussen de stappen van het hoogteprofiel.
+
+Elke stap onthoudt met welke parameters en met welke versie van zijn bovenliggende
+stappen hij laatst berekend werd. Wijzigt daar niets aan, dan komt het resultaat
+meteen terug; anders wordt enkel die stap herberekend en krijgt hij een nieuwe
+versie, zodat alles eronder vanzelf mee ververst.
+"""
+import time
+from collections import deque
+
+from instrumentation import stage as instrumented
+
+# stap -> stappen waarvan hij afhangt (in uitvoeringsvolgorde)
+PROFILE_STAGES = {
+    "parse": (),
+    "dem": ("parse",),
+    "resample": ("dem",),
+    "smooth": ("resample",),
+    "segments": ("smooth",),
+    "keypoints": ("smooth",),
+    "figure": ("smooth", "keypoints"),
+    "export": ("smooth", "keypoints"),
+}
+
+
+class StageGraph:
+    """Per sessie één resultaat per stap, herberekend als parameters of bovenliggende stappen wijzigen."""
+
+    def __init__(self, dependencies=PROFILE_STAGES, history=256):
+        self.dependencies = dict(dependencies)
+        self._values = {}
+        self._keys = {}
+        self._versions = dict.fromkeys(self.dependencies, 0)
+        # (stap, starttijd, duur in s) van elke herberekening
+        self.runs = deque(maxlen=history)
+
+    def _key(self, stage, params):
+        return params, tuple(self._versions[dep] for dep in self.dependencies[stage])
+
+    def is_current(self, stage, params):
+        """True als `run` voor deze parameters het bewaarde resultaat zou teruggeven."""
+        return stage in self._keys and self._keys[stage] == self._key(stage, params)
+
+    def run(self, stage, params, fn, *args):
+        key = self._key(stage, params)
+        if stage in self._keys and self._keys[stage] == key:
+            return self._values[stage]
+
+        start = time.perf_counter()
+        with instrumented(stage, input=args):
+            value = fn(*args)
+        self.runs.append((stage, start, time.perf_counter() - start))
+        self._values[stage] = value
+        self._keys[stage] = key
+        self._versions[stage] += 1
+        return value
+
+
+class InteractionLog:
+    """Latency per widget: van de callback tot het einde van de (fragment-)rerun."""
+
+    def __init__(self, history=200):
+        self._pending = None
+        self.records = deque(maxlen=history)
+
+    def mark(self, widget):
+        self._pending = (widget, time.perf_counter())
+
+    def finish(self, graph):
+        if self._pending is None:
+            return
+        widget, start = self._pending
+        self._pending = None
+        stages = [name for name, t, _ in graph.runs if t >= start]
+        self.records.append({
+            "widget": widget,
+            "ms": (time.perf_counter() - start) * 1000,
+            "stages": stages,
+        })
+
+    def summary(self):
+        """Per widget: aantal, gemiddelde en laatste latency en welke stappen herberekend werden."""
+        per_widget = {}
+        for r in self.records:
+            per_widget.setdefault(r["widget"], []).append(r)
+        return [
+            {
+                "Widget": widget,
+                "Aantal": len(rs),
+                "Gem. ms": round(sum(r["ms"] for r in rs) / len(rs), 1),
+                "Laatste ms": round(rs[-1]["ms"], 1),
+                "Herberekend": ", ".join(rs[-1]["stages"]) or "—",
+            }
+            for widget, rs in per_widget.items()
+        ]
@@ -0,0 +1,118 @@
+import os
+from dataclasses import dataclass, fields, replace
+
+import numpy as np
+
+from imports import lazy
+
+pd = lazy("pandas")  # enkel voor to_frame()
+
+# Coördinaten als int32 in 1e-7 graden (±1 cm), tijden als int32 seconden t.o.v. het eerste punt
+COORD_SCALE = 1e7
+MISSING_TIME = np.iinfo(np.int32).min
+
+# Vanaf dit aantal punten wordt een track op schijf als losse .npy's bewaard en gememory-mapt
+MMAP_THRESHOLD = int(os.environ.get("HOOGTEPROFIEL_MMAP_POINTS", "200000"))
+
+
+@dataclass
+class Track:
+    """Compacte struct-of-arrays voor één rit: 21 bytes per punt (5 × 4 + 1) i.p.v. Python-lijsten."""
+
+    lat_e7: np.ndarray         # int32
+    lon_e7: np.ndarray         # int32
+    ele: np.ndarray            # float32, NaN waar het punt geen hoogte heeft
+    dist_km: np.ndarray        # float32, cumulatieve afstand
+    time_s: np.ndarray         # int32, MISSING_TIME waar er geen tijd is
+    t0_ms: np.ndarray          # int64[1], epoch-ms van time_s == 0
+    segment_start: np.ndarray  # bool, True op het eerste punt van elk segment
+    wpt_lat: np.ndarray        # waypoints uit hetzelfde bestand (klein, float64)
+    wpt_lon: np.ndarray
+    wpt_name: np.ndarray
+
+    @classmethod
+    def from_arrays(cls, lat, lon, ele, dist_km, time=None, segment_start=None,
+                    wpt_lat=(), wpt_lon=(), wpt_name=()):
+        n = len(lat)
+        if segment_start is None:
+            segment_start = np.zeros(n, dtype=bool)
+            segment_start[:1] = True
+        time_s, t0_ms = _encode_times(time, n)
+        return cls(
+            lat_e7=np.round(np.asarray(lat) * COORD_SCALE).astype(np.int32),
+            lon_e7=np.round(np.asarray(lon) * COORD_SCALE).astype(np.int32),
+            ele=np.asarray(ele, dtype=np.float32),
+            dist_km=np.asarray(dist_km, dtype=np.float32),
+            time_s=time_s,
+            t0_ms=t0_ms,
+            segment_start=np.asarray(segment_start, dtype=bool),
+            wpt_lat=np.asarray(wpt_lat, dtype=np.float64),
+            wpt_lon=np.asarray(wpt_lon, dtype=np.float64),
+            wpt_name=np.asarray(wpt_name, dtype=str),
+        )
+
+    def __len__(self):
+        return len(self.dist_km)
+
+    # --- Afgeleide kolommen, enkel berekend wanneer nodig ---
+    @property
+    def lat(self):
+        return self.lat_e7 / COORD_SCALE
+
+    @property
+    def lon(self):
+        return self.lon_e7 / COORD_SCALE
+
+    @property
+    def time(self):
+        out = (self.t0_ms[0] + self.time_s.astype(np.int64) * 1000).astype("datetime64[ms]")
+        out[self.time_s == MISSING_TIME] = np.datetime64("NaT")
+        return out
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, f.name).nbytes for f in fields(self))
+
+    def slice(self, start=None, stop=None, step=None):
+        """Deel van de track als views (geen kopie) op dezelfde buffers."""
+        s = slice(start, stop, step)
+        return replace(
+            self,
+            lat_e7=self.lat_e7[s], lon_e7=self.lon_e7[s], ele=self.ele[s],
+            dist_km=self.dist_km[s], time_s=self.time_s[s], segment_start=self.segment_start[s],
+        )
+
+    def to_frame(self):
+        # Zelfde kolommen als de pagina altijd al plotte
+        return pd.DataFrame({
+            "Afstand (km)": self.dist_km,
+            "Hoogte (m)": self.ele,
+        }, copy=False)
+
+    # --- Opslag ---
+    def save_npy_dir(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        for f in fields(self):
+            np.save(os.path.join(directory, f"{f.name}.npy"), getattr(self, f.name))
+
+    @classmethod
+    def load_npy_dir(cls, directory, mmap=True):
+        mode = "r" if mmap else None
+        return cls(**{
+            f.name: np.load(os.path.join(directory, f"{f.name}.npy"), mmap_mode=mode)
+            for f in fields(cls)
+        })
+
+
+def _encode_times(time, n):
+    if time is None:
+        return np.full(n, MISSING_TIME, dtype=np.int32), np.zeros(1, dtype=np.int64)
+    ms = np.asarray(time, dtype="datetime64[ms]")
+    valid = ~np.isnat(ms)
+    if not valid.any():
+        return np.full(n, MISSING_TIME, dtype=np.int32), np.zeros(1, dtype=np.int64)
+    ms = ms.astype(np.int64)
+    t0 = ms[valid].min()
+    time_s = np.full(n, MISSING_TIME, dtype=np.int32)
+    time_s[valid] = (ms[valid] - t0) // 1000
+    return time_s, np.array([t0], dtype=np.int64)
@@ -0,0 +1,155 @@
+import dataclasses
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from hoogteprofiel.gpx_ingest import parse_gpx
+from hoogteprofiel.track import MMAP_THRESHOLD, Track
+
+# --- Standaardinstellingen (overschrijfbaar via omgevingsvariabelen) ---
+DEFAULT_DIR = os.environ.get(
+    "HOOGTEPROFIEL_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "hoogteprofiel_cache"),
+)
+DEFAULT_MAX_BYTES = int(os.environ.get("HOOGTEPROFIEL_CACHE_MB", "200")) * 1024 * 1024
+DEFAULT_MEMORY_ENTRIES = 16
+
+
+def content_key(data):
+    """Sleutel van een bestand: sha256 van de ruwe bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class TrackCache:
+    """Twee lagen cache voor geparste tracks: geheugen (LRU) + schijf (LRU op grootte).
+
+    Kleine tracks staan op schijf als gecomprimeerde .npz. Tracks vanaf
+    MMAP_THRESHOLD punten worden als map met losse .npy's bewaard en
+    gememory-mapt geladen, zodat alle sessies dezelfde pagina's delen.
+    """
+
+    def __init__(self, directory=DEFAULT_DIR, max_bytes=DEFAULT_MAX_BYTES,
+                 memory_entries=DEFAULT_MEMORY_ENTRIES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+        os.makedirs(directory, exist_ok=True)
+
+    # --- Publieke API ---
+    def get_or_parse(self, data, parser=parse_gpx, key=None):
+        key = key or content_key(data)
+
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return self._memory[key]
+
+        track = self._load(key)
+        if track is not None:
+            with self._lock:
+                self.stats["disk_hits"] += 1
+        else:
+            track = parser(io.BytesIO(data))
+            self._store(key, track)
+            with self._lock:
+                self.stats["misses"] += 1
+
+        self._remember(key, track)
+        return track
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        for path, _, _ in list(self._entries()):
+            _remove(path)
+
+    def disk_usage(self):
+        return sum(size for _, size, _ in self._entries())
+
+    # --- Geheugenlaag ---
+    def _remember(self, key, track):
+        with self._lock:
+            self._memory[key] = track
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    # --- Schijflaag ---
+    def _path(self, key, mmap=False):
+        return os.path.join(self.directory, f"{key}.track" if mmap else f"{key}.npz")
+
+    def _load(self, key):
+        mmap_path = self._path(key, mmap=True)
+        try:
+            if os.path.isdir(mmap_path):
+                path, track = mmap_path, Track.load_npy_dir(mmap_path)
+            else:
+                path = self._path(key)
+                with np.load(path) as npz:
+                    track = Track(**{f.name: npz[f.name] for f in dataclasses.fields(Track)})
+        except (FileNotFoundError, KeyError, TypeError, ValueError, OSError):
+            # Ontbrekend of in een ouder formaat: opnieuw parsen
+            return None
+        # Toegangstijd bijwerken: dit is de LRU-volgorde op schijf
+        os.utime(path)
+        return track
+
+    def _store(self, key, track):
+        if len(track) >= MMAP_THRESHOLD:
+            tmp_path = tempfile.mkdtemp(dir=self.directory, suffix=".tmp")
+            track.save_npy_dir(tmp_path)
+            final = self._path(key, mmap=True)
+            _remove(final)
+            os.replace(tmp_path, final)
+        else:
+            arrays = {f.name: getattr(track, f.name) for f in dataclasses.fields(track)}
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as fh:
+                np.savez_compressed(fh, **arrays)
+            os.replace(tmp_path, self._path(key))
+        self._evict()
+
+    def _entries(self):
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if name.endswith(".npz"):
+                    st = os.stat(path)
+                    yield path, st.st_size, st.st_mtime
+                elif name.endswith(".track"):
+                    size = sum(e.stat().st_size for e in os.scandir(path))
+                    yield path, size, os.stat(path).st_mtime
+            except FileNotFoundError:
+                continue
+
+    def _evict(self):
+        entries = sorted(self._entries(), key=lambda e: e[2])  # oudste eerst
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            # Gememory-mapte bestanden mogen weg: open mappings blijven geldig tot ze vrijkomen
+            _remove(path)
+            total -= size
+            with self._lock:
+                self.stats["evictions"] += 1
+
+
+def _remove(path):
+    try:
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        else:
+            os.remove(path)
+    except FileNotFoundError:
+        pass
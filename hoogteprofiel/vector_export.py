@@ -0,0 +1,186 @@
+import io
+from dataclasses import dataclass
+
+import numpy as np
+
+from hoogteprofiel.gradient import GRADIENT_COLORS, class_polygons, step_classes
+from hoogteprofiel.pipeline import DPI
+
+CM_PER_INCH = 2.54
+# De PNG wordt op DPI gelayout: 1 px in de Plotly-figuur = 72/DPI pt op papier
+PX_TO_PT = 72 / DPI
+
+# Plotly-marges (px) en lettergroottes van build_figure
+MARGIN_PX = dict(l=40, r=20, t=20, b=40)
+TICK_FONT_PX = 12
+LABEL_FONT_PX = 14
+MARKER_PX = 10
+
+PAPER_SIZES_CM = {"A4": (21.0, 29.7), "A3": (29.7, 42.0)}
+
+
+@dataclass
+class SheetProfile:
+    """Eén profiel op een printvel."""
+
+    dist: np.ndarray
+    elev: np.ndarray
+    keypoints: list
+    style: object
+    title: str = ""
+
+
+def _draw_profile(ax, dist, elev, keypoints, style):
+    from matplotlib.ticker import MaxNLocator
+
+    if style.gradient and len(dist) > 1:
+        # Eén samengesteld pad per hellingsklasse, net als de vaste set traces in build_figure
+        classes = step_classes(dist, elev)
+        base = float(np.nanmin(elev))
+        for cls, color in enumerate(GRADIENT_COLORS):
+            x, y = class_polygons(dist, elev, classes, cls, base)
+            if len(x):
+                # add_artist i.p.v. add_patch: de vlakken vallen binnen de limieten van de lijn,
+                # en add_patch overloopt anders elk deelpad om de limieten bij te werken
+                ax.add_artist(_polygons_patch(x, y, color))
+
+    ax.plot(dist, elev, color=style.line_color, linewidth=style.line_width * PX_TO_PT,
+            solid_capstyle="round")
+
+    for kp in keypoints:
+        ax.plot([kp.km], [kp.elev], "o", color=kp.color, markersize=MARKER_PX * PX_TO_PT,
+                markeredgewidth=0)
+        ax.annotate(kp.name, (kp.km, kp.elev), xytext=(0, MARKER_PX * PX_TO_PT),
+                    textcoords="offset points", ha="center", va="bottom",
+                    fontsize=LABEL_FONT_PX * PX_TO_PT, color=kp.color, annotation_clip=False)
+
+    # --- X-as ticks en labels (zelfde als de Plotly-figuur) ---
+    max_dist = float(np.max(dist))
+    tick_vals = np.arange(0, max_dist + style.tick_interval, style.tick_interval)
+    ax.set_xlim(0, max(max_dist, tick_vals[-1]))
+    if style.mirror:
+        ax.invert_xaxis()
+    ax.autoscale(axis="y")
+    ax.set_axis_off()
+
+    # Ticks als gewone tekst en één lijnstuk i.p.v. matplotlib Tick-objecten: veel sneller,
+    # wat telt bij een printvel met tientallen profielen
+    font = dict(fontsize=TICK_FONT_PX * PX_TO_PT, color="#444444")
+    tick_len = 5 * PX_TO_PT
+    pad = 2 * PX_TO_PT
+    x_trans = ax.get_xaxis_transform()
+    tick_x = np.repeat(tick_vals, 3)
+    tick_y = np.tile([0.0, 0.0, np.nan], len(tick_vals))
+    ax.plot(tick_x, tick_y, color="#444444", linewidth=PX_TO_PT, transform=x_trans,
+            marker=3, markersize=tick_len, markeredgewidth=PX_TO_PT, linestyle="none", clip_on=False)
+    for t in tick_vals:
+        ax.annotate(f"{int(t)} km", (t, 0), xycoords=x_trans, xytext=(0, -(tick_len + pad)),
+                    textcoords="offset points", ha="center", va="top", **font)
+
+    y_min, y_max = ax.get_ylim()
+    y_trans = ax.get_yaxis_transform()
+    for v in MaxNLocator(nbins=3).tick_values(y_min, y_max):
+        if y_min <= v <= y_max:
+            ax.annotate(f"{v:g}", (0, v), xycoords=y_trans, xytext=(-pad, 0),
+                        textcoords="offset points", ha="right", va="center", **font)
+
+
+def _polygons_patch(x, y, color):
+    # NaN sluit een vlak af; het punt erna begint een nieuw vlak
+    from matplotlib.patches import PathPatch
+    from matplotlib.path import Path
+
+    gap = np.isnan(x)
+    codes = np.full(len(x), Path.LINETO, dtype=Path.code_type)
+    codes[0] = Path.MOVETO
+    codes[1:][gap[:-1]] = Path.MOVETO
+    codes[gap] = Path.CLOSEPOLY
+    vertices = np.column_stack([np.where(gap, 0.0, x), np.where(gap, 0.0, y)])
+    # Haarlijn in dezelfde kleur: geen witte naden tussen aangrenzende vlakken
+    return PathPatch(Path(vertices, codes), facecolor=color, edgecolor=color, linewidth=0.2)
+
+
+def _axes_rect(left_in, bottom_in, width_in, height_in, fig_w_in, fig_h_in):
+    # Plotly-marges rond het plotgebied, binnen een kader van width_in × height_in
+    m = {k: v / DPI for k, v in MARGIN_PX.items()}
+    return [
+        (left_in + m["l"]) / fig_w_in,
+        (bottom_in + m["b"]) / fig_h_in,
+        max(width_in - m["l"] - m["r"], 0.01) / fig_w_in,
+        max(height_in - m["t"] - m["b"], 0.01) / fig_h_in,
+    ]
+
+
+def render_profile(dist, elev, keypoints, style, fmt="svg"):
+    """Eén profiel als SVG/PDF op exact cm_width × cm_height, zonder headless browser."""
+    from matplotlib.figure import Figure
+
+    w_in, h_in = style.cm_width / CM_PER_INCH, style.cm_height / CM_PER_INCH
+    fig = Figure(figsize=(w_in, h_in))
+    ax = fig.add_axes(_axes_rect(0, 0, w_in, h_in, w_in, h_in))
+    _draw_profile(ax, dist, elev, keypoints, style)
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format=fmt, transparent=True)
+    return buf.getvalue()
+
+
+def layout_sheet(sizes_cm, paper="A4", landscape=False, margin_cm=1.0, gap_cm=0.5):
+    """Plaats kaartjes (breedte, hoogte in cm) van links naar rechts, rij per rij.
+
+    Geeft per kaartje (pagina, x_cm, y_cm) terug; y gemeten vanaf de bovenrand.
+    """
+    page_w, page_h = PAPER_SIZES_CM[paper]
+    if landscape:
+        page_w, page_h = page_h, page_w
+
+    positions = []
+    page, x, y, row_h = 0, margin_cm, margin_cm, 0.0
+    for w, h in sizes_cm:
+        if w > page_w - 2 * margin_cm or h > page_h - 2 * margin_cm:
+            raise ValueError(f"Kaartje van {w} × {h} cm past niet op {paper}")
+        if x + w > page_w - margin_cm:
+            x, y, row_h = margin_cm, y + row_h + gap_cm, 0.0
+        if y + h > page_h - margin_cm:
+            page, x, y, row_h = page + 1, margin_cm, margin_cm, 0.0
+        positions.append((page, x, y))
+        x += w + gap_cm
+        row_h = max(row_h, h)
+    return positions, (page_w, page_h)
+
+
+def render_sheet(profiles, paper="A4", landscape=False, margin_cm=1.0, gap_cm=0.5, fmt="pdf"):
+    """Meerdere profielen op één of meer A4/A3-pagina's, elk op zijn exacte cm-afmetingen.
+
+    PDF krijgt één pagina per vel; SVG ondersteunt maar één pagina.
+    """
+    from matplotlib.backends.backend_pdf import PdfPages
+    from matplotlib.figure import Figure
+
+    sizes = [(p.style.cm_width, p.style.cm_height) for p in profiles]
+    positions, (page_w, page_h) = layout_sheet(sizes, paper, landscape, margin_cm, gap_cm)
+    n_pages = positions[-1][0] + 1 if positions else 1
+    if fmt != "pdf" and n_pages > 1:
+        raise ValueError("Meerdere pagina's kan enkel als PDF")
+
+    fig_w, fig_h = page_w / CM_PER_INCH, page_h / CM_PER_INCH
+    pages = [Figure(figsize=(fig_w, fig_h)) for _ in range(n_pages)]
+    for profile, (page, x_cm, y_cm) in zip(profiles, positions):
+        w_in = profile.style.cm_width / CM_PER_INCH
+        h_in = profile.style.cm_height / CM_PER_INCH
+        left_in = x_cm / CM_PER_INCH
+        bottom_in = fig_h - y_cm / CM_PER_INCH - h_in
+        ax = pages[page].add_axes(_axes_rect(left_in, bottom_in, w_in, h_in, fig_w, fig_h))
+        _draw_profile(ax, profile.dist, profile.elev, profile.keypoints, profile.style)
+        if profile.title:
+            pages[page].text(left_in / fig_w, (bottom_in + h_in) / fig_h, profile.title,
+                             fontsize=6, va="bottom", ha="left", color="#666666")
+
+    buf = io.BytesIO()
+    if fmt == "pdf":
+        with PdfPages(buf) as pdf:
+            for page in pages:
+                pdf.savefig(page, transparent=True)
+    else:
+        pages[0].savefig(buf, format=fmt, transparent=True)
+    return buf.getvalue()
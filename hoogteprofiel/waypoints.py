@@ -0,0 +1,91 @@
+import numpy as np
+
+from hoogteprofiel.gpx_ingest import ONE_DEGREE
+
+DEFAULT_RADIUS_M = 75.0
+
+
+class TrackIndex:
+    """KD-tree over de trackpunten (in meter, lokaal geprojecteerd) om coördinaten te snappen."""
+
+    def __init__(self, lat, lon, dist_km):
+        from scipy.spatial import cKDTree
+
+        self.dist_km = np.asarray(dist_km, dtype=np.float64)
+        self._lat0 = float(np.mean(lat)) if len(lat) else 0.0
+        self._tree = cKDTree(self._project(lat, lon))
+
+    def _project(self, lat, lon):
+        # Equirectangulair rond de middelste breedtegraad: ruim nauwkeurig genoeg voor één rit
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        x = lon * np.cos(np.radians(self._lat0)) * ONE_DEGREE
+        y = lat * ONE_DEGREE
+        return np.column_stack((x, y))
+
+    def snap(self, lat, lon, radius_m=DEFAULT_RADIUS_M):
+        """Afstand (km) langs de track voor elke coördinaat, in de opgegeven volgorde.
+
+        Passeert de track meerdere keren binnen radius_m (lussen, heen-en-terug),
+        dan wordt de eerste passage gekozen die niet vóór het vorige keypoint ligt.
+        Zonder passage binnen de straal valt het terug op het dichtstbijzijnde punt.
+        """
+        points = self._project(lat, lon)
+        if len(points) == 0:
+            return np.array([])
+
+        _, nearest = self._tree.query(points)
+        candidates = self._tree.query_ball_point(points, r=radius_m)
+
+        result = np.empty(len(points))
+        previous_km = -np.inf
+        for i, idx in enumerate(candidates):
+            passes = self._passes(np.sort(np.asarray(idx, dtype=np.int64)), points[i], radius_m)
+            if len(passes) == 0:
+                km = self.dist_km[nearest[i]]
+            else:
+                later = passes[passes >= previous_km]
+                km = later[0] if len(later) else passes[0]
+            result[i] = km
+            previous_km = km
+        return result
+
+    def _passes(self, idx, point, radius_m):
+        # Kandidaten opdelen in afzonderlijke passages en per passage het dichtste punt nemen
+        if len(idx) == 0:
+            return np.array([])
+        gaps = np.diff(self.dist_km[idx]) * 1000 > 2 * radius_m
+        group = np.concatenate(([0], np.cumsum(gaps)))
+        d2 = np.sum((self._tree.data[idx] - point) ** 2, axis=1)
+        order = np.lexsort((d2, group))
+        first = np.concatenate(([True], np.diff(group[order]) != 0))
+        return np.sort(self.dist_km[idx[order[first]]])
+
+
+def parse_coordinate_lines(text):
+    """Regels 'naam; lat; lon' (of 'naam, lat, lon') → (namen, lats, lons, foute regels).
+
+    Staat er een puntkomma in de regel, dan scheidt die de velden en mogen lat/lon een
+    decimale komma hebben ('SPR; 50,9443; 3,1267'); anders scheidt de komma. De naam is
+    alles vóór de laatste twee velden, dus mag zelf een komma bevatten. Coördinaten
+    buiten ±90 / ±180 tellen als foute regel.
+    """
+    names, lats, lons, errors = [], [], [], []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        sep = ";" if ";" in line else ","
+        parts = [p.strip() for p in line.rsplit(sep, 2)]
+        try:
+            name, lat, lon = parts[0], float(parts[1].replace(",", ".")), float(parts[2].replace(",", "."))
+        except (IndexError, ValueError):
+            errors.append(line)
+            continue
+        if not name or not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            errors.append(line)
+            continue
+        names.append(name)
+        lats.append(lat)
+        lons.append(lon)
+    return names, lats, lons, errors
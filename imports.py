@@ -1,6 +1,55 @@
-import streamlit as st
-import plotly.graph_objects as go
-import gpxpy
-import pandas as pd
-import numpy as np
-from scipy.signal import savgol_filter
+"""Gedeelde imports voor de pagina's, lui geladen.
+
+Bij een koude start betaalt elke pagina anders voor alle zware bibliotheken, ook als
+ze er geen gebruikt. `lazy("pandas")` geeft een module-proxy die pas importeert bij
+het eerste attribuut (pd.DataFrame, ...); daarna verwijst de proxy rechtstreeks
+naar de echte module. `from imports import *` blijft dezelfde namen geven.
+"""
+import importlib
+import types
+
+
+class LazyModule(types.ModuleType):
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__["_loaded"] = False
+
+    def _load(self):
+        module = importlib.import_module(self.__name__)
+        # Alle attributen overnemen: volgende opzoekingen gaan niet meer langs __getattr__
+        self.__dict__.update(module.__dict__)
+        self.__dict__["_loaded"] = True
+        return module
+
+    def __getattr__(self, attr):
+        if self.__dict__["_loaded"]:
+            raise AttributeError(f"module {self.__name__!r} has no attribute {attr!r}")
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load()) if not self.__dict__["_loaded"] else list(self.__dict__)
+
+    def __repr__(self):
+        state = "geladen" if self.__dict__["_loaded"] else "nog niet geladen"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+def lazy(name):
+    """Module-proxy; de import gebeurt pas bij het eerste gebruik."""
+    return LazyModule(name)
+
+
+def savgol_filter(*args, **kwargs):
+    # scipy enkel laden als er echt met scipy gesmoothed wordt
+    from scipy.signal import savgol_filter as _savgol_filter
+
+    return _savgol_filter(*args, **kwargs)
+
+
+st = lazy("streamlit")
+go = lazy("plotly.graph_objects")
+gpxpy = lazy("gpxpy")
+pd = lazy("pandas")
+np = lazy("numpy")
+
+__all__ = ["st", "go", "gpxpy", "pd", "np", "savgol_filter"]
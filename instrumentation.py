@@ -0,0 +1,307 @@
+"""Rekentijd, piekgeheugen en invoergrootte per stap van een pagina, per rerun.
+
+Aanzetten met een omgevingsvariabele (standaard uit):
+    INSTRUMENTATION=1        tijd + piekgeheugen (tracemalloc, enkel tijdens een stap)
+    INSTRUMENTATION=time     enkel tijd
+    INSTRUMENTATION_LOG      JSON-lines logbestand (standaard logs/instrumentation.jsonl),
+                             roteert per INSTRUMENTATION_LOG_MB (standaard 5) met 3 backups
+
+Gebruik op een pagina:
+    begin_run("Uitslagen Analyse")
+    with stage("statistieken", rows=long):
+        ...
+    end_run()                # schrijft de rerun weg en toont het debugpaneel in de sidebar
+
+of als decorator: `@timed("parse")`. Uitgeschakeld geeft `stage` altijd hetzelfde lege
+object terug en laat `timed` de functie ongemoeid; de grootte van de invoer wordt dan
+ook niet bepaald.
+
+Het piekgeheugen komt van tracemalloc (Python- en numpy-allocaties, niet alles van
+pyarrow); draaien meerdere sessies tegelijk een stap, dan tellen hun allocaties mee.
+tracemalloc vertraagt Python-zware stappen (en imports) merkbaar: voor zuivere tijden
+INSTRUMENTATION=time.
+"""
+import functools
+import json
+import logging
+import logging.handlers
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+
+MODE = os.environ.get("INSTRUMENTATION", "").strip().lower()
+ENABLED = MODE not in ("", "0", "false", "no", "off")
+TRACK_MEMORY = ENABLED and MODE != "time"
+LOG_PATH = os.environ.get("INSTRUMENTATION_LOG", os.path.join("logs", "instrumentation.jsonl"))
+LOG_BYTES = int(float(os.environ.get("INSTRUMENTATION_LOG_MB", "5")) * 1024 * 1024)
+LOG_BACKUPS = 3
+HISTORY = 20  # reruns per sessie in het debugpaneel
+
+_local = threading.local()
+_memory_lock = threading.Lock()
+_memory_users = 0
+_logger = None
+
+
+# --- Grootte van de invoer ---
+def size_of(value):
+    """Aantal elementen/rijen/bytes van een invoer.
+
+    Een getal wordt overgenomen; een tuple (bv. de argumenten van een functie) telt als
+    zijn grootste element met een len(), zodat losse instellingen niet meetellen.
+    """
+    if value is None or isinstance(value, (bool, str)):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, tuple):
+        sizes = [size_of(v) for v in value if not isinstance(v, (int, float))]
+        sizes = [s for s in sizes if s is not None]
+        return max(sizes) if sizes else None
+    try:
+        return len(value)
+    except TypeError:
+        # Bv. een UploadedFile: geen len(), wel een grootte in bytes
+        size = getattr(value, "size", None)
+        return size if isinstance(size, int) else None
+
+
+# --- Stappen ---
+class _NoStage:
+    """Wat `stage` teruggeeft als de instrumentatie uit staat."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **sizes):
+        pass
+
+
+_NO_STAGE = _NoStage()
+
+
+class Stage:
+    def __init__(self, name, sizes):
+        self.name = name
+        self.sizes = sizes
+        self.parent = None
+        self.record = None
+        self.start_bytes = 0
+        self.peak_bytes = 0
+
+    def set(self, **sizes):
+        """Groottes die pas binnen de stap gekend zijn (bv. het aantal geparste punten)."""
+        self.sizes.update({k: size_of(v) for k, v in sizes.items()})
+
+    def __enter__(self):
+        stack = _stack()
+        self.parent = stack[-1] if stack else None
+        stack.append(self)
+        # Meteen in de rerun zetten: zo staan de stappen in volgorde van start, ouders eerst
+        self.record = {"stage": self.name, "depth": len(stack) - 1}
+        run = getattr(_local, "run", None)
+        if run is not None:
+            run["stages"].append(self.record)
+        if TRACK_MEMORY:
+            _memory_start()
+            current, peak = tracemalloc.get_traced_memory()
+            if self.parent is not None:
+                # Piek tot nu toe bewaren voor de ouder, daarna meet deze stap vanaf nul
+                self.parent.peak_bytes = max(self.parent.peak_bytes, peak)
+            tracemalloc.reset_peak()
+            self.start_bytes = self.peak_bytes = current
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        record = self.record
+        record["ms"] = round((time.perf_counter() - self.start) * 1000, 2)
+        if TRACK_MEMORY:
+            self.peak_bytes = max(self.peak_bytes, tracemalloc.get_traced_memory()[1])
+            if self.parent is not None:
+                self.parent.peak_bytes = max(self.parent.peak_bytes, self.peak_bytes)
+            record["peak_kb"] = round((self.peak_bytes - self.start_bytes) / 1024, 1)
+            _memory_stop()
+        record["sizes"] = {k: v for k, v in self.sizes.items() if v is not None}
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        _stack().pop()
+        return False
+
+
+def stage(name, **sizes):
+    """Context manager rond één stap; `sizes` zijn getallen of objecten met een len()."""
+    if not ENABLED:
+        return _NO_STAGE
+    return Stage(name, {k: size_of(v) for k, v in sizes.items()})
+
+
+def timed(name=None, sizes=None):
+    """Decorator-variant van `stage`; `sizes(*args, **kwargs)` geeft de invoergroottes."""
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name or fn.__name__, **(sizes(*args, **kwargs) if sizes else {})):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def _stack():
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+def _memory_start():
+    # tracemalloc loopt enkel zolang er ergens een stap bezig is
+    global _memory_users
+    with _memory_lock:
+        if _memory_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _memory_users += 1
+
+
+def _memory_stop():
+    global _memory_users
+    with _memory_lock:
+        _memory_users -= 1
+        if _memory_users == 0:
+            tracemalloc.stop()
+
+
+# --- Reruns ---
+def begin_run(page):
+    """Start de meting van één rerun van `page` in deze scriptthread."""
+    if not ENABLED:
+        return
+    import streamlit as st
+
+    # Een rerun die met st.stop() of een fout eindigde, alsnog wegschrijven
+    previous = st.session_state.get("_instrumentation_run")
+    if previous is not None and not previous.get("finished"):
+        _finish(previous)
+    if "_instrumentation_session" not in st.session_state:
+        st.session_state["_instrumentation_session"] = uuid.uuid4().hex[:8]
+        st.session_state["_instrumentation_history"] = []
+
+    run = {
+        "page": page,
+        "session": st.session_state["_instrumentation_session"],
+        "started": time.time(),
+        "start": time.perf_counter(),
+        "stages": [],
+    }
+    _local.run = run
+    _local.stack = []
+    st.session_state["_instrumentation_run"] = run
+
+
+def end_run(panel=True):
+    """Sluit de rerun af, schrijft hem naar het log en toont (optioneel) het debugpaneel."""
+    if not ENABLED:
+        return
+    run = getattr(_local, "run", None)
+    if run is None or run.get("finished"):
+        return
+    _finish(run)
+    _local.run = None
+    if panel:
+        show_panel(run)
+
+
+def fragment_run(page):
+    """Decorator voor een st.fragment: een eigen rerun als het fragment alleen draait.
+
+    Een fragment-rerun voert enkel het fragment uit; zonder dit hoorden zijn stappen
+    bij geen enkele rerun. Het paneel wordt dan niet getekend (een fragment mag niet
+    in de sidebar schrijven), het log krijgt de rerun wel.
+    """
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if getattr(_local, "run", None) is not None:
+                return fn(*args, **kwargs)
+            begin_run(page)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                end_run(panel=False)
+        return wrapper
+    return decorate
+
+
+def _finish(run):
+    import streamlit as st
+
+    run["finished"] = True
+    run["total_ms"] = round((time.perf_counter() - run["start"]) * 1000, 2)
+    history = st.session_state.get("_instrumentation_history")
+    if history is not None:
+        history.append(run)
+        del history[:-HISTORY]
+    try:
+        _log().info(json.dumps({
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(run["started"])),
+            "page": run["page"],
+            "session": run["session"],
+            "total_ms": run["total_ms"],
+            "stages": run["stages"],
+        }, default=str))
+    except OSError:
+        pass  # geen schrijfrechten: het paneel werkt nog
+
+
+def _log():
+    global _logger
+    if _logger is None:
+        directory = os.path.dirname(LOG_PATH)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(
+            LOG_PATH, maxBytes=LOG_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8"
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger = logging.getLogger("instrumentation")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        logger.addHandler(handler)
+        _logger = logger
+    return _logger
+
+
+# --- Debugpaneel ---
+def show_panel(run):
+    import streamlit as st
+
+    with st.sidebar.expander(f"🛠️ Debug: {run['total_ms']:.0f} ms deze rerun", expanded=False):
+        if run["stages"]:
+            st.dataframe(
+                [
+                    {
+                        "Stap": "  " * r["depth"] + r["stage"],
+                        "ms": r["ms"],
+                        **({"Piek kB": r.get("peak_kb")} if TRACK_MEMORY else {}),
+                        "Invoer": ", ".join(f"{k}={v:,}" for k, v in r["sizes"].items()),
+                    }
+                    for r in run["stages"]
+                ],
+                hide_index=True,
+            )
+        else:
+            st.caption("Geen stappen uitgevoerd (alles uit de cache).")
+        history = st.session_state.get("_instrumentation_history") or []
+        if len(history) > 1:
+            st.caption("Vorige reruns (ms): " + " · ".join(f"{r['total_ms']:.0f}" for r in history[-10:-1]))
+        st.caption(f"Log: {LOG_PATH}")
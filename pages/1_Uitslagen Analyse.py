@@ -1,9 +1,22 @@
 import streamlit as st
-import pandas as pd
-import plotly.graph_objs as go
 from datetime import datetime
-import numpy as np
-import plotly.express as px
+import time
+
+from imports import lazy
+from instrumentation import begin_run, end_run, stage
+
+from uitslagen.charts import results_over_time
+from uitslagen.headtohead import HeadToHead
+from uitslagen.stats import DEFAULT_WINDOW, latest_form, leaderboard, rider_stats, rolling_stats
+from uitslagen.store import ResultsStore, race_labels, wide_positions
+
+# Pas laden als er uitslagen zijn om te tonen
+pd = lazy("pandas")
+go = lazy("plotly.graph_objs")
+np = lazy("numpy")
+
+# Rekentijd per stap (enkel met INSTRUMENTATION=1, zie instrumentation.py)
+begin_run("Uitslagen Analyse")
 
 # --- HEADER & INTRODUCTIE ---
 
@@ -30,51 +43,113 @@ with st.expander("ℹ️ Strategisch doel & Gebruik"):
     ---  
 
     ### Hoe gebruik je deze tool?  
-    1. Upload een Excel-bestand met de uitslagen (gebruik bij voorkeur de standaard template).  
+    1. Upload een Excel-bestand met de uitslagen (gebruik bij voorkeur de standaard template). Elk seizoen wordt bewaard in het archief, zodat je daarna ook vorige seizoenen kan selecteren.  
     2. Vergelijk prestaties van meerdere renners over tijd met de lijngrafiek.  
     3. Analyseer uitslagen per individuele koers via de staafgrafiek.  
     4. Bekijk de consistentie van renners (stabiele prestaties = lager standaarddeviatie).  
-    5. Download indien nodig de standaard Excel-template onderaan om je eigen data voor te bereiden.  
+    5. Bekijk het klassement en de vorm over de laatste koersen (gemiddelde, top-10 ratio, DNF's, ...).  
+    6. Bekijk de onderlinge duels: wie eindigt voor wie in dezelfde koers, met een rating per renner.  
+    7. Download indien nodig de standaard Excel-template onderaan om je eigen data voor te bereiden.  
 
     ---  
     """)
 
-# --- FILE UPLOADER ---
+# --- ARCHIEF ---
+@st.cache_resource
+def get_results_store():
+    return ResultsStore()
 
-uploaded_file = st.file_uploader("Upload het Excel bestand:", type=["xlsx"])
 
-if uploaded_file:
+@st.cache_data(max_entries=16, show_spinner=False)
+def load_results(seasons, store_version):
+    # store_version verandert bij elke nieuwe workbook, zodat de cache dan vervalt
+    long = get_results_store().load(list(seasons))
+    return long, wide_positions(long)
 
-    # --- DATA INLADEN ---
 
-    raw_df = pd.read_excel(uploaded_file, sheet_name="Uitslagen", header=None)
+@st.cache_resource(max_entries=32)
+def results_figure(seasons, store_version, riders):
+    # Figuur per selectie bewaren (niet kopiëren): een rerun zonder wijziging bouwt niets opnieuw.
+    # Het Figure-object zelf, geen JSON of dict: st.plotly_chart serialiseert altijd opnieuw
+    # en valideert een dict eerst nog via go.Figure, wat trager is dan een Figure doorgeven
+    _, wide = load_results(seasons, store_version)
+    return results_over_time(wide, list(riders))
 
-    # Haal kolomnamen (racedata) uit tweede rij, vanaf kolom 4 (index 3)
-    race_dates = raw_df.iloc[1, 3:].tolist()
 
-    # Haal rennersnamen uit derde rij en verder, kolom 2 (index 1)
-    names = raw_df.iloc[2:, 1].tolist()
+@st.cache_resource(max_entries=8)
+def get_head_to_head(seasons):
+    # Blijft bestaan over reruns: bij een nieuwe workbook komen enkel de nieuwe koersen erbij
+    return HeadToHead()
 
-    # Resultaten vanaf derde rij, kolom 4 en verder, reset index om makkelijker te werken
-    results = raw_df.iloc[2:, 3:].reset_index(drop=True)
 
-    # Dataframe maken met resultaten, kolomnamen = race_dates
-    df = pd.DataFrame(results.values, columns=race_dates)
+@st.cache_data(max_entries=16, show_spinner=False)
+def load_statistics(seasons, store_version):
+    # Eén keer per archiefversie en seizoenkeuze; renners kiezen is daarna een opzoeking
+    long, _ = load_results(seasons, store_version)
+    return rider_stats(long)
 
-    # Voeg 'NAME' kolom toe met rennersnamen, zet als index
-    df.insert(0, "NAME", names)
-    df.set_index("NAME", inplace=True)
 
-    # --- DATA CLEANING ---
+@st.cache_data(max_entries=16, show_spinner=False)
+def load_form(seasons, store_version, window):
+    long, _ = load_results(seasons, store_version)
+    rolling = rolling_stats(long, window)
+    return rolling, latest_form(rolling)
 
-    df = df.astype(str)  # Eerst alles string maken voor vervangingen
-    df = df.replace(to_replace=["", "nan", "NaN"], value=pd.NA)  # lege cellen vervangen door NA
-    df = df.mask(df == "DNF", pd.NA)  # 'DNF' vervangen door NA
-    df = df.apply(pd.to_numeric, errors="coerce")  # Probeer alles om te zetten naar numeriek
 
-    # Verwijder rijen en kolommen die helemaal leeg zijn
-    df.dropna(how="all", inplace=True)
-    df.dropna(axis=1, how="all", inplace=True)
+# --- FILE UPLOADER ---
+
+uploaded_file = st.file_uploader("Upload het Excel bestand:", type=["xlsx"])
+
+# --- DATA INLADEN ---
+# Elke workbook wordt één keer ingelezen in het archief (Parquet per seizoen) en
+# vervangt de seizoenen die erin staan; daarna komt alles uit het archief.
+# Het archief is gedeeld: elke sessie ziet dezelfde seizoenen.
+store = get_results_store()
+
+# Eén keer per upload: anders zette een rerun na "Seizoen verwijderen" het seizoen
+# meteen terug zolang het bestand nog in de uploader staat.
+if uploaded_file and st.session_state.get("ingested_upload") != uploaded_file.file_id:
+    try:
+        with stage("ingest", bytes=uploaded_file.size):
+            summary = store.ingest(uploaded_file.getvalue())
+    except ValueError as e:
+        st.error(f"De workbook kon niet ingelezen worden: {e}")
+    else:
+        st.session_state["ingested_upload"] = uploaded_file.file_id
+        st.session_state["uploaded_seasons"] = summary["seasons"]
+        if summary["new"]:
+            st.success(
+                f"In het archief gezet: seizoen {', '.join(map(str, summary['seasons']))} — "
+                f"{summary['riders']} renners, {summary['races']} koersen, {summary['dnf']} DNF's."
+            )
+
+available_seasons = store.seasons()
+uploaded_seasons = [
+    s for s in st.session_state.get("uploaded_seasons", []) if uploaded_file and s in available_seasons
+]
+
+if available_seasons:
+    with st.sidebar.expander("Archief beheren"):
+        st.caption("Een nieuwe upload vervangt het volledige seizoen. Verwijderen geldt voor iedereen.")
+        season_to_delete = st.selectbox("Seizoen", available_seasons[::-1], key="delete_season")
+        if st.button("Seizoen verwijderen"):
+            store.delete_season(season_to_delete)
+            st.rerun()
+df = None
+
+if available_seasons:
+    selected_seasons = st.multiselect(
+        "Seizoenen",
+        available_seasons,
+        default=uploaded_seasons or available_seasons[-1:],
+    )
+    with stage("load", seasons=selected_seasons) as loading:
+        long_results, df = load_results(tuple(selected_seasons), store.version())
+        loading.set(results=long_results)
+    with stage("stats", results=long_results):
+        rider_table = load_statistics(tuple(selected_seasons), store.version())
+
+if df is not None and not df.empty:
 
     riders = df.index.tolist()  # lijst met renners
 
@@ -92,33 +167,24 @@ if uploaded_file:
 
     if selected_riders:
 
-        # Lijngrafiek met prestaties per renner
-        fig = go.Figure()
-
-        for rider in selected_riders:
-            results = df.loc[rider]
-            fig.add_trace(
-                go.Scatter(
-                    x=results.index,
-                    y=results.values,
-                    mode="lines+markers",
-                    name=rider,
-                    connectgaps=True,
-                    line_shape="spline",
-                    hovertemplate="Koers: %{x}<br>Uitslag: %{y}<extra></extra>",
-                )
-            )
-
-        fig.update_layout(
-            title="Resultaten over de tijd",
-            xaxis_title="Koers (chronologisch)",
-            yaxis_title="Uitslag",
-            yaxis=dict(autorange="reversed"),  # beter resultaat bovenaan
-            height=500,
+        # Lijngrafiek met prestaties per renner; boven een drempel WebGL met gebundelde traces
+        with stage("chart", riders=selected_riders):
+            fig, chart_info = results_figure(tuple(selected_seasons), store.version(), tuple(selected_riders))
+
+        start = time.perf_counter()
+        with stage("chart_send", points=chart_info["points"]):
+            st.plotly_chart(fig)
+        # Enkel de servertijd van st.plotly_chart (serialiseren + versturen); het tekenen in
+        # de browser is van hieruit niet te meten
+        serialize_ms = (time.perf_counter() - start) * 1000
+        st.caption(
+            f"{chart_info['points']} punten in {chart_info['traces']} traces "
+            f"({'WebGL' if chart_info['mode'] == 'webgl' else 'SVG'}), "
+            f"{chart_info['bytes'] / 1024:.0f} kB naar de browser — "
+            f"opgebouwd in {chart_info['build_ms']:.0f} ms (gecachet per selectie), "
+            f"serialiseren en versturen op de server {serialize_ms:.0f} ms (tekentijd in de browser niet gemeten)."
         )
 
-        st.plotly_chart(fig)
-
         # 2) Vergelijk prestaties in één specifieke wedstrijd (bar chart)
         st.markdown("---")
         st.subheader("Vergelijk de teamprestaties in één specifieke wedstrijd.")
@@ -153,6 +219,13 @@ if uploaded_file:
 
             st.plotly_chart(fig_bar)
 
+            # DNF's apart vermelden: ze staan niet als plaats in de grafiek
+            dnf_riders = long_results.loc[
+                (race_labels(long_results) == selected_race) & (long_results["status"] == "dnf"), "rider"
+            ].tolist()
+            if dnf_riders:
+                st.caption(f"DNF: {', '.join(dnf_riders)}")
+
         # 3) Consistentie van prestaties vergelijken (standaarddeviatie)
         st.markdown("---")
         st.subheader("Vergelijk consistentie van prestaties")
@@ -167,7 +240,7 @@ if uploaded_file:
 
         if selected_riders_consistency:
             consistency_series = (
-                df.loc[selected_riders_consistency].std(axis=1, skipna=True).dropna()
+                rider_table.loc[selected_riders_consistency, "std"].dropna()
             )
             consistency_sorted = consistency_series.sort_values()
 
@@ -198,8 +271,136 @@ if uploaded_file:
     else:
         st.info("Selecteer minstens een renner om de grafiek te zien.")
 
-else:
+    # 4) Klassement en vorm over de laatste koersen
+    st.markdown("---")
+    st.subheader("Klassement en vorm")
+
+    sort_labels = {
+        "Gemiddelde uitslag": "mean",
+        "Mediaan": "median",
+        "Beste uitslag": "best",
+        "Top-10 ratio": "top10",
+        "Consistentie (std)": "std",
+    }
+    col_sort, col_window, col_starts = st.columns(3)
+    sort_by = col_sort.selectbox("Sorteer op", list(sort_labels))
+    window = col_window.number_input(
+        "Vorm over de laatste N uitgereden koersen", min_value=2, max_value=30, value=DEFAULT_WINDOW
+    )
+    min_starts = col_starts.number_input("Minimum aantal starts", min_value=1, value=1)
+
+    with stage("form", results=long_results, window=int(window)):
+        form_rolling, form_latest = load_form(tuple(selected_seasons), store.version(), int(window))
+    board = leaderboard(rider_table, sort_labels[sort_by], int(min_starts)).join(
+        form_latest.add_prefix("form_")
+    )
+    st.dataframe(
+        board,
+        column_config={
+            "starts": st.column_config.NumberColumn("Starts"),
+            "dnf": st.column_config.NumberColumn("DNF"),
+            "mean": st.column_config.NumberColumn("Gemiddelde", format="%.1f"),
+            "median": st.column_config.NumberColumn("Mediaan", format="%.1f"),
+            "best": st.column_config.NumberColumn("Beste", format="%d"),
+            "std": st.column_config.NumberColumn("Std", format="%.1f"),
+            "top10": st.column_config.ProgressColumn("Top-10", min_value=0.0, max_value=1.0, format="percent"),
+            "percentile": st.column_config.NumberColumn("Percentiel", format="%.0f"),
+            "form_mean": st.column_config.NumberColumn(f"Vorm gem. (laatste {window})", format="%.1f"),
+            "form_std": st.column_config.NumberColumn(f"Vorm std (laatste {window})", format="%.1f"),
+            "form_top10": st.column_config.NumberColumn(f"Vorm top-10 (laatste {window})", format="percent"),
+        },
+    )
+
+    if selected_riders:
+        fig_form = go.Figure()
+        for rider in selected_riders:
+            rider_form = form_rolling[form_rolling["rider"] == rider]
+            fig_form.add_trace(
+                go.Scatter(
+                    x=rider_form["race"],
+                    y=rider_form["mean"],
+                    mode="lines+markers",
+                    name=rider,
+                    hovertemplate="Koers: %{x}<br>Gemiddelde: %{y:.1f}<extra></extra>",
+                )
+            )
+        fig_form.update_layout(
+            title=f"Gemiddelde uitslag over de laatste {window} uitgereden koersen",
+            xaxis_title="Koers (chronologisch)",
+            xaxis=dict(categoryorder="array", categoryarray=list(df.columns)),
+            yaxis_title="Voortschrijdend gemiddelde",
+            yaxis=dict(autorange="reversed"),
+            height=450,
+        )
+        st.plotly_chart(fig_form)
+
+    # 5) Onderlinge duels en rating
+    st.markdown("---")
+    st.subheader("Onderlinge duels")
+    st.caption(
+        "Een duel = twee renners in dezelfde koers; wie voor de ander eindigt wint (een opgave "
+        "eindigt achter alle renners die uitrijden). De rating volgt uit alle duels samen "
+        "(Bradley–Terry, 1500 = referentie; 400 punten verschil ≈ 10 tegen 1)."
+    )
+
+    head_to_head = get_head_to_head(tuple(selected_seasons))
+    with stage("head_to_head", results=long_results), head_to_head.lock:
+        head_to_head.update(long_results, store.version())
+        rating_table = head_to_head.ratings()
+
+    st.dataframe(
+        rating_table,
+        column_config={
+            "rating": st.column_config.NumberColumn("Rating", format="%.0f"),
+            "duels": st.column_config.NumberColumn("Duels"),
+            "wins": st.column_config.NumberColumn("Gewonnen"),
+            "losses": st.column_config.NumberColumn("Verloren"),
+            "win_rate": st.column_config.ProgressColumn("Winst %", min_value=0.0, max_value=1.0, format="percent"),
+            "opponents": st.column_config.NumberColumn("Tegenstanders"),
+        },
+    )
+
+    duel_riders = st.multiselect(
+        "Renners in de duelmatrix",
+        rating_table.index.tolist(),
+        default=rating_table.index[:15].tolist(),
+    )
+    if len(duel_riders) >= 2:
+        with stage("duel_matrix", riders=duel_riders):
+            wins, losses, costarts = head_to_head.matrix(duel_riders)
+        duels = wins + losses
+        share = np.divide(wins, duels, out=np.full(wins.shape, np.nan), where=duels > 0)
+        labels = np.char.add(np.char.add(wins.astype(str), "–"), losses.astype(str))
+
+        fig_duels = go.Figure(
+            go.Heatmap(
+                z=share,
+                x=duel_riders,
+                y=duel_riders,
+                text=labels,
+                customdata=costarts,
+                texttemplate="%{text}" if len(duel_riders) <= 20 else None,
+                colorscale="RdYlGn",
+                zmin=0,
+                zmax=1,
+                hovertemplate="%{y} vs %{x}<br>Gewonnen–verloren: %{text}<br>"
+                              "Samen gestart: %{customdata}<extra></extra>",
+                colorbar=dict(title="Winst %", tickformat=".0%"),
+            )
+        )
+        fig_duels.update_layout(
+            title="Onderlinge duels (rij tegen kolom)",
+            yaxis=dict(autorange="reversed"),
+            height=max(450, 28 * len(duel_riders)),
+        )
+        st.plotly_chart(fig_duels)
+    else:
+        st.info("Selecteer minstens twee renners voor de duelmatrix.")
+
+elif not available_seasons:
     st.info("Upload de Excel template die een ingevuld uitslagen tabblad bevat.")
+else:
+    st.info("Selecteer minstens één seizoen.")
 
 st.markdown("---")
 st.markdown("\n\nDownload hieronder de input template indien nodig.")
@@ -218,4 +419,6 @@ except FileNotFoundError:
     # Template bestand niet gevonden, geen download-knop tonen
     pass
 
-st.markdown("---")
\ No newline at end of file
+st.markdown("---")
+
+end_run()
\ No newline at end of file
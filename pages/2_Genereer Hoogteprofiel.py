@@ -1,7 +1,26 @@
+from dataclasses import replace
+
 from imports import *
+from instrumentation import begin_run, end_run, fragment_run, stage
+from hoogteprofiel.dem import DemSampler, correct_elevation
+from hoogteprofiel.downsample import METHODS
+from hoogteprofiel.pipeline import (
+    DEFAULT_KEYPOINT_COLORS, EXPORT_SCALE, LINE_COLORS, Keypoint, ProfileSettings, ProfileStyle,
+    build_figure, parser_for, place_keypoints, resample,
+)
+from hoogteprofiel.progressive import BACKGROUND_BYTES, ProgressiveParse, parse_executor
+from hoogteprofiel.render_service import RenderService
+from hoogteprofiel.segments import ClimbSettings, detect_climbs, detect_ramps
+from hoogteprofiel.smoothing import SMOOTHERS, SmoothingPyramid
+from hoogteprofiel.stages import InteractionLog, StageGraph
+from hoogteprofiel.track_cache import TrackCache, content_key
+from hoogteprofiel.vector_export import render_profile
+from hoogteprofiel.waypoints import TrackIndex, parse_coordinate_lines
 
 # --- Pagina config en titel ---
 st.set_page_config(page_title="Genereer Hoogteprofiel", layout="centered")
+# Rekentijd per stap (enkel met INSTRUMENTATION=1, zie instrumentation.py)
+begin_run("Genereer Hoogteprofiel")
 st.markdown(
     f"""
     <h1 style='color:#fb5d01;'>Genereer Hoogteprofiel</h1>
@@ -20,7 +39,7 @@ with st.expander("ℹ️ Strategisch doel en instructies", expanded=False):
     De gegenereerde afbeelding is geschikt om als overzichtelijk kaartje op bijvoorbeeld de bovenbuis of het stuur van de fiets te plakken — ideaal voor snelle referentie tijdens de race.
                 
     ### Instructies
-    1. Upload een GPX-bestand van een trainingsrit of wedstrijd.  
+    1. Upload een GPX-bestand of een FIT-bestand (rechtstreeks van je Garmin/Wahoo) van een trainingsrit of wedstrijd.  
     2. Pas alle instellingen aan in de sidebar links:
 
     <ul style="list-style:none; padding-left:0;">
@@ -33,198 +52,424 @@ with st.expander("ℹ️ Strategisch doel en instructies", expanded=False):
     4. Download de afbeelding en gebruik deze bijvoorbeeld als tactisch overzicht op de fiets.
     """, unsafe_allow_html=True)
 
-# --- GPX-file upload veld ---
-uploaded_file = st.file_uploader("Upload een GPX-bestand", type=["gpx"])
+# --- Gedeelde track-cache (over alle sessies heen) ---
+@st.cache_resource
+def get_track_cache():
+    return TrackCache()
+
+
+@st.cache_resource
+def get_render_service():
+    return RenderService()
+
+
+@st.cache_resource
+def get_dem_sampler():
+    # Tegels uit HOOGTEPROFIEL_DEM_DIR; zonder map blijft de DEM-correctie verborgen
+    return DemSampler()
+
+
+@st.cache_resource
+def get_parse_executor():
+    # Gedeeld over alle sessies: grote uploads wachten hier op hun beurt i.p.v. de server te blokkeren
+    return parse_executor()
+
+
+# --- Gecachte tussenstappen (per track-inhoud en instellingen) ---
+@st.cache_data(max_entries=32, show_spinner=False)
+def resample_track(track_key, max_points, method, _track):
+    return resample(_track, ProfileSettings(max_points=max_points, downsample_method=method))
+
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def get_smoothing_pyramid(track_key, max_points, method, _elev):
+    return SmoothingPyramid(_elev)
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def detect_segments(track_key, profile_key, climb_settings, _dist, _elev):
+    return detect_climbs(_dist, _elev, climb_settings), detect_ramps(_dist, _elev, climb_settings)
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def render_vector(track_key, profile_key, keypoints, style, fmt, _dist, _elev):
+    return render_profile(_dist, _elev, keypoints, style, fmt)
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def get_track_index(track_key, _track):
+    return TrackIndex(_track.lat, _track.lon, _track.dist_km)
+
+
+def load_upload(uploaded_file):
+    # Geparste track ophalen op basis van de inhoud; enkel bij een miss wordt het bestand gelezen
+    file_bytes = uploaded_file.getvalue()
+    track_key = content_key(file_bytes)
+    return track_key, get_track_cache().get_or_parse(file_bytes, parser=parser_for(uploaded_file.name), key=track_key)
+
+
+def background_parse(uploaded_file):
+    """Lopende achtergrondverwerking voor deze upload; een vorige upload wordt geannuleerd."""
+    current = st.session_state.get("parse_job")
+    if current is not None and current["file_id"] == uploaded_file.file_id:
+        return current["job"]
+    cancel_background_parse()
+    job = ProgressiveParse(
+        uploaded_file.getvalue(), parser_for(uploaded_file.name), get_track_cache(), get_parse_executor()
+    )
+    st.session_state.parse_job = {"file_id": uploaded_file.file_id, "job": job}
+    return job
+
+
+def cancel_background_parse():
+    current = st.session_state.pop("parse_job", None)
+    if current is not None:
+        current["job"].cancel()
+
+
+@st.fragment(run_every=0.5)
+def show_parse_progress(job):
+    # Pollt de achtergrondthread; zodra de track klaar is herlaadt de hele pagina
+    if job.done:
+        st.rerun()
+
+    label = f"Bestand verwerken... {job.points:,} punten gelezen".replace(",", ".")
+    st.progress(job.fraction, text=label)
+
+    # Grove preview die met elke chunk verder groeit
+    preview_dist, preview_elev = job.preview()
+    if len(preview_dist) > 1:
+        preview = go.Figure(go.Scatter(x=preview_dist, y=preview_elev, mode="lines", line=dict(color="#999999")))
+        preview.update_layout(height=200, margin=dict(l=40, r=20, t=20, b=40), xaxis_title="km")
+        st.plotly_chart(preview, use_container_width=True)
+
+    if st.button("Annuleren"):
+        job.cancel()
+        st.rerun()
+
+
+def apply_dem(track, use_dem):
+    if not use_dem:
+        return track, 0.0
+    return correct_elevation(track, get_dem_sampler())
+
+
+def make_keypoints(track_key, track, dist, elev, names, distances, colors, coord_lats, coord_lons):
+    if coord_lats:
+        # Keypoints op coördinaat: gesnapt op de dichtstbijzijnde trackpositie
+        distances = list(distances) + get_track_index(track_key, track).snap(coord_lats, coord_lons).tolist()
+    return place_keypoints(dist, elev, [
+        Keypoint(name, km, color) for name, km, color in zip(names, distances, colors)
+    ])
+
+
+# --- Afhankelijkheden en latency per sessie ---
+# parse → dem → resample → smooth → (segments, keypoints) → (figure, export); elke interactie
+# herberekent enkel de stappen onder de gewijzigde instelling
+if "stage_graph" not in st.session_state:
+    st.session_state.stage_graph = StageGraph()
+    st.session_state.interaction_log = InteractionLog()
+graph = st.session_state.stage_graph
+log = st.session_state.interaction_log
+
+
+# --- Weergave en export: een fragment, dus spiegelen/ticks/formaat herlaadt enkel dit deel ---
+@st.fragment
+@fragment_run("Genereer Hoogteprofiel (weergave)")
+def show_profile(track_key, profile_key, dist, elev, keypoints, base_style):
+    # --- Checkbox om profiel te spiegelen (indien renners verticaal kaartje willen) --- #
+    mirror_profile = st.checkbox(
+        "Profiel spiegelen (0 km rechts)", value=False, on_change=log.mark, args=("Spiegelen",)
+    )
+
+    # --- Interval tussen X-as marks ---
+    tick_interval = st.slider(
+        "Interval afstandlabels (km)", 5, 50, 20, on_change=log.mark, args=("Interval afstandlabels",)
+    )
+
+    # --- Plot bouwen met Plotly ---
+    style = replace(base_style, mirror=mirror_profile, tick_interval=tick_interval)
+    px_width, px_height = style.px_width, style.px_height
+    fig = graph.run("figure", (style,), build_figure, dist, elev, keypoints, style)
+
+    # --- Plot tonen ---
+    st.subheader("Hoogteprofiel met keypoints")
+    with stage("figure_send", input=dist):
+        st.plotly_chart(fig, use_container_width=False)
+
+    # --- Export: SVG/PDF rechtstreeks (vector, drukklaar), PNG via de renderservice ---
+    export_format = st.radio(
+        "Bestandsformaat", ["PNG", "SVG", "PDF"], horizontal=True, on_change=log.mark, args=("Bestandsformaat",)
+    )
+    download_label = f"Download {export_format} ({style.cm_width:.1f} × {style.cm_height:.1f} cm)"
+
+    if export_format != "PNG":
+        fmt = export_format.lower()
+        vector_bytes = graph.run(
+            "export", (style, fmt), render_vector, track_key, profile_key, keypoints, style, fmt, dist, elev
+        )
+        st.download_button(
+            label=download_label,
+            data=vector_bytes,
+            file_name=f"hoogteprofiel.{fmt}",
+            mime="image/svg+xml" if fmt == "svg" else "application/pdf"
+        )
+
+    # Enkel renderen op aanvraag; eenmaal gerenderd komt de PNG uit de cache van de renderservice.
+    # Sleutel = de invoer van de figuur (zoals bij render_vector), niet fig.to_json() bij elke rerun
+    render_service = get_render_service()
+    png_inputs = (track_key, profile_key, keypoints, style)
+
+    if export_format == "PNG" and (
+        render_service.cached(png_inputs, px_width, px_height, scale=EXPORT_SCALE) or st.button("PNG voorbereiden")
+    ):
+        with st.spinner("PNG wordt gegenereerd..."):
+            with stage("export_png", input=dist):
+                img_bytes = render_service.render(fig, png_inputs, px_width, px_height, scale=EXPORT_SCALE)
+
+        st.download_button(
+            label=download_label,
+            data=img_bytes,
+            file_name="hoogteprofiel.png",
+            mime="image/png"
+        )
+
+    export_timings = render_service.summary()
+    if export_timings:
+        st.caption(" · ".join(
+            f"{kind}: {t['mean_s'] * 1000:.0f} ms (n={t['count']})" for kind, t in export_timings.items()
+        ))
+
+    # --- Latency per interactie (laatste stap van elke rerun, ook van een fragment-rerun) ---
+    log.finish(graph)
+    latency = log.summary()
+    if latency:
+        with st.expander("⏱️ Rekentijd per interactie", expanded=False):
+            st.dataframe(pd.DataFrame(latency), hide_index=True)
+
+
+# --- GPX/FIT-file upload veld ---
+uploaded_file = st.file_uploader(
+    "Upload een GPX- of FIT-bestand", type=["gpx", "fit"], on_change=log.mark, args=("Upload",)
+)
 
 
 
-# --- Hoofdlogica: verwerken van GPX-file ---
+# --- Hoofdlogica: verwerken van GPX/FIT-file ---
+if uploaded_file is None:
+    cancel_background_parse()
+
 if uploaded_file is not None:
-    gpx = gpxpy.parse(uploaded_file)
-    elevations = []
-    distances = []
-    total_dist = 0
-
-    for track in gpx.tracks:
-        for segment in track.segments:
-            prev_point = None
-            for point in segment.points:
-                if prev_point:
-                    total_dist += point.distance_3d(prev_point)
-                elevations.append(point.elevation)
-                distances.append(total_dist / 1000)  # omzetten naar km
-                prev_point = point
-
-    df = pd.DataFrame({
-        "Afstand (km)": distances,
-        "Hoogte (m)": elevations
-    })
+    # Enkel een nieuw bestand wordt gehasht en geparst; grote bestanden op de achtergrond
+    parse_params = (uploaded_file.file_id, uploaded_file.name)
+    load = load_upload
+    if uploaded_file.size >= BACKGROUND_BYTES and not graph.is_current("parse", parse_params):
+        job = background_parse(uploaded_file)
+        if job.cancelled:
+            st.info("Verwerking geannuleerd. Upload het bestand opnieuw om verder te gaan.")
+            st.stop()
+        if not job.done:
+            show_parse_progress(job)
+            st.stop()
+        load = lambda _: job.result()
+
+    track_key, track = graph.run("parse", parse_params, load, uploaded_file)
+
+    stats = get_track_cache().stats
+    st.sidebar.caption(
+        f"Track-cache: {stats['memory_hits']} geheugen-hits · "
+        f"{stats['disk_hits']} schijf-hits · {stats['misses']} misses"
+    )
 
     # --- Sidebar: Personaliseer sectie ---
     with st.sidebar.expander("🎨 Personaliseer", expanded=False):
+        # Buiten het formulier: de kleurkiezer verschijnt pas na de keuze "Custom",
+        # en binnen een formulier zou die keuze pas na "Toepassen" tellen
         color_option = st.selectbox(
             "Kleur opties",
-            ("Zwart", "Oranje", "Custom")
+            ("Zwart", "Oranje", "Custom"),
+            on_change=log.mark, args=("Kleur",)
         )
 
-        if color_option == "Oranje":
-            line_color = "#fb5d01"
-        elif color_option == "Zwart":
-            line_color = "#000000"
+        if color_option in LINE_COLORS:
+            line_color = LINE_COLORS[color_option]
         else:
-            line_color = st.color_picker("Kies je kleur", "#fb5d01")
-
-        line_width = st.number_input("Lijndikte", min_value=1, max_value=8, value=2, step=1)
-        cm_width = st.number_input("Breedte hoogteprofiel (cm)", min_value=5.0, max_value=30.0, value=10.0, step=0.1)
-        cm_height = st.number_input("Hoogte hoogteprofiel (cm)", min_value=0.1, max_value=20.0, value=1.0, step=0.1)
+            line_color = st.color_picker("Kies je kleur", "#fb5d01", on_change=log.mark, args=("Kleur",))
 
+        # Formulier: de afmetingen en de vulling worden in één keer toegepast
+        with st.form("personaliseer", border=False):
+            line_width = st.number_input("Lijndikte", min_value=1, max_value=8, value=2, step=1)
+            cm_width = st.number_input("Breedte hoogteprofiel (cm)", min_value=5.0, max_value=30.0, value=10.0, step=0.1)
+            cm_height = st.number_input("Hoogte hoogteprofiel (cm)", min_value=0.1, max_value=20.0, value=1.0, step=0.1)
+            gradient_fill = st.checkbox(
+                "Kleur volgens helling", False,
+                help="Kleurt het vlak onder het profiel: grijs = afdaling, groen 0–3%, geel 3–6%, oranje 6–9%, rood 9–12%, donkerrood > 12%."
+            )
+            st.form_submit_button("Toepassen", on_click=log.mark, args=("Personaliseer",))
 
-    # --- Pixels cm conversie ---
-    dpi = 300
-    px_width = int((cm_width / 2.54) * dpi)
-    px_height = int((cm_height / 2.54) * dpi)
 
     # --- Sidebar profiel instellingen (smoothing & detail) ---
     with st.sidebar.expander("⚙️ Profiel instellingen", expanded=False):
         max_points = st.slider(
             "Hoe gedetailleerd het profiel is (meer = fijner)",
             100, 20000, 10000,
-            help="Aantal punten waaruit het hoogteprofiel bestaat. Meer punten betekent meer details."
+            help="Aantal punten waaruit het hoogteprofiel bestaat. Meer punten betekent meer details.",
+            on_change=log.mark, args=("Detail",)
+        )
+
+        downsample_method = st.selectbox(
+            "Methode om punten te verminderen",
+            list(METHODS),
+            format_func=METHODS.get,
+            help="Gelijke afstand geeft een regelmatig profiel; LTTB en Douglas–Peucker behouden toppen en korte muurtjes.",
+            on_change=log.mark, args=("Methode punten",)
         )
 
         window_length = st.slider(
             "Hoe vloeiend de lijn is (meer = gladder)",
             5, 501, 101, step=2,
-            help="Hoe sterk het hoogteprofiel wordt gladgestreken. Grotere waarde betekent een zachtere, vloeiendere lijn."
+            help="Hoe sterk het hoogteprofiel wordt gladgestreken. Grotere waarde betekent een zachtere, vloeiendere lijn.",
+            on_change=log.mark, args=("Vloeiendheid",)
         )
 
-    # --- Checkbox om profiel te spiegelen (indien renners verticaal kaartje willen) --- #
-    mirror_profile = st.checkbox(
-        "Profiel spiegelen (0 km rechts)", value=False
-    )
+        smoother = st.selectbox(
+            "Smoothing methode",
+            list(SMOOTHERS),
+            format_func=SMOOTHERS.get,
+            on_change=log.mark, args=("Smoothing methode",)
+        )
 
-    # --- Data downsamplen en smoothen ---
-    step = max(1, len(df) // max_points)
-    df_resampled = df.iloc[::step].reset_index(drop=True)
+        # GPS-hoogtes (zeker van gsm's) vervangen door het lokale terreinmodel
+        dem_sampler = get_dem_sampler()
+        use_dem = len(dem_sampler) > 0 and st.checkbox(
+            "Hoogte corrigeren met terreinmodel (DEM)", False,
+            help="Vervangt de GPS-hoogte door de hoogte uit de lokale SRTM/GeoTIFF-tegels. Punten buiten de tegels behouden hun GPS-hoogte.",
+            on_change=log.mark, args=("DEM-correctie",)
+        )
 
-    if window_length % 2 == 0:
-        window_length -= 1
-    if window_length < 3:
-        window_length = 3
+    # --- Hoogte corrigeren, data downsamplen en smoothen ---
+    track, dem_share = graph.run("dem", (use_dem,), apply_dem, track, use_dem)
+    if use_dem:
+        st.sidebar.caption(f"DEM-correctie: {dem_share:.0%} van de punten gecorrigeerd")
+    # Eigen cachesleutel voor de gecorrigeerde track, de ruwe blijft ook bruikbaar
+    profile_track_key = (track_key, "dem") if use_dem else track_key
 
-    smooth_elev = savgol_filter(df_resampled["Hoogte (m)"], window_length=window_length, polyorder=3)
+    resampled_dist, resampled_elev = graph.run(
+        "resample", (max_points, downsample_method), resample_track,
+        profile_track_key, max_points, downsample_method, track
+    )
+
+    # Slider-beweging = opzoeking in de piramide; enkel een nieuw venster wordt berekend
+    pyramid = get_smoothing_pyramid(profile_track_key, max_points, downsample_method, resampled_elev)
+    smooth_elev = graph.run("smooth", (window_length, smoother), pyramid.get, window_length, smoother)
+    profile_key = (max_points, downsample_method, window_length, smoother, use_dem)
 
     # --- Sidebar: keypoints toevoegen ---
     with st.sidebar.expander("📍 Keypoints toevoegen", expanded=False):
         st.warning("⚠️ Gebruik een punt (.) als decimaalteken, geen komma (,).")
         
-        keypoint_names = st.text_area("Keypoint namen (één per lijn)", "GPM 1\nRAV 1\nSPR 1")
-        keypoint_distances = st.text_area("Afstanden (in km, evenveel als namen)", "15.3\n42.7\n55.2")
-
-        use_custom_colors = st.checkbox("Per keypoint een eigen kleur?", False)
-
-        kp_names = [k.strip() for k in keypoint_names.split("\n") if k.strip()]
-        try:
-            kp_distances = [float(d.strip()) for d in keypoint_distances.split("\n") if d.strip()]
-        except ValueError:
-            st.error("Zorg dat alle afstanden correcte getallen zijn met een punt als decimaalteken.")
-
-        default_colors = [
-            "#e6194B", "#3cb44b", "#ffe119", "#4363d8",
-            "#f58231", "#911eb4", "#46f0f0", "#f032e6",
-            "#bcf60c", "#fabebe", "#008080", "#e6beff"
-        ]
+        # Klimmen detecteren en als bewerkbare GPM-keypoints voorinvullen
+        detect = st.checkbox("Klimmen automatisch detecteren (GPM)", False, on_change=log.mark, args=("Klimdetectie",))
+        default_names, default_distances, widget_suffix = "GPM 1\nRAV 1\nSPR 1", "15.3\n42.7\n55.2", ""
+        climbs, ramps = [], []
+        if detect:
+            climb_settings = ClimbSettings(
+                min_gradient=st.slider("Minimale helling klim (%)", 1.0, 10.0, 3.0, 0.5,
+                                       on_change=log.mark, args=("Klimdetectie",)),
+                min_length_km=st.slider("Minimale lengte klim (km)", 0.1, 5.0, 0.5, 0.1,
+                                        on_change=log.mark, args=("Klimdetectie",)),
+                ramp_gradient=st.slider("Helling steile strook (%)", 5.0, 20.0, 10.0, 0.5,
+                                        on_change=log.mark, args=("Klimdetectie",)),
+            )
+            climbs, ramps = graph.run(
+                "segments", (climb_settings,), detect_segments,
+                track_key, profile_key, climb_settings, resampled_dist, smooth_elev
+            )
+            default_names = "\n".join(f"GPM {i + 1}" for i in range(len(climbs)))
+            default_distances = "\n".join(f"{c.end_km:.1f}" for c in climbs)
+            # Nieuwe key zodat de tekstvakken opnieuw voorgevuld worden als de detectie wijzigt
+            widget_suffix = f"_{hash((track_key, default_distances))}"
+
+        if climbs or ramps:
+            st.dataframe(pd.DataFrame([
+                {
+                    "Type": "Klim" if seg.kind == "climb" else "Steile strook",
+                    "Van (km)": round(seg.start_km, 1),
+                    "Tot (km)": round(seg.end_km, 1),
+                    "Gem. %": round(seg.avg_gradient, 1),
+                    "Max. %": round(seg.max_gradient, 1),
+                    "Cat.": seg.category,
+                }
+                for seg in climbs + ramps
+            ]), hide_index=True)
+
+        # Formulier: typen in de tekstvakken herlaadt niets, pas bij "Keypoints toepassen"
+        with st.form("keypoints", border=False):
+            keypoint_names = st.text_area("Keypoint namen (één per lijn)", default_names, key=f"kp_names{widget_suffix}")
+            keypoint_distances = st.text_area("Afstanden (in km, evenveel als namen)", default_distances, key=f"kp_km{widget_suffix}")
+
+            kp_names = [k.strip() for k in keypoint_names.split("\n") if k.strip()]
+            try:
+                kp_distances = [float(d.strip()) for d in keypoint_distances.split("\n") if d.strip()]
+            except ValueError:
+                kp_distances = []
+                st.error("Zorg dat alle afstanden correcte getallen zijn met een punt als decimaalteken.")
+
+            # Keypoints op coördinaat of uit de GPX-waypoints: gesnapt op de dichtstbijzijnde trackpositie
+            coordinate_text = st.text_area(
+                "Keypoints op coördinaten (naam; lat; lon — één per lijn)", "",
+                help="Bv. 'SPR; 50.9443; 3.1267'. Passeert de route een punt meerdere keren, zet de keypoints dan in rijvolgorde."
+            )
+            coord_names, coord_lats, coord_lons, coord_errors = parse_coordinate_lines(coordinate_text)
+            if coord_errors:
+                st.error(f"Ongeldige coördinaatregels: {', '.join(coord_errors)}")
+
+            if len(track.wpt_name) and st.checkbox(f"Waypoints uit de GPX gebruiken ({len(track.wpt_name)})", False):
+                coord_names += track.wpt_name.tolist()
+                coord_lats += track.wpt_lat.tolist()
+                coord_lons += track.wpt_lon.tolist()
+
+            if coord_names:
+                # Lijsten eerst even lang maken zodat de gesnapte keypoints correct aansluiten
+                n = min(len(kp_names), len(kp_distances))
+                kp_names, kp_distances = kp_names[:n] + coord_names, kp_distances[:n]
+
+            st.form_submit_button("Keypoints toepassen", on_click=log.mark, args=("Keypoints",))
+
+        # Kleuren buiten het formulier: één kiezer per toegepaste keypoint, meteen zichtbaar
+        use_custom_colors = st.checkbox(
+            "Per keypoint een eigen kleur?", False, on_change=log.mark, args=("Keypointkleuren",)
+        )
 
         if use_custom_colors:
             kp_colors = []
             for i, name in enumerate(kp_names):
-                default_col = default_colors[i % len(default_colors)]
-                color = st.color_picker(f"Kleur voor '{name}'", default_col)
+                default_col = DEFAULT_KEYPOINT_COLORS[i % len(DEFAULT_KEYPOINT_COLORS)]
+                color = st.color_picker(
+                    f"Kleur voor '{name}'", default_col, key=f"kp_color_{i}",
+                    on_change=log.mark, args=("Keypointkleuren",)
+                )
                 kp_colors.append(color)
         else:
-            default_kp_color = st.color_picker("Kleur voor keypoints", "#fb5d01")
+            default_kp_color = st.color_picker(
+                "Kleur voor keypoints", "#fb5d01", on_change=log.mark, args=("Keypointkleuren",)
+            )
             kp_colors = [default_kp_color] * len(kp_names)
 
-        keypoints = []
-        for name, km, color in zip(kp_names, kp_distances, kp_colors):
-            interpolated_height = np.interp(km, df_resampled["Afstand (km)"], smooth_elev)
-            keypoints.append({"name": name, "km": km, "elev": interpolated_height, "color": color})
-
-
-    # --- Sidebar: interval tussen X-as marks ---
-    tick_interval = st.sidebar.slider("Interval afstandlabels (km)", 5, 50, 20)
-
-    # --- Plot bouwen met Plotly ---
-    fig = go.Figure()
-
-    # --- Hoofdhoogteprofiel lijn ---
-    fig.add_trace(go.Scatter(
-        x=df_resampled["Afstand (km)"],
-        y=smooth_elev,
-        mode='lines',
-        line=dict(color=line_color, width=line_width),
-        hoverinfo='skip',
-        showlegend=False
-    ))
-
-    # Keypoints als markers + labels
-    for kp in keypoints:
-        fig.add_trace(go.Scatter(
-            x=[kp["km"]],
-            y=[kp["elev"]],
-            mode='markers+text',
-            marker=dict(size=10, color=kp["color"]),
-            text=[kp["name"]],
-            textposition="top center",
-            showlegend=False,
-            textfont=dict(size=14, color=kp["color"])
-        ))
+        keypoints = graph.run(
+            "keypoints",
+            (tuple(kp_names), tuple(kp_distances), tuple(kp_colors), tuple(coord_lats), tuple(coord_lons)),
+            make_keypoints,
+            track_key, track, resampled_dist, smooth_elev, kp_names, kp_distances, kp_colors, coord_lats, coord_lons
+        )
 
-    # --- X-as ticks en labels ---
-    max_dist = df_resampled["Afstand (km)"].max()
-    tick_vals = list(np.arange(0, max_dist + tick_interval, tick_interval))
-    tick_texts = [f"{int(t)} km" for t in tick_vals]
-
-    # --- Layout aanpassingen ---
-    fig.update_layout(
-        xaxis=dict(
-            tickmode='array',
-            tickvals=tick_vals,
-            ticktext=tick_texts,
-            ticks="outside",
-            showline=False,
-            linewidth=0,
-            linecolor='rgba(0,0,0,0)',
-            title_text=None,
-            autorange='reversed' if mirror_profile else True,
-            showgrid=False
-        ),
-        yaxis=dict(
-            showline=False,
-            linewidth=0,
-            linecolor='rgba(0,0,0,0)',
-            title_text=None,
-            zeroline=False,
-            showticklabels=True,
-            showgrid=False
-        ),
-        margin=dict(l=40, r=20, t=20, b=40),
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        width=px_width,
-        height=px_height
+    base_style = ProfileStyle(
+        line_color=line_color,
+        line_width=line_width,
+        cm_width=cm_width,
+        cm_height=cm_height,
+        gradient=gradient_fill,
     )
+    show_profile(track_key, profile_key, resampled_dist, smooth_elev, keypoints, base_style)
 
-    # --- Plot tonen ---
-    st.subheader("Hoogteprofiel met keypoints")
-    st.plotly_chart(fig, use_container_width=False)
-
-    # --- Transparante PNG export ---
-    img_bytes = fig.to_image(format="png", width=px_width, height=px_height, scale=3)
-
-    st.download_button(
-        label=f"Download PNG ({cm_width:.1f} × {cm_height:.1f} cm)",
-        data=img_bytes,
-        file_name="hoogteprofiel.png",
-        mime="image/png"
-    )
+end_run()
@@ -1,9 +1,18 @@
+import io
+
 import streamlit as st
-import numpy as np
-import matplotlib.pyplot as plt
-from scipy.optimize import minimize
+
+from cranklengte.model import (
+    CRANK_LENGTHS, cadence_profile, crank_zone, inseam_guidelines, leg_ratio_profile, machine, obree,
+    optimal_crank, score, score_grid, sprint_profile,
+)
+from cranklengte.sensitivity import BIN_MM, DEFAULT_DRAWS, METHODS, Uncertainty, simulate
+from cranklengte.squad import DEFAULTS, REQUIRED, SquadError, evaluate, read_squad, team_report, template_csv
+from instrumentation import begin_run, end_run, stage
 
 st.set_page_config(page_title="Wetenschappelijke Cranklengte Tool", layout="wide")
+# Rekentijd per stap (enkel met INSTRUMENTATION=1, zie instrumentation.py)
+begin_run("Measurements")
 st.title("🔬 Wetenschappelijke Cranklengte Calculator")
 
 # --- Input ---
@@ -21,45 +30,47 @@ discipline = st.sidebar.selectbox("Discipline / Bike type", ["Road", "TT/Track",
 saddle_height = st.sidebar.number_input("Saddle height BB→saddle (mm)", 600.0, 900.0, 750.0, step=1.0)
 kops_status = st.sidebar.selectbox("KOPS status", ["Neutraal", "Forward", "Back"])
 
-# --- Binnenbeenlengte methodes ---
-conservatief = inseam * 1.98
-neutraal = inseam * 2.00
-kracht = inseam * 2.04
+# --- Binnenbeenlengte methodes (zelfde regels als de ploegmodus, uit cranklengte.model) ---
+guide = inseam_guidelines(inseam)
+conservatief, neutraal, kracht = (float(guide[k]) for k in ("conservatief", "neutraal", "kracht"))
 
 st.subheader("1️⃣ Binnenbeenlengte richtlijnen")
 st.write(f"- Conservatief: {conservatief:.1f} mm → korte, cadansvriendelijke crank")
 st.write(f"- Neutraal: {neutraal:.1f} mm → balans cadans/kracht")
 st.write(f"- Krachtgeoriënteerd: {kracht:.1f} mm → lange crank, meer hefboom")
 
-if current_crank < conservatief:
+current_zone = crank_zone(current_crank, inseam)
+if current_zone == "kort":
     st.warning("Huidige crank is erg kort: snelle cadans, minder hefboom")
-elif current_crank > kracht:
+elif current_zone == "lang":
     st.warning("Huidige crank is erg lang: meer koppel, risico knie/heup")
 else:
     st.info("Huidige crank ligt in veilige middenrange")
 
 # --- Cadansprofiel analyse ---
 st.subheader("2️⃣ Cadansprofiel interpretatie")
-if cadence < 85:
+cadence_type = cadence_profile(cadence)
+if cadence_type == "kracht":
     st.write("Threshold cadans krachtgeoriënteerd → langere crank vaak gunstig")
-elif 85 <= cadence <= 95:
+elif cadence_type == "neutraal":
     st.write("Neutraal → huidige crank waarschijnlijk oké")
 else:
     st.write("Cadansgericht → kortere crank vaak gunstig")
 
-if sprint_cadence >= 120:
+sprint_type = sprint_profile(sprint_cadence)
+if sprint_type == "hoog":
     st.write("Sprint cadans hoog → korte crank helpt cadans hoog te houden")
-elif 100 <= sprint_cadence < 120:
+elif sprint_type == "neutraal":
     st.write("Sprint cadans neutraal → huidige crank oké")
 else:
     st.write("Sprint cadans laag → langere crank kan helpen hefboom te behouden")
 
 # --- Femur/Tibia ratio ---
 st.subheader("3️⃣ Femur / Tibia ratio")
-ratio = femur / tibia
-if ratio > 1:
+ratio, leg = leg_ratio_profile(femur, tibia)
+if leg == "femur":
     st.write("Femur dominant → langere crank kan voordeel geven bij krachtinspanningen")
-elif 0.95 <= ratio <= 1.05:
+elif leg == "neutraal":
     st.write("Neutraal → geen sterke voorkeur")
 else:
     st.write("Tibia dominant → kortere crank vaak comfortabeler")
@@ -117,36 +128,175 @@ else:
     st.write("Stack laag → vrijheid om langere cranks te gebruiken")
 
 # --- Wetenschappelijke optimalisatie ---
+@st.cache_data(max_entries=64, show_spinner=False)
+def optimise_rider(power, cadence, current_crank):
+    # Zelfde engine als de ploegmodus; enkel opnieuw bij andere invoer
+    grid = score_grid(power, cadence)[0]
+    optimal = float(optimal_crank()[0])
+    current_score = float(score(power, cadence, current_crank))
+    return grid, optimal, current_score
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def score_chart(grid, optimal, current_crank, current_score):
+    # Figuur als PNG gecachet: een rerun zonder wijziging tekent niets opnieuw
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(8, 5))
+    ax = fig.add_subplot()
+    ax.plot(CRANK_LENGTHS, grid, label="Force x Efficiëntie")
+    ax.axvline(optimal, color='r', linestyle='--', label=f'Optimaal: {optimal:.1f} mm')
+    ax.scatter(current_crank, current_score, color='g', label="Huidige crank")
+    ax.set_xlabel("Cranklengte (mm)")
+    ax.set_ylabel("Force x Efficiëntie")
+    ax.legend()
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=150, bbox_inches="tight")
+    return buf.getvalue()
+
+
 st.subheader("📊 Wetenschappelijke optimalisatie")
-crank_lengths = np.arange(150.0, 181.0, 2.5)
-torque = float(power) / (2 * np.pi * float(cadence) / 60.0)
-force = torque / (crank_lengths / 1000.0)
-efficiency = np.exp(-0.01 * (crank_lengths - 170.0)**2)
-score = force * efficiency
-
-# Optimalisatie
-def objective(crank):
-    torque = float(power) / (2 * np.pi * float(cadence) / 60.0)
-    force = torque / (crank / 1000.0)
-    eff = np.exp(-0.01 * (crank - 170.0)**2)
-    return -force * eff
-
-opt_result = minimize(objective, 170.0, bounds=[(150.0, 180.0)])
-optimal_crank = opt_result.x[0]
+with stage("optimise", lengths=CRANK_LENGTHS):
+    grid, optimal_crank_mm, current_score = optimise_rider(float(power), float(cadence), float(current_crank))
 
 # --- Visualisatie ---
-fig, ax = plt.subplots(figsize=(8,5))
-ax.plot(crank_lengths, score, label="Force x Efficiëntie")
-ax.axvline(optimal_crank, color='r', linestyle='--', label=f'Optimaal: {optimal_crank:.1f} mm')
-ax.scatter(current_crank, torque/(current_crank/1000.0)*np.exp(-0.01*(current_crank-170.0)**2), color='g', label="Huidige crank")
-ax.set_xlabel("Cranklengte (mm)")
-ax.set_ylabel("Force x Efficiëntie")
-ax.legend()
-st.pyplot(fig)
+with stage("score_chart", points=grid):
+    st.image(score_chart(grid, optimal_crank_mm, float(current_crank), current_score))
 
 # --- Aanbevolen cranklengtes ---
 st.subheader("✅ Aanbevolen cranklengtes")
-st.write(f"- Graeme Obree methode: {height*0.95:.1f} mm")
-st.write(f"- 'Machine' methode: {1.25*inseam+65:.1f} mm")
-st.write(f"- Wetenschappelijke optimalisatie: {optimal_crank:.1f} mm")
+st.write(f"- Graeme Obree methode: {float(obree(height)):.1f} mm")
+st.write(f"- 'Machine' methode: {float(machine(inseam)):.1f} mm")
+st.write(f"- Wetenschappelijke optimalisatie: {optimal_crank_mm:.1f} mm")
 st.write(f"- Huidige crank: {current_crank} mm")
+
+# --- Onzekerheid ---
+@st.cache_data(max_entries=16, show_spinner="Trekkingen berekenen...")
+def run_simulation(inputs, uncertainty, draws):
+    # Gememoïseerd op de invoer: een andere grafiekoptie trekt niet opnieuw
+    return simulate(*inputs, uncertainty=uncertainty, draws=draws)
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def uncertainty_chart(inputs, uncertainty, draws, methods, view):
+    from matplotlib.figure import Figure
+
+    result = run_simulation(inputs, uncertainty, draws)
+    fig = Figure(figsize=(8, 4))
+    ax = fig.add_subplot()
+    if view == "Verdeling":
+        centers = (result["edges"][:-1] + result["edges"][1:]) / 2
+        for method in methods:
+            density = result["hist"][method] / result["draws"] / BIN_MM
+            line, = ax.plot(centers, density, label=method)
+            band = result["summary"][method]
+            ax.axvspan(band["p2.5"], band["p97.5"], color=line.get_color(), alpha=0.12)
+        shown = [result["summary"][m] for m in methods]
+        if shown:
+            ax.set_xlim(min(b["p2.5"] for b in shown) - 5, max(b["p97.5"] for b in shown) + 5)
+        ax.set_ylabel("Kansdichtheid (per mm)")
+    else:
+        width = 2.5 / (len(methods) + 1)
+        for i, method in enumerate(methods):
+            ax.bar(CRANK_LENGTHS + (i - (len(methods) - 1) / 2) * width, result["available"][method],
+                   width=width, label=method)
+        ax.set_xticks(CRANK_LENGTHS)
+        ax.set_ylabel("Kans dat dit de dichtste verkrijgbare lengte is")
+    ax.set_xlabel("Cranklengte (mm)")
+    if methods:
+        ax.legend()
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=150, bbox_inches="tight")
+    return buf.getvalue()
+
+
+st.subheader("🎲 Onzekerheid op de metingen")
+if st.toggle("Onzekerheidsmodus (Monte Carlo)"):
+    st.caption(
+        "Elke meting wordt getrokken uit een normale verdeling rond de ingevoerde waarde. "
+        "Het optimum van het scoremodel hangt niet af van de metingen en heeft dus geen spreiding."
+    )
+    col1, col2, col3 = st.columns(3)
+    uncertainty = Uncertainty(
+        height_cm=col1.number_input("± Lengte (cm)", 0.0, 5.0, 1.0, step=0.1),
+        inseam_cm=col1.number_input("± Inseam (cm)", 0.0, 5.0, 1.0, step=0.1),
+        femur_cm=col2.number_input("± Femur (cm)", 0.0, 5.0, 1.0, step=0.1),
+        tibia_cm=col2.number_input("± Tibia (cm)", 0.0, 5.0, 1.0, step=0.1),
+        cadence_rpm=col3.number_input("± Cadans (rpm)", 0.0, 15.0, 3.0, step=0.5),
+    )
+    draws = col3.select_slider("Aantal trekkingen", [100_000, 200_000, 500_000, 1_000_000], value=DEFAULT_DRAWS)
+
+    inputs = (float(height), float(inseam), float(femur), float(tibia), float(cadence), float(current_crank))
+    with stage("simulation", draws=draws):
+        result = run_simulation(inputs, uncertainty, draws)
+
+    st.dataframe(
+        {
+            "Methode": list(METHODS),
+            "Gemiddelde (mm)": [round(result["summary"][m]["mean"], 1) for m in METHODS],
+            "Std (mm)": [round(result["summary"][m]["std"], 2) for m in METHODS],
+            "95%-band (mm)": [
+                f"{result['summary'][m]['p2.5']:.1f} – {result['summary'][m]['p97.5']:.1f}" for m in METHODS
+            ],
+            "Meest waarschijnlijke lengte": [
+                f"{CRANK_LENGTHS[result['available'][m].argmax()]:.1f} mm "
+                f"({result['available'][m].max():.0%})" for m in METHODS
+            ],
+        },
+        hide_index=True,
+    )
+    zone = result["profiles"]["zone"]
+    st.write(
+        f"Huidige crank ({current_crank} mm): kort {zone.get('kort', 0):.0%}, "
+        f"midden {zone.get('midden', 0):.0%}, lang {zone.get('lang', 0):.0%} "
+        "t.o.v. de binnenbeenrichtlijnen."
+    )
+
+    view = st.radio("Weergave", ["Verdeling", "Verkrijgbare lengtes"], horizontal=True)
+    methods = st.multiselect("Methodes in de grafiek", list(METHODS), default=["neutraal", "obree", "machine"])
+    with stage("uncertainty_chart", draws=draws, methods=methods):
+        st.image(uncertainty_chart(inputs, uncertainty, draws, tuple(methods), view))
+
+# --- Ploegmodus ---
+st.markdown("---")
+st.subheader("👥 Ploegmodus: alle renners uit één CSV")
+st.caption(
+    "Verplichte kolommen: " + ", ".join(REQUIRED) + ". Optioneel: "
+    + ", ".join(f"{name} (standaard {value:g})" for name, value in DEFAULTS.items()) + "."
+)
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def evaluate_squad(data):
+    squad = read_squad(io.BytesIO(data))
+    results = evaluate(squad)
+    return squad, results, team_report(results, squad)
+
+
+squad_file = st.file_uploader("Upload de ploeg-CSV", type=["csv"])
+if squad_file:
+    try:
+        with stage("squad", bytes=squad_file.size) as evaluating:
+            squad, squad_results, report = evaluate_squad(squad_file.getvalue())
+            evaluating.set(riders=squad_results)
+    except SquadError as exc:
+        st.error(str(exc))
+    else:
+        st.dataframe(
+            squad_results,
+            hide_index=True,
+            column_config={
+                "winst_pct": st.column_config.NumberColumn("winst %", format="%.1f"),
+                "femur_tibia": st.column_config.NumberColumn(format="%.2f"),
+            },
+        )
+        st.download_button(
+            "Download ploegrapport (Excel)",
+            data=report,
+            file_name="ploegrapport.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
+else:
+    st.download_button("Download voorbeeld-CSV", data=template_csv(), file_name="ploeg.csv", mime="text/csv")
+
+end_run()
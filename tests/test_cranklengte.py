@@ -0,0 +1,86 @@
+"""Scoremodel, Monte Carlo-gevoeligheid en het inlezen van de ploeg-CSV."""
+import io
+
+import numpy as np
+import pytest
+
+from cranklengte.model import CRANK_LENGTHS, best_available, optimal_crank, score, score_grid
+from cranklengte.sensitivity import BIN_MM, CHUNK, Uncertainty, _methods, simulate
+from cranklengte.squad import SquadError, read_squad
+
+RIDER = dict(height=180.0, inseam=86.0, femur=40.0, tibia=36.0, cadence=90.0, current_crank=172.5)
+
+
+# --- Optimum ---
+def test_optimal_crank_is_the_score_maximum():
+    lengths = np.linspace(150.0, 180.0, 300_001)  # stap 0,0001 mm
+    numeric = lengths[np.argmax(score(260.0, 90.0, lengths))]
+    assert optimal_crank()[0] == pytest.approx(numeric, abs=1e-3)
+
+
+@pytest.mark.parametrize("power, cadence", [(150.0, 70.0), (260.0, 90.0), (450.0, 120.0)])
+def test_optimum_does_not_depend_on_power_or_cadence(power, cadence):
+    lengths = np.linspace(150.0, 180.0, 30_001)
+    assert lengths[np.argmax(score(power, cadence, lengths))] == pytest.approx(optimal_crank()[0], abs=1e-3)
+
+
+def test_optimal_crank_respects_bounds():
+    assert optimal_crank(3, bounds=(150.0, 165.0)).tolist() == [165.0] * 3
+
+
+def test_best_available_is_the_grid_argmax():
+    grid = score_grid([200.0, 300.0], [80.0, 100.0])
+    expected = CRANK_LENGTHS[np.argmax(score(200.0, 80.0, CRANK_LENGTHS))]
+    assert best_available(grid).tolist() == [expected, expected]
+
+
+# --- Monte Carlo ---
+def _draws(draws, seed, uncertainty):
+    # Dezelfde trekkingen als simulate (één blok): lengte en binnenbeen komen eerst
+    rng = np.random.default_rng(seed)
+    height = rng.normal(RIDER["height"], uncertainty.height_cm, draws)
+    inseam = rng.normal(RIDER["inseam"], uncertainty.inseam_cm, draws)
+    return _methods(height, inseam, draws)
+
+
+@pytest.mark.parametrize("uncertainty", [Uncertainty(), Uncertainty(height_cm=10.0, inseam_cm=8.0)])
+def test_percentiles_match_the_draws(uncertainty):
+    draws = CHUNK
+    result = simulate(**RIDER, uncertainty=uncertainty, draws=draws, seed=3)
+    for method, values in _draws(draws, 3, uncertainty).items():
+        summary = result["summary"][method]
+        expected = np.percentile(values, [2.5, 50, 97.5])
+        # Lineair binnen een bin van het histogram: nooit meer dan één bin ernaast
+        np.testing.assert_allclose([summary["p2.5"], summary["p50"], summary["p97.5"]], expected, atol=BIN_MM)
+        assert summary["mean"] == pytest.approx(values.mean())
+        assert result["hist"][method].sum() == draws
+
+
+def test_percentiles_follow_the_normal_distribution():
+    # Neutraal = 2 × binnenbeen: σ van 1 cm binnenbeen wordt 2 mm
+    summary = simulate(**RIDER, draws=400_000, seed=1)["summary"]["neutraal"]
+    assert summary["p50"] == pytest.approx(172.0, abs=0.05)
+    assert summary["p97.5"] - summary["p2.5"] == pytest.approx(2 * 1.96 * 2.0, abs=0.1)
+
+
+def test_optimum_has_no_spread():
+    summary = simulate(**RIDER, draws=10_000)["summary"]["optimaal"]
+    assert summary["std"] == 0.0
+    assert summary["p2.5"] == summary["p50"] == summary["p97.5"] == pytest.approx(optimal_crank()[0])
+
+
+# --- Ploeg-CSV ---
+HEADER = "naam;lengte_cm;inseam_cm;cadans_rpm;vermogen_w\n"
+
+
+def test_read_squad_accepts_windows_1252_and_decimal_commas():
+    squad = read_squad(io.BytesIO((HEADER + "Jérôme;180,5;86;90;260\n").encode("cp1252")))
+    assert squad.loc[0, "naam"] == "Jérôme"
+    assert squad.loc[0, "lengte_cm"] == 180.5
+    assert squad.loc[0, "crank_mm"] == 172.5  # standaardwaarde
+
+
+@pytest.mark.parametrize("data", [b"", b"   \n", (HEADER + 'A;"180;86;90;260\n').encode(), b"naam\nA\n"])
+def test_read_squad_errors_are_squad_errors(data):
+    with pytest.raises(SquadError):
+        read_squad(io.BytesIO(data))
@@ -0,0 +1,122 @@
+"""GPX- en FIT-inlezen tegenover de referentiebibliotheken (gpxpy, fitparse)."""
+import io
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import synthetic_fit, synthetic_gpx
+from hoogteprofiel.batch import run_batch
+from hoogteprofiel.dem import correct_elevation
+from hoogteprofiel.fit_reader import FitError, parse_fit
+from hoogteprofiel.gpx_ingest import cumulative_distance_km, parse_gpx
+from hoogteprofiel.waypoints import parse_coordinate_lines
+
+gpxpy = pytest.importorskip("gpxpy")
+
+# Twee segmenten, een punt zonder hoogte en een sprong > 0.2° (haversine-tak van gpxpy)
+EDGE_GPX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<gpx version="1.1" creator="test" xmlns="http://www.topografix.com/GPX/1/1"><trk>
+<trkseg>
+<trkpt lat="50.9500000" lon="3.1200000"><ele>20.0</ele></trkpt>
+<trkpt lat="50.9501000" lon="3.1202000"><ele>21.5</ele></trkpt>
+<trkpt lat="50.9502500" lon="3.1203000"></trkpt>
+<trkpt lat="50.9504000" lon="3.1205000"><ele>19.0</ele></trkpt>
+</trkseg>
+<trkseg>
+<trkpt lat="51.3000000" lon="3.1205000"><ele>8.0</ele></trkpt>
+<trkpt lat="51.3001000" lon="3.1206000"><ele>9.0</ele></trkpt>
+<trkpt lat="51.6001000" lon="3.5206000"><ele>12.0</ele></trkpt>
+</trkseg>
+</trk></gpx>
+"""
+
+
+def _gpxpy_reference(data):
+    # De oorspronkelijke lus van de pagina: distance_3d binnen elk segment, niet ertussen
+    gpx = gpxpy.parse(io.BytesIO(data))
+    total, dist, points, starts = 0.0, [], [], []
+    for track in gpx.tracks:
+        for segment in track.segments:
+            prev = None
+            for point in segment.points:
+                if prev:
+                    total += point.distance_3d(prev)
+                dist.append(total / 1000)
+                points.append((point.latitude, point.longitude,
+                               np.nan if point.elevation is None else point.elevation))
+                starts.append(prev is None)
+                prev = point
+    lat, lon, ele = np.array(points).T
+    return np.array(dist), lat, lon, ele, np.array(starts)
+
+
+@pytest.mark.parametrize("data", [synthetic_gpx(5_000, segments=3), EDGE_GPX], ids=["synthetisch", "randgevallen"])
+def test_gpx_distance_matches_gpxpy(data):
+    expected, lat, lon, ele, starts = _gpxpy_reference(data)
+    # Zelfde punten als gpxpy: de afstandsformule zelf op afrondingsfouten na gelijk
+    np.testing.assert_allclose(cumulative_distance_km(lat, lon, ele, starts), expected, rtol=1e-12, atol=1e-12)
+
+    # Volledige parse: hoogte en afstand worden als float32 bewaard, dus op de cm
+    track = parse_gpx(io.BytesIO(data))
+    np.testing.assert_array_equal(track.segment_start, starts)
+    np.testing.assert_allclose(track.dist_km, expected, rtol=1e-6, atol=1e-5)
+
+
+def test_fit_matches_fitparse():
+    fitparse = pytest.importorskip("fitparse")
+    data = synthetic_fit(2_000)
+    track = parse_fit(io.BytesIO(data))
+
+    records = [m.get_values() for m in fitparse.FitFile(io.BytesIO(data)).get_messages("record")]
+    assert len(track) == len(records)
+    semicircle = 180.0 / 2**31
+    np.testing.assert_allclose(track.lat, [r["position_lat"] * semicircle for r in records], atol=1e-7)
+    np.testing.assert_allclose(track.lon, [r["position_long"] * semicircle for r in records], atol=1e-7)
+    np.testing.assert_allclose(track.ele, [r["enhanced_altitude"] for r in records], atol=1e-3)
+    np.testing.assert_allclose(track.dist_km, [r["distance"] / 1000 for r in records], rtol=1e-6)
+    expected_time = np.array([np.datetime64(r["timestamp"], "ms") for r in records])
+    np.testing.assert_array_equal(track.time, expected_time)
+
+
+@pytest.mark.parametrize("cut", [0, 5, 13, 20, 40, -3, -500])
+def test_truncated_fit_raises_fit_error(cut):
+    data = synthetic_fit(200)
+    with pytest.raises(FitError):
+        parse_fit(io.BytesIO(data[:cut]))
+
+
+def test_coordinate_lines_with_decimal_commas_and_names_with_commas():
+    names, lats, lons, errors = parse_coordinate_lines(
+        "SPR; 50,9443; 3,1267\n"
+        "Kapelmuur, Geraardsbergen; 50.7744; 3.8838\n"
+        "KOM, 50.95, 3.12\n"
+        "fout; 3; 1267\n"
+        "ook fout, 95.0, 3.1\n"
+        "zonder coördinaten\n"
+    )
+    assert names == ["SPR", "Kapelmuur, Geraardsbergen", "KOM"]
+    assert lats == [50.9443, 50.7744, 50.95]
+    assert lons == [3.1267, 3.8838, 3.12]
+    assert errors == ["fout; 3; 1267", "ook fout, 95.0, 3.1", "zonder coördinaten"]
+
+
+class _FlatDem:
+    # Terreinmodel dat overal 10 m geeft, behalve ten zuiden van 50.9502° (geen dekking)
+    def sample(self, lat, lon):
+        return np.where(lat > 50.9502, 10.0, np.nan)
+
+
+def test_dem_correction_recomputes_3d_distance():
+    track, share = correct_elevation(parse_gpx(io.BytesIO(EDGE_GPX)), _FlatDem())
+    assert 0 < share < 1
+    expected = cumulative_distance_km(track.lat, track.lon, track.ele.astype(np.float64), track.segment_start)
+    np.testing.assert_allclose(track.dist_km, expected, rtol=1e-6, atol=1e-5)
+
+
+def test_batch_rejects_routes_with_the_same_name(tmp_path):
+    (tmp_path / "etappe1.gpx").write_bytes(synthetic_gpx(50))
+    (tmp_path / "Etappe1.fit").write_bytes(synthetic_fit(50))
+    routes = sorted(str(p) for p in tmp_path.iterdir())
+    results = run_batch(routes, str(tmp_path / "out"), ("svg",), workers=1)
+    assert all("zelfde naam" in r["error"] for r in results) and len(results) == 2
+    assert list((tmp_path / "out").iterdir()) == []
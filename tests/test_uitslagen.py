@@ -0,0 +1,132 @@
+"""Bradley–Terry-rating en het Parquet-archief."""
+import io
+
+import numpy as np
+import openpyxl
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import synthetic_workbook
+from uitslagen.headtohead import HeadToHead
+from uitslagen.ingest import COLUMNS, WorkbookError, read_sheet, sheet_to_long
+from uitslagen.store import ResultsStore, wide_positions
+
+
+def _long(races, season=2025):
+    # races: [[renner, ...] in volgorde van aankomst, opgaves als ("naam", "dnf")]
+    rows = []
+    for order, riders in enumerate(races):
+        for place, rider in enumerate(riders, start=1):
+            name, status = rider if isinstance(rider, tuple) else (rider, "finish")
+            rows.append({
+                "season": season, "race_order": order, "race": f"Koers {order + 1}", "race_date": None,
+                "rider_order": 0, "rider": name, "category": None,
+                "position": place if status == "finish" else None, "status": status,
+            })
+    long = pd.DataFrame(rows, columns=COLUMNS)
+    long["position"] = long["position"].astype("Int16")
+    return long
+
+
+def _mm_strengths(wins, prior, iterations=20_000):
+    # Onafhankelijke referentie: de MM-iteratie van Hunter (2004), met de prior als
+    # prior/2 winsten en prior/2 nederlagen tegen een referentierenner met sterkte 1
+    games = wins + wins.T
+    p = np.ones(len(wins))
+    for _ in range(iterations):
+        denom = (games / (p[:, None] + p[None, :])).sum(axis=1) + prior / (p + 1)
+        p = (wins.sum(axis=1) + prior / 2) / denom
+    return p
+
+
+def _random_races(n_riders=12, n_races=30, seed=0):
+    rng = np.random.default_rng(seed)
+    skill = np.linspace(-1.5, 1.5, n_riders)
+    races = []
+    for _ in range(n_races):
+        field = rng.choice(n_riders, size=rng.integers(4, n_riders + 1), replace=False)
+        order = field[np.argsort(-(skill[field] + rng.gumbel(size=len(field))))]
+        riders = [f"R{i:02d}" for i in order]
+        if rng.random() < 0.3:
+            riders[-1] = (riders[-1], "dnf")
+        races.append(riders)
+    return races
+
+
+def test_bradley_terry_matches_mm_fit():
+    h2h = HeadToHead(prior=2.0)
+    h2h.update(_long(_random_races()))
+    expected = _mm_strengths(h2h.wins.toarray().astype(np.float64), h2h.prior)
+    np.testing.assert_allclose(np.log(h2h.strength), np.log(expected), atol=1e-4)
+
+
+def test_bradley_terry_two_riders_closed_form():
+    # Zonder prior is de maximum likelihood bij 3 op 4 duels exact p_A / p_B = 3
+    h2h = HeadToHead(prior=0.0)
+    h2h.update(_long([["A", "B"], ["A", "B"], ["A", "B"], ["B", "A"]]))
+    ratings = h2h.ratings()["rating"]
+    assert ratings["A"] - ratings["B"] == pytest.approx(400 * np.log10(3), abs=0.05)
+
+
+def test_incremental_update_equals_rebuild():
+    races = _random_races(seed=1)
+    incremental = HeadToHead()
+    assert incremental.update(_long(races[:15]), 1) == "incremental"
+    assert incremental.update(_long(races), 2) == "incremental"
+    assert incremental.update(_long(races), 2) == "unchanged"
+
+    fresh = HeadToHead()
+    fresh.update(_long(races))
+    order = [fresh.riders.index(r) for r in incremental.riders]
+    np.testing.assert_array_equal(incremental.wins.toarray(), fresh.wins.toarray()[np.ix_(order, order)])
+    # Warme start: zelfde optimum binnen de tolerantie van L-BFGS (ruim onder 1 ratingpunt)
+    expected = fresh.ratings()["rating"]
+    np.testing.assert_allclose(incremental.ratings()["rating"], expected[incremental.ratings().index], atol=0.5)
+
+
+def test_races_without_starters_add_no_duels():
+    # Eerste import en incrementele update met enkel niet-gestarte renners
+    h2h = HeadToHead()
+    assert h2h.update(_long([[("A", "dns"), ("B", "dns")]]), 1) == "incremental"
+    assert h2h.riders == [] and h2h.wins.shape == (0, 0)
+
+    races = [["A", "B"], [("A", "dns"), ("B", "dns")]]
+    h2h.update(_long(races[:1]), 2)
+    wins = h2h.wins.toarray()
+    assert h2h.update(_long(races), 3) == "incremental"
+    np.testing.assert_array_equal(h2h.wins.toarray(), wins)
+
+
+def test_store_replaces_whole_season(tmp_path):
+    store = ResultsStore(str(tmp_path))
+    store.replace(_long([["A", "B", "C"], ["B", "A"]]))
+    store.replace(_long([["A", "B"]]))
+    long = store.load()
+    assert sorted(long["rider"]) == ["A", "B"]
+    assert list(long["race"].unique()) == ["Koers 1"]
+
+    store.delete_season(2025)
+    assert store.seasons() == []
+
+
+def test_store_rejects_duplicate_results(tmp_path):
+    long = _long([["A", "B"]])
+    with pytest.raises(ValueError):
+        ResultsStore(str(tmp_path)).replace(pd.concat([long, long.iloc[:1]]))
+
+
+def test_wide_positions_keeps_races_on_the_same_date():
+    raw = read_sheet(io.BytesIO(synthetic_workbook(10, 3)))
+    raw[1, 4] = raw[1, 3]  # tweede koers op dezelfde datum als de eerste
+    wide = wide_positions(sheet_to_long(raw))
+    assert wide.shape[1] == 3
+
+
+def test_unreadable_workbooks_raise_workbook_error():
+    other = openpyxl.Workbook()
+    other.active.title = "Blad1"
+    buf = io.BytesIO()
+    other.save(buf)
+    for data in (b"<gpx></gpx>", buf.getvalue()):
+        with pytest.raises(WorkbookError):
+            read_sheet(io.BytesIO(data))
@@ -0,0 +1 @@
+# Inlezen, opslaan en analyseren van uitslagen voor de pagina "Uitslagen Analyse".
@@ -0,0 +1,98 @@
+"""Grafiek "Resultaten over de tijd", ook voor een volledige ploeg over meerdere seizoenen.
+
+Tot `WEBGL_POINTS` punten: één SVG-lijn (spline) per renner zoals altijd. Daarboven
+WebGL (Scattergl) en worden de renners gebundeld in maximaal len(BATCH_COLORS)
+traces, met NaN-onderbrekingen tussen de renners. Payload en bouwtijd worden
+meegegeven zodat de pagina ze kan tonen.
+"""
+import os
+import time
+
+from imports import lazy
+
+np = lazy("numpy")
+go = lazy("plotly.graph_objs")
+pio = lazy("plotly.io")
+
+WEBGL_POINTS = int(os.environ.get("UITSLAGEN_WEBGL_POINTS", "1000"))
+# Kleurenpalet van plotly (qualitative.Plotly); één trace per kleur
+BATCH_COLORS = ("#636EFA", "#EF553B", "#00CC96", "#AB63FA", "#FFA15A",
+                "#19D3F3", "#FF6692", "#B6E880", "#FF97FF", "#FECB52")
+
+
+def results_over_time(wide, riders, webgl_points=WEBGL_POINTS):
+    """(figuur, info) voor de gekozen renners; info: mode, traces, points, bytes, build_ms."""
+    start = time.perf_counter()
+    values = wide.loc[riders].to_numpy(dtype=np.float64)
+    races = np.asarray(wide.columns, dtype=object)
+    points = int(np.count_nonzero(~np.isnan(values)))
+
+    if points <= webgl_points:
+        fig = _svg_figure(values, races, riders)
+        mode = "svg"
+    else:
+        fig = _webgl_figure(values, races, riders)
+        mode = "webgl"
+
+    fig.update_layout(
+        title="Resultaten over de tijd",
+        xaxis_title="Koers (chronologisch)",
+        yaxis_title="Uitslag",
+        xaxis=dict(categoryorder="array", categoryarray=list(races)),
+        yaxis=dict(autorange="reversed"),  # beter resultaat bovenaan
+        height=500,
+    )
+    payload = pio.to_json(fig, validate=False)
+    return fig, {
+        "mode": mode,
+        "traces": len(fig.data),
+        "points": points,
+        "bytes": len(payload.encode("utf-8")),
+        "build_ms": (time.perf_counter() - start) * 1000,
+    }
+
+
+def _svg_figure(values, races, riders):
+    fig = go.Figure()
+    for rider, row in zip(riders, values):
+        fig.add_trace(
+            go.Scatter(
+                x=races,
+                y=row,
+                mode="lines+markers",
+                name=rider,
+                connectgaps=True,
+                line_shape="spline",
+                hovertemplate="Koers: %{x}<br>Uitslag: %{y}<extra></extra>",
+            )
+        )
+    return fig
+
+
+def _webgl_figure(values, races, riders):
+    # Per renner enkel de gereden koersen (zoals connectgaps), daarna één NaN als onderbreking
+    names = np.asarray(riders, dtype=object)
+    fig = go.Figure()
+    for batch, color in enumerate(BATCH_COLORS[:len(riders)]):
+        members = np.arange(batch, len(riders), len(BATCH_COLORS))
+        block = values[members]
+        rows, cols = np.nonzero(~np.isnan(block))
+        # Scheidingspunt na de laatste koers van elke renner
+        ends = np.flatnonzero(np.diff(rows)) + 1
+        x = np.insert(races[cols], ends, None)
+        y = np.insert(block[rows, cols], ends, np.nan)
+        text = np.insert(names[members][rows], ends, None)
+        fig.add_trace(
+            go.Scattergl(
+                x=x,
+                y=y,
+                text=text,
+                mode="lines+markers",
+                line=dict(color=color, width=1.5),
+                marker=dict(color=color, size=5),
+                connectgaps=False,
+                showlegend=False,
+                hovertemplate="%{text}<br>Koers: %{x}<br>Uitslag: %{y}<extra></extra>",
+            )
+        )
+    return fig
@@ -0,0 +1,181 @@
+"""Onderlinge duels: wie klopt wie als ze dezelfde koers rijden, en een rating daaruit.
+
+Per koers wint renner i van j als hij voor j eindigt; een opgave (DNF, DSQ, OTL)
+eindigt achter alle renners die uitrijden. Niet gestart telt niet mee. Alle
+matrices zijn sparse (renner × renner), zodat ook duizenden renners passen.
+
+De rating is een Bradley–Terry-model, gefit door de log-likelihood te maximaliseren.
+Elke renner speelt daarbij `prior` virtuele duels tegen een referentierenner
+(rating 1500), zodat renners zonder overwinning of zonder gemeenschappelijke
+koersen toch een eindige rating krijgen.
+"""
+import threading
+
+from imports import lazy
+from uitslagen.ingest import STATUS_FINISH
+
+np = lazy("numpy")
+pd = lazy("pandas")
+sp = lazy("scipy.sparse")
+
+BASE_RATING = 1500
+DEFAULT_PRIOR = 2.0
+
+
+def _race_scores(long):
+    # Score per rij: de plaats, of +inf bij een opgave; niet gestart valt weg
+    status = long["status"].astype(str)
+    started = long[status != "dns"]
+    score = started["position"].to_numpy(dtype=np.float64, na_value=np.nan, copy=True)
+    score[(status[status != "dns"] != STATUS_FINISH).to_numpy()] = np.inf
+    return started, score
+
+
+def _checksums(long):
+    # Eén getal per koers om gewijzigde koersen (nieuwe upload van hetzelfde seizoen) te zien
+    rows = pd.util.hash_pandas_object(long[["rider", "position", "status"]].astype(str), index=False)
+    return rows.groupby([long["season"].to_numpy(), long["race"].to_numpy()]).sum().to_dict()
+
+
+class HeadToHead:
+    """Duelmatrices en ratings, bij te werken met enkel de nieuwe koersen."""
+
+    def __init__(self, prior=DEFAULT_PRIOR):
+        self.prior = prior
+        self.lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.riders = []
+        self._index = {}
+        self._races = {}          # (seizoen, koers) -> checksum van de rijen
+        self.version = None
+        self.wins = sp.csr_matrix((0, 0), dtype=np.int32)
+        self.costarts = sp.csr_matrix((0, 0), dtype=np.int32)
+        self.strength = np.empty(0)
+
+    # --- Bijwerken ---
+    def update(self, long, version=None):
+        """Nieuwe koersen toevoegen; bij gewijzigde of verdwenen koersen alles herberekenen.
+
+        Geeft "unchanged", "incremental" of "rebuilt" terug.
+        """
+        if version is not None and version == self.version:
+            return "unchanged"
+        checksums = _checksums(long) if not long.empty else {}
+        changed = any(checksums.get(race) != value for race, value in self._races.items())
+        if changed:
+            self._reset()
+        new = [race for race in checksums if race not in self._races]
+        mode = "rebuilt" if changed else ("incremental" if new else "unchanged")
+
+        if new:
+            keys = pd.MultiIndex.from_arrays([long["season"], long["race"]])
+            self._add(long[keys.isin(new)])
+            self._races.update({race: checksums[race] for race in new})
+            self.fit()
+        self.version = version
+        return mode
+
+    def _add(self, long):
+        started, score = _race_scores(long)
+        if started.empty:
+            return  # enkel niet-gestarte renners: geen duels, en race_id.max() bestaat niet
+        for rider in started["rider"].unique():
+            if rider not in self._index:
+                self._index[rider] = len(self.riders)
+                self.riders.append(rider)
+        n = len(self.riders)
+        idx = started["rider"].map(self._index).to_numpy(dtype=np.int64)
+
+        # Eén kolom per koers: co-starts = M @ M.T
+        race_id = pd.factorize(pd.MultiIndex.from_arrays([started["season"], started["race"]]))[0]
+        incidence = sp.csr_matrix(
+            (np.ones(len(idx), dtype=np.int32), (idx, race_id)), shape=(n, race_id.max() + 1)
+        )
+        costarts = (incidence @ incidence.T).tocsr()
+        costarts.setdiag(0)
+
+        # Per koers alle (winnaar, verliezer)-paren in één vergelijking van de startlijst
+        order = np.argsort(race_id, kind="stable")
+        bounds = np.flatnonzero(np.diff(race_id[order])) + 1
+        rows, cols = [], []
+        for part in np.split(order, bounds):
+            s = score[part]
+            winner, loser = np.nonzero(s[:, None] < s[None, :])
+            rows.append(idx[part][winner])
+            cols.append(idx[part][loser])
+        rows = np.concatenate(rows) if rows else np.empty(0, np.int64)
+        cols = np.concatenate(cols) if cols else np.empty(0, np.int64)
+        wins = sp.csr_matrix((np.ones(len(rows), dtype=np.int32), (rows, cols)), shape=(n, n))
+
+        self.wins = self._grow(self.wins, n) + wins
+        self.costarts = self._grow(self.costarts, n) + costarts
+        self.costarts.eliminate_zeros()
+        self.strength = np.concatenate([self.strength, np.ones(n - len(self.strength))])
+
+    @staticmethod
+    def _grow(matrix, n):
+        matrix = matrix.tocoo()
+        return sp.csr_matrix((matrix.data, (matrix.row, matrix.col)), shape=(n, n))
+
+    # --- Rating ---
+    def fit(self, max_iter=1000, tol=1e-6):
+        """Bradley–Terry-sterktes via de log-likelihood (L-BFGS), warm gestart vanaf de vorige fit."""
+        from scipy.optimize import minimize
+        from scipy.special import expit, log_expit
+
+        if not self.riders:
+            return self.strength
+        tiny = np.finfo(np.float64).tiny
+        # Elk paar één keer (i < j) met de winsten in beide richtingen
+        upper = sp.triu(self.wins + self.wins.T, k=1).tocoo()
+        i, j = upper.row, upper.col
+        a = np.asarray(self.wins[i, j]).ravel().astype(np.float64)
+        n = upper.data.astype(np.float64)
+        b = n - a
+        size = len(self.riders)
+        half = self.prior / 2
+
+        def objective(theta):
+            d = theta[i] - theta[j]
+            share = expit(d)                    # kans dat i voor j eindigt
+            ref = expit(theta)                  # kans tegen de referentie (θ = 0)
+            # -log L = Σ b·d - n·log σ(d)  (per paar)  +  prior-termen tegen de referentie
+            value = b @ d - n @ np.log(np.maximum(share, tiny)) - (half * theta.sum() + self.prior * log_expit(-theta).sum())
+            pair = a - n * share
+            grad = -(np.bincount(i, pair, minlength=size) - np.bincount(j, pair, minlength=size))
+            grad -= half - self.prior * ref
+            return value, grad
+
+        result = minimize(objective, np.log(self.strength), jac=True, method="L-BFGS-B",
+                          options={"maxiter": max_iter, "gtol": tol})
+        self.strength = np.exp(result.x)
+        return self.strength
+
+    def ratings(self):
+        """Rating-tabel: Elo-achtige schaal (referentie = 1500), duels en winstpercentage."""
+        wins = np.asarray(self.wins.sum(axis=1)).ravel()
+        losses = np.asarray(self.wins.sum(axis=0)).ravel()
+        table = pd.DataFrame({
+            "rating": BASE_RATING + 400 * np.log10(self.strength),
+            "duels": wins + losses,
+            "wins": wins,
+            "losses": losses,
+            "win_rate": np.divide(wins, wins + losses, out=np.full(len(wins), np.nan),
+                                  where=(wins + losses) > 0),
+            "opponents": np.diff(self.costarts.indptr),
+        }, index=pd.Index(self.riders, name="NAME"))
+        return table.sort_values("rating", ascending=False)
+
+    def matrix(self, riders):
+        """Dichte (winsten, nederlagen, co-starts) voor een selectie renners, in die volgorde."""
+        idx = [self._index[r] for r in riders]
+        wins = self.wins[idx][:, idx].toarray()
+        costarts = self.costarts[idx][:, idx].toarray()
+        return wins, wins.T.copy(), costarts
+
+    def expected(self, riders):
+        """Kans dat de renner in de rij voor de renner in de kolom eindigt (volgens de rating)."""
+        p = self.strength[[self._index[r] for r in riders]]
+        return p[:, None] / (p[:, None] + p[None, :])
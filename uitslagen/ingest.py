@@ -0,0 +1,181 @@
+"""Het tabblad "Uitslagen" omzetten naar een lange tabel: één rij per renner per koers.
+
+Layout van de standaard template (0-gebaseerd):
+    rij 1, kolom 3+   koersnamen of -datums
+    rij 2+, kolom 1   rennersnaam
+    rij 2+, kolom 2   categorie
+    rij 2+, kolom 3+  uitslag (plaats) of een code zoals DNF
+"""
+import hashlib
+import io
+import threading
+import zipfile
+from collections import Counter, OrderedDict
+from datetime import date, datetime
+
+from imports import lazy
+
+np = lazy("numpy")
+pd = lazy("pandas")
+
+SHEET_NAME = "Uitslagen"
+
+STATUS_FINISH = "finish"
+# Codes in een uitslagcel; bewaard als status i.p.v. weggegooid als NA
+STATUS_CODES = {"DNF": "dnf", "DNS": "dns", "DSQ": "dsq", "OTL": "otl"}
+
+
+class WorkbookError(ValueError):
+    pass
+
+
+COLUMNS = ["season", "race_order", "race", "race_date", "rider_order", "rider", "category", "position", "status"]
+
+
+def read_sheet(source):
+    """Ruwe cellen van het uitslagentabblad als 2D object-array, in één read-only pass.
+
+    openpyxl in read_only-modus streamt de rijen uit de XML zonder de hele workbook
+    (stijlen, validaties, ...) op te bouwen; enkel kolom B tot het laatste koersveld
+    wordt bijgehouden. Geen of een onleesbare Excel-workbook, of een workbook zonder
+    tabblad "Uitslagen", geeft een WorkbookError.
+    """
+    import openpyxl
+    from openpyxl.utils.exceptions import InvalidFileException
+
+    try:
+        wb = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    except (zipfile.BadZipFile, InvalidFileException, KeyError) as exc:
+        raise WorkbookError("Het bestand is geen leesbare Excel-workbook (.xlsx).") from exc
+    try:
+        if SHEET_NAME not in wb.sheetnames:
+            raise WorkbookError(f'De workbook heeft geen tabblad "{SHEET_NAME}"; gebruik de standaard template.')
+        rows = wb[SHEET_NAME].iter_rows(min_row=1, values_only=True)
+        head = [next(rows, ()) for _ in range(2)]
+        headers = head[1] if len(head) > 1 else ()
+        # Laatste niet-lege koerskop bepaalt de breedte; lege rijen/kolommen erna negeren
+        width = max((j + 1 for j, h in enumerate(headers) if not _is_empty(h)), default=3)
+        grid = [_pad(r, width) for r in head]
+        grid.extend(_pad(r, width) for r in rows if any(not _is_empty(v) for v in r[1:width]))
+    finally:
+        wb.close()
+    return np.array(grid, dtype=object).reshape(len(grid), width)
+
+
+def _pad(row, width):
+    row = tuple(row[:width])
+    return row + (None,) * (width - len(row))
+
+
+def _is_empty(value):
+    return value is None or (isinstance(value, float) and np.isnan(value)) or (
+        isinstance(value, str) and value.strip() in ("", "nan", "NaN")
+    )
+
+
+def _race_label(header):
+    # Datums als ISO-datum, al de rest als tekst
+    if isinstance(header, (datetime, date)):
+        day = header.date() if isinstance(header, datetime) else header
+        return day.isoformat(), day
+    return str(header).strip(), None
+
+
+def _unique(names):
+    # Twee koersen op dezelfde datum (of twee renners met dezelfde naam) blijven apart: "x (2)"
+    seen = Counter()
+    unique = []
+    for name in names:
+        seen[name] += 1
+        unique.append(name if seen[name] == 1 else f"{name} ({seen[name]})")
+    return unique
+
+
+def coerce_results(values):
+    """Plaats en status voor een array uitslagcellen, in één gevectoriseerde stap.
+
+    Getallen (ook als tekst, met komma of punt) worden een plaats met status "finish",
+    gekende codes een status zonder plaats; lege of onleesbare cellen krijgen status None.
+    """
+    flat = np.asarray(values, dtype=object).ravel()
+    position = pd.to_numeric(flat, errors="coerce").astype(np.float64)
+    status = np.where(np.isnan(position), None, STATUS_FINISH).astype(object)
+
+    # Enkel de gevulde cellen die geen getal zijn nog als tekst bekijken (codes, "12,0")
+    rest = np.flatnonzero(np.isnan(position) & pd.notna(flat))
+    if len(rest):
+        text = pd.Series(flat[rest]).astype(str).str.strip()
+        number = pd.to_numeric(text.str.replace(",", ".", regex=False), errors="coerce").to_numpy(np.float64)
+        position[rest] = number
+        status[rest] = np.where(np.isnan(number), text.str.upper().map(STATUS_CODES).to_numpy(object), STATUS_FINISH)
+    return np.trunc(position), status
+
+
+def sheet_to_long(raw, season=None):
+    """Lange tabel (COLUMNS) uit de ruwe cellen; lege cellen geven geen rij.
+
+    Zonder `season` wordt het meest voorkomende jaar van de koersdatums genomen, of
+    het huidige jaar als de koersen geen datums zijn. Dubbele koers- of rennernamen
+    krijgen een volgnummer, zodat (seizoen, koers, renner) altijd uniek is.
+    """
+    cells = np.asarray(raw, dtype=object)
+    if cells.ndim != 2 or cells.shape[0] < 3 or cells.shape[1] < 4:
+        return pd.DataFrame(columns=COLUMNS)
+    headers = cells[1, 3:]
+    names = cells[2:, 1]
+    categories = cells[2:, 2]
+
+    race_cols = np.array([j for j, h in enumerate(headers) if not _is_empty(h)], dtype=np.intp)
+    rider_rows = np.array([i for i, n in enumerate(names) if not _is_empty(n)], dtype=np.intp)
+    labels = [_race_label(headers[j]) for j in race_cols]
+
+    if season is None:
+        years = Counter(day.year for _, day in labels if day is not None)
+        season = years.most_common(1)[0][0] if years else date.today().year
+
+    values = cells[2:, 3:][np.ix_(rider_rows, race_cols)]
+    position, status = coerce_results(values)
+    keep = np.flatnonzero(pd.notna(status))
+    rider_idx, race_idx = np.divmod(keep, len(race_cols))
+
+    rider_names = np.array(_unique(str(n).strip() for n in names[rider_rows]), dtype=object)
+    rider_categories = np.array(
+        [None if _is_empty(c) else str(c).strip() for c in categories[rider_rows]], dtype=object
+    )
+    race_names = np.array(_unique(race for race, _ in labels), dtype=object)
+    race_dates = np.array([day for _, day in labels], dtype=object)
+
+    long = pd.DataFrame({
+        "season": np.full(len(keep), season, dtype=np.int16),
+        "race_order": race_idx.astype(np.int16),
+        "race": race_names[race_idx],
+        "race_date": race_dates[race_idx],
+        "rider_order": rider_idx.astype(np.int16),
+        "rider": rider_names[rider_idx],
+        "category": rider_categories[rider_idx],
+        "position": pd.array(position[keep], dtype="Float64").astype("Int16"),
+        "status": status[keep],
+    })
+    return long
+
+
+# --- Gememoïseerd op de inhoud van de workbook ---
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+MEMO_ENTRIES = 8
+
+
+def parse_workbook(data, season=None):
+    """Lange tabel voor een workbook (bytes); hetzelfde bestand wordt maar één keer gelezen."""
+    key = (hashlib.sha256(data).hexdigest(), season)
+    with _memo_lock:
+        if key in _memo:
+            _memo.move_to_end(key)
+            return _memo[key].copy()
+
+    long = sheet_to_long(read_sheet(io.BytesIO(data)), season)
+    with _memo_lock:
+        _memo[key] = long
+        while len(_memo) > MEMO_ENTRIES:
+            _memo.popitem(last=False)
+    return long.copy()
@@ -0,0 +1,98 @@
+"""Statistieken per renner, in één keer berekend uit de lange tabel.
+
+De pagina berekent ze één keer per archiefversie en seizoenkeuze; een renner
+selecteren is daarna enkel nog een opzoeking in deze tabellen.
+"""
+from imports import lazy
+from uitslagen.ingest import STATUS_FINISH
+from uitslagen.store import race_labels
+
+pd = lazy("pandas")
+
+TOP_N = 10
+DEFAULT_WINDOW = 5
+
+STAT_COLUMNS = ["starts", "dnf", "mean", "median", "best", "std", "top10", "percentile"]
+
+
+def _chronological(long):
+    # Eén rij per renner per koers, in koersvolgorde over de seizoenen heen
+    return long.sort_values(["season", "race_order", "rider_order"], kind="stable")
+
+
+def rider_stats(long):
+    """Per renner: starts, DNF's, gemiddelde, mediaan, beste, std, top-10-ratio en percentiel.
+
+    Gemiddelde, mediaan, beste en std gaan enkel over de uitgereden koersen (std met
+    ddof=1, zoals de oude consistentiegrafiek). Het percentiel rangschikt het
+    gemiddelde: 100 = beste gemiddelde van de selectie. Volgorde zoals de workbook.
+    """
+    if long.empty:
+        return pd.DataFrame(columns=STAT_COLUMNS, dtype=float)
+    status = long["status"].astype(str)
+    started = long[status != "dns"]
+    finished = long[status == STATUS_FINISH]
+    position = finished["position"].astype(float)
+    by_rider = position.groupby(finished["rider"], sort=False)
+
+    stats = pd.DataFrame({
+        "starts": started.groupby("rider", sort=False).size(),
+        "dnf": (status[status != "dns"] == "dnf").groupby(started["rider"], sort=False).sum(),
+        "mean": by_rider.mean(),
+        "median": by_rider.median(),
+        "best": by_rider.min(),
+        "std": by_rider.std(),
+        "top10": (position <= TOP_N).groupby(finished["rider"], sort=False).mean(),
+    })
+    stats["percentile"] = stats["mean"].rank(pct=True, ascending=False) * 100
+
+    riders = list(dict.fromkeys(
+        long.sort_values(["season", "rider_order"], ascending=[False, True])["rider"]
+    ))
+    stats = stats.reindex(riders)
+    stats[["starts", "dnf"]] = stats[["starts", "dnf"]].fillna(0).astype(int)
+    stats.index.name = "NAME"
+    return stats[STAT_COLUMNS]
+
+
+def rolling_stats(long, window=DEFAULT_WINDOW):
+    """Gemiddelde, std en top-10-ratio over de laatste `window` uitgereden koersen.
+
+    Eén rij per renner per uitgereden koers (rider, race, mean, std, top10), met
+    één gegroepeerde rolling-bewerking voor alle renners samen.
+    """
+    finished = _chronological(long[long["status"].astype(str) == STATUS_FINISH])
+    if finished.empty:
+        return pd.DataFrame(columns=["rider", "race", "mean", "std", "top10"])
+    position = finished["position"].astype(float).to_numpy()
+    frame = pd.DataFrame({
+        "rider": finished["rider"].to_numpy(),
+        "race": race_labels(finished).to_numpy(),
+        "position": position,
+        "top": (position <= TOP_N).astype(float),
+    })
+    rolling = frame.groupby("rider", sort=False)[["position", "top"]].rolling(window, min_periods=1)
+    # groupby().rolling() geeft (rider, rij) als index; terugzetten op de oorspronkelijke rijen
+    mean = rolling.mean().droplevel(0).sort_index()
+    std = frame.groupby("rider", sort=False)["position"].rolling(window, min_periods=2).std()
+    frame["mean"] = mean["position"]
+    frame["std"] = std.droplevel(0).sort_index()
+    frame["top10"] = mean["top"]
+    return frame[["rider", "race", "mean", "std", "top10"]]
+
+
+def latest_form(rolling):
+    """Laatste venster per renner (de huidige vorm), geïndexeerd op renner."""
+    if rolling.empty:
+        return pd.DataFrame(columns=["mean", "std", "top10"], dtype=float)
+    last = rolling.groupby("rider", sort=False).tail(1).set_index("rider")
+    last.index.name = "NAME"
+    return last[["mean", "std", "top10"]]
+
+
+def leaderboard(stats, by="mean", min_starts=1):
+    """Klassement op een kolom; enkel renners met minstens `min_starts` starts."""
+    board = stats[(stats["starts"] >= min_starts) & stats[by].notna()]
+    ascending = by in ("mean", "median", "best", "std")
+    return board.sort_values(by, ascending=ascending, kind="stable")
+
@@ -0,0 +1,188 @@
+"""Uitslagen van alle seizoenen als getypeerde, kolomgebaseerde Parquet-bestanden.
+
+Eén bestand per seizoen; een nieuwe of verbeterde workbook vervangt de seizoenen
+die erin staan volledig, zodat geschrapte renners of koersen ook verdwijnen. Het
+manifest onthoudt welke workbooks (sha256) al ingelezen zijn, zodat dezelfde upload
+niets opnieuw doet.
+
+Het archief is bewust gedeeld door alle sessies (één clubarchief); alle
+schrijfacties lopen na elkaar onder één lock.
+"""
+import functools
+import hashlib
+import json
+import os
+import threading
+import time
+
+from imports import lazy
+from uitslagen.ingest import COLUMNS, parse_workbook
+
+pd = lazy("pandas")
+pa = lazy("pyarrow")
+pq = lazy("pyarrow.parquet")
+
+DEFAULT_DIR = os.environ.get("UITSLAGEN_STORE_DIR", os.path.join("data", "uitslagen"))
+
+
+@functools.cache
+def schema():
+    # Pas opbouwen bij het eerste schrijven: pyarrow laden kost tijd bij een koude start
+    return pa.schema([
+        ("season", pa.int16()),
+        ("race_order", pa.int16()),
+        ("race", pa.string()),
+        ("race_date", pa.date32()),
+        ("rider_order", pa.int16()),
+        ("rider", pa.string()),
+        ("category", pa.string()),
+        ("position", pa.int16()),
+        ("status", pa.dictionary(pa.int8(), pa.string())),
+    ])
+
+
+# race_order hoort erbij: de naam alleen is niet uniek als twee koersen dezelfde datum hebben
+KEY = ["season", "race_order", "rider"]
+
+
+class ResultsStore:
+    def __init__(self, directory=DEFAULT_DIR):
+        self.directory = directory
+        self._lock = threading.RLock()
+        os.makedirs(directory, exist_ok=True)
+
+    # --- Inlezen ---
+    def ingest(self, data, season=None):
+        """Workbook (bytes) toevoegen; geeft een samenvatting terug ("new": False als al gekend)."""
+        key = hashlib.sha256(data).hexdigest()
+        rows = parse_workbook(data, season)
+        with self._lock:
+            manifest = self._manifest()
+            if key in manifest:
+                return {**manifest[key], "new": False}
+            self.replace(rows)
+
+            summary = {
+                "seasons": sorted(int(s) for s in rows["season"].unique()),
+                "riders": int(rows["rider"].nunique()),
+                "races": int(rows["race_order"].nunique()),
+                "dnf": int((rows["status"] == "dnf").sum()),
+                "ingested_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            manifest = self._manifest()
+            manifest[key] = summary
+            self._write_json(self._manifest_path(), manifest)
+        return {**summary, "new": True}
+
+    def replace(self, rows):
+        """Elk seizoen in `rows` volledig vervangen; ValueError bij dubbele (koers, renner)."""
+        duplicates = rows.duplicated(KEY)
+        if duplicates.any():
+            first = rows.loc[duplicates, ["race", "rider"]].iloc[0]
+            raise ValueError(f"Dubbele uitslag voor {first['rider']} in {first['race']}")
+        with self._lock:
+            for season, part in rows.groupby("season"):
+                part = part.sort_values(["race_order", "rider_order"], ignore_index=True)
+                table = pa.Table.from_pandas(part[COLUMNS], schema=schema(), preserve_index=False)
+                path = self._season_path(int(season))
+                tmp = path + ".tmp"
+                pq.write_table(table, tmp)
+                os.replace(tmp, path)
+            self._forget(int(s) for s in rows["season"].unique())
+
+    def delete_season(self, season):
+        """Seizoen uit het archief halen; een latere upload ervan wordt weer ingelezen."""
+        with self._lock:
+            path = self._season_path(int(season))
+            if os.path.exists(path):
+                os.remove(path)
+            self._forget([int(season)])
+
+    def _forget(self, seasons):
+        # Workbooks met een vervangen of verwijderd seizoen zijn niet langer "al ingelezen"
+        seasons = set(seasons)
+        manifest = self._manifest()
+        kept = {k: v for k, v in manifest.items() if not seasons & set(v["seasons"])}
+        if len(kept) != len(manifest):
+            self._write_json(self._manifest_path(), kept)
+
+    # --- Opvragen ---
+    def seasons(self):
+        return sorted(
+            int(name[len("season="):-len(".parquet")])
+            for name in os.listdir(self.directory)
+            if name.startswith("season=") and name.endswith(".parquet")
+        )
+
+    def version(self):
+        """Verandert bij elke schrijfactie; bruikbaar als cachesleutel."""
+        return tuple(
+            (season, os.stat(self._season_path(season)).st_mtime_ns) for season in self.seasons()
+        )
+
+    def load(self, seasons=None, columns=None):
+        """Lange tabel voor de gevraagde seizoenen (standaard alle)."""
+        seasons = self.seasons() if seasons is None else seasons
+        tables = [
+            pq.read_table(self._season_path(s), columns=columns)
+            for s in seasons if os.path.exists(self._season_path(s))
+        ]
+        if not tables:
+            return pd.DataFrame(columns=columns or COLUMNS)
+        return pa.concat_tables(tables).to_pandas()
+
+    # --- Bestanden ---
+    def _season_path(self, season):
+        return os.path.join(self.directory, f"season={season}.parquet")
+
+    def _manifest_path(self):
+        return os.path.join(self.directory, "manifest.json")
+
+    def _manifest(self):
+        try:
+            with open(self._manifest_path(), encoding="utf-8") as fh:
+                return json.load(fh)
+        except FileNotFoundError:
+            return {}
+
+    @staticmethod
+    def _write_json(path, data):
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(data, fh, indent=2)
+        os.replace(tmp, path)
+
+
+def race_labels(long):
+    """Kolomnaam per rij: de koers, met het seizoen erbij zodra er meerdere seizoenen zijn."""
+    label = long["race"].astype(str)
+    if long["season"].nunique() > 1:
+        label = label + " (" + long["season"].astype(str) + ")"
+    return label
+
+
+def wide_positions(long):
+    """Renner × koers met de plaats (float, NaN bij DNF of niet gestart), chronologisch.
+
+    Zelfde vorm als de tabel die de pagina vroeger uit Excel bouwde. Bij meerdere
+    seizoenen krijgt elke koers het seizoen erbij zodat de namen uniek blijven.
+    """
+    if long.empty:
+        return pd.DataFrame()
+    long = long.assign(label=race_labels(long))
+
+    order = (long.drop_duplicates("label")
+             .sort_values(["season", "race_order"])["label"].tolist())
+    finished = long[long["status"] == "finish"]
+    # pivot (geen pivot_table): een dubbele (renner, koers) is een fout, geen stil weggevallen rij
+    wide = finished.pivot(index="rider", columns="label", values="position")
+    # Volgorde uit de workbook (laatste seizoen eerst), zoals vroeger de rijvolgorde in Excel
+    riders = list(dict.fromkeys(
+        long.sort_values(["season", "rider_order"], ascending=[False, True])["rider"]
+    ))
+    wide = wide.reindex(index=[r for r in riders if r in wide.index], columns=order).astype(float)
+    # Koersen zonder één uitslag weglaten, zoals de oude dropna(axis=1, how="all")
+    wide = wide.dropna(axis=1, how="all")
+    wide.index.name = "NAME"
+    wide.columns.name = None
+    return wide